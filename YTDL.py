@@ -4,23 +4,35 @@ import shutil
 import subprocess
 import re
 import threading
+import queue
 from urllib.parse import parse_qs, urlparse
 import sys
 import traceback
 import platform
 import base64
+import codecs
 import ctypes
 import hashlib
 import logging
 import io
 import time
 import tempfile
+import sqlite3
+import gzip
+import glob
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 from uuid import uuid4
-from typing import Any, Tuple, List, Optional, Dict, Callable
-from dataclasses import dataclass, field
+from typing import Any, ClassVar, Tuple, List, Optional, Dict, Callable, Iterable, Iterator, Set
+from dataclasses import asdict, dataclass, field
+from contextlib import contextmanager
+from collections import OrderedDict, deque
 
-sys.dont_write_bytecode = True
+# Keep compiled bytecode out of the release folder's __pycache__ directories
+# but still cache it, so imports after the first launch skip compilation.
+# YTDL_mul.py sets the same prefix before importing this module.
+if sys.pycache_prefix is None and not sys.flags.dont_write_bytecode:
+    sys.pycache_prefix = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".pycache")
 
 # --- App Versioning ---
 __version__ = "v2026.07.22.03"
@@ -43,12 +55,20 @@ class DependencyManager:
             # Re-import to ensure it's available in the current session if needed by caller
             # (Though usually caller does the import after calling this)
 
-# Initial dependency check
-DependencyManager.check_and_install("requests")
-import requests
+def _import_requests():
+    """Import requests on first use, installing it if needed.
+
+    requests (with urllib3 and certifi) is the slowest import of this module
+    and is only needed for update checks and Discord reports, so importing
+    YTDL does not load it.
+    """
+    DependencyManager.check_and_install("requests")
+    import requests
+    return requests
 
 def _http_get_with_retry(url, max_retries=3, **kwargs):
     """GET request with exponential backoff retry."""
+    requests = _import_requests()
     last_exc = None
     for attempt in range(max_retries):
         try:
@@ -61,6 +81,25 @@ def _http_get_with_retry(url, max_retries=3, **kwargs):
                 time.sleep(2 ** attempt)
     raise last_exc
 
+def _write_atomically(path: str, write: Callable[[Any], Any], prefix: str = ".") -> Any:
+    """Write ``path`` through a temporary file next to it, then rename it into place.
+
+    ``write`` is called with the temporary file opened in binary mode and its
+    result is returned.  On any failure ``path`` is left as it was.
+    """
+    fd, temporary_path = tempfile.mkstemp(prefix=prefix, suffix=".tmp", dir=os.path.dirname(path) or None)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            result = write(f)
+        os.replace(temporary_path, path)
+    except BaseException:
+        try:
+            os.remove(temporary_path)
+        except OSError:
+            pass
+        raise
+    return result
+
 class Config:
     # yt-dlp Versioning
     YT_DLP_VERSION_CHANNEL = "nightly"
@@ -74,16 +113,12 @@ class Config:
     # with this application rather than an upstream release tag.
     FFMPEG_MIN_BUILD_DATE = "20260712"
     
-    _yt_dlp_path = shutil.which('yt-dlp')
-    _yt_dlp_dir = os.path.dirname(_yt_dlp_path) if _yt_dlp_path else None
-    
     # Try to find ffmpeg/ffprobe next to yt-dlp first. Missing files are
     # repaired at startup through self_update.py; do not fall back to PATH.
-    FFMPEG_BINARY = (
-        os.path.join(_yt_dlp_dir, "yt-dlp-ffmpeg.exe")
-        if _yt_dlp_dir and os.path.isfile(os.path.join(_yt_dlp_dir, "yt-dlp-ffmpeg.exe"))
-        else None
-    )
+    # Looked up on first use (ffmpeg_binary) rather than at import.
+    FFMPEG_BINARY: Optional[str] = None
+    _ffmpeg_binary_checked = False
+
     @classmethod
     def get_ffmpeg_paths(cls) -> Dict[str, str]:
         """Return the portable FFmpeg and FFprobe locations next to yt-dlp."""
@@ -98,8 +133,16 @@ class Config:
         """Refresh the portable FFmpeg path after an FFmpeg repair or update."""
         paths = cls.get_ffmpeg_paths()
         cls.FFMPEG_BINARY = paths["ffmpeg"] if os.path.isfile(paths["ffmpeg"]) else None
+        cls._ffmpeg_binary_checked = True
         return bool(cls.FFMPEG_BINARY)
 
+    @classmethod
+    def ffmpeg_binary(cls) -> Optional[str]:
+        """Return the portable FFmpeg path, looking it up on the first call."""
+        if not cls._ffmpeg_binary_checked:
+            cls.refresh_ffmpeg_binaries()
+        return cls.FFMPEG_BINARY
+
     @classmethod
     def ffmpeg_status(cls) -> Tuple[bool, str]:
         """Check that both portable tools run and meet the verified build date."""
@@ -118,7 +161,7 @@ class Config:
             return False, "Invalid FFMPEG_MIN_BUILD_DATE calendar date"
         minimum_build_date = int(cls.FFMPEG_MIN_BUILD_DATE)
 
-        for name, path in paths.items():
+        def probe(name: str, path: str) -> Optional[str]:
             try:
                 result = subprocess.run(
                     [path, "-version"],
@@ -132,17 +175,25 @@ class Config:
                     timeout=10,
                 )
             except (OSError, subprocess.SubprocessError) as e:
-                return False, f"Unable to run portable {name}: {e}"
+                return f"Unable to run portable {name}: {e}"
 
             match = re.search(r"--extra-version=(\d{8})", result.stdout)
             if result.returncode != 0 or not match:
-                return False, f"Unable to read portable {name} build date"
+                return f"Unable to read portable {name} build date"
             build_date = int(match.group(1))
             if build_date < minimum_build_date:
-                return False, (
+                return (
                     f"Portable {name} build is too old: {build_date} "
                     f"< required {minimum_build_date}"
                 )
+            return None
+
+        # Both binaries are started at once; each probe is a cold process start.
+        with ThreadPoolExecutor(max_workers=len(paths), thread_name_prefix="ytdl-ffmpeg-probe") as executor:
+            problems = list(executor.map(probe, paths.keys(), paths.values()))
+        for problem in problems:
+            if problem is not None:
+                return False, problem
 
         return True, f"ready (build date >= {minimum_build_date})"
 
@@ -153,10 +204,50 @@ class Config:
     # Paths and Environment
     _APP_DIR = os.path.dirname(os.path.abspath(sys.executable)) if getattr(sys, 'frozen', False) else os.path.dirname(os.path.abspath(__file__))
     META_DIR = os.path.join(_APP_DIR, 'meta')
+    QUEUE_DB = os.path.join(_APP_DIR, 'queue.sqlite3')
+    # Completed downloads; playlist entries found here are not extracted again.
+    ARCHIVE_DB = os.path.join(_APP_DIR, 'archive.sqlite3')
+    # Sync mode: entries already queued per playlist or channel.  A channel
+    # listing (newest first) stops after this many known entries in a row.
+    SYNC_DB = os.path.join(_APP_DIR, 'sync.sqlite3')
+    SYNC_KNOWN_STREAK = 10
+    # One JSON line per yt-dlp job; summarised by `YTDL.py --report`.
+    METRICS_FILE = os.path.join(_APP_DIR, 'metrics.jsonl')
+    # Startup checks that passed within MAINTENANCE_CHECK_INTERVAL seconds
+    # are skipped; `YTDL.py --force-check` runs them regardless.
+    MAINTENANCE_STATE_FILE = os.path.join(_APP_DIR, 'maintenance_state.json')
+    MAINTENANCE_CHECK_INTERVAL = 6 * 60 * 60
+    # A queued info JSON is downloaded with --load-info-json, skipping a
+    # second extraction, until this many seconds before its format URLs
+    # expire; after that the video is extracted again from its URL.
+    INFO_JSON_REUSE_MARGIN = 30 * 60
     EXECUTABLE = 'yt-dlp'
-    CONCURRENT_FRAGMENTS = "2"  # String: passed directly as CLI args to yt-dlp
+    # "subprocess" starts the yt-dlp executable for every job; "in-process"
+    # drives the yt_dlp Python package inside this interpreter when it is
+    # installed, and otherwise falls back to "subprocess". Each in-process job
+    # still builds its own YoutubeDL, so only the process start-up is saved.
+    YT_DLP_ENGINE = "subprocess"
+    # Starting --concurrent-fragments value; FragmentTuner adapts it per
+    # protocol and host and keeps its scores in FRAGMENT_TUNING_FILE.
+    CONCURRENT_FRAGMENTS = "2"
+    FRAGMENT_TUNING_FILE = os.path.join(_APP_DIR, 'fragment_tuning.json')
+    CONCURRENT_DOWNLOADS = 3  # Number of yt-dlp download jobs run at the same time
+    # Total download rate shared by all running jobs: bytes per second or a
+    # string such as "4M"; None is unlimited.  Each (start, end, rate)
+    # schedule window (local "HH:MM", may cross midnight) overrides it, e.g.
+    # (("09:00", "18:00", "4M"),) caps office hours only.
+    BANDWIDTH_LIMIT = None
+    BANDWIDTH_SCHEDULE = ()
+    CONCURRENT_METADATA_FETCHES = 4  # Number of URLs whose metadata is fetched at the same time
+    CONCURRENT_ENTRY_RESOLUTIONS = 4  # Playlist entries extracted at the same time, per playlist
     PROGRESS_BAR_SECONDS = "2"  # String: passed directly as CLI args to yt-dlp
     SUBPROCESS_HEARTBEAT_SECONDS = 60
+    # Lines of yt-dlp output held in memory per job.  The full transcript is
+    # written to a file in JOB_LOG_DIR, kept only when the job fails, and the
+    # newest JOB_LOG_KEEP files are retained.
+    OUTPUT_TAIL_LINES = 500
+    JOB_LOG_DIR = os.path.join(_APP_DIR, 'logs')
+    JOB_LOG_KEEP = 20
 
     # Supported YouTube URL families.  Keep this list structural rather than
     # accepting arbitrary paths below a YouTube hostname.
@@ -264,6 +355,26 @@ class Config:
                 urls.append(url)
         return urls
 
+    @staticmethod
+    def youtube_video_id(url: str) -> Optional[str]:
+        """Return the video ID named by a single-video YouTube URL, if any."""
+        if Config._youtube_url_kind(url) != "video":
+            return None
+        candidate = url.strip()
+        if "://" not in candidate:
+            candidate = f"https://{candidate}"
+        parsed = urlparse(candidate)
+        path_parts = tuple(part for part in parsed.path.split("/") if part)
+        if parsed.hostname.lower() in {"youtu.be", "www.youtu.be"}:
+            video_id = path_parts[0]
+        elif path_parts == ("watch",):
+            video_id = parse_qs(parsed.query)["v"][0]
+        elif path_parts[0] in {"embed", "v", "shorts", "live"}:
+            video_id = path_parts[1]
+        else:
+            return None  # a clip ID is not the ID of its video
+        return video_id if re.fullmatch(r"[\w-]{11}", video_id) else None
+
     @staticmethod
     def is_playlist_or_channel_url(url: str) -> bool:
         """Check if a URL points to a playlist or channel."""
@@ -409,6 +520,8 @@ class ErrorContext:
     title: str = ""
     traceback_str: str = ""
     log_output: str = ""
+    # Full transcript on disk when ``log_output`` only holds its recent part.
+    log_path: str = ""
     exception: Optional[Exception] = None
     extra: Dict[str, str] = field(default_factory=dict)
 
@@ -468,19 +581,47 @@ class Logger:
         return io.BytesIO(marker + content_bytes[-(Logger.MAX_DIAGNOSTIC_BYTES - len(marker)):])
 
     @staticmethod
-    def _send_discord_report(payload: dict, log_content: Optional[str], log_label: Optional[str]):
+    def _diagnostic_file_attachment(log_path: str) -> io.BytesIO:
+        """Read at most the last 8 MiB of a job log without loading the rest."""
+        with open(log_path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size <= Logger.MAX_DIAGNOSTIC_BYTES:
+                f.seek(0)
+                return io.BytesIO(f.read())
+            marker = (
+                b"[Diagnostic output exceeded 8 MiB; the beginning was omitted. "
+                b"The remainder below is the most recent output.]\n\n"
+            )
+            f.seek(size - (Logger.MAX_DIAGNOSTIC_BYTES - len(marker)))
+            return io.BytesIO(marker + f.read())
+
+    @staticmethod
+    def _send_discord_report(
+        payload: dict,
+        log_content: Optional[str],
+        log_label: Optional[str],
+        log_path: str = "",
+    ):
         """Send one bounded Discord notification and surface webhook failures locally."""
         if log_content:
             log_filename = f"{log_label.replace(' ', '_').lower()}.txt"
-            log_stream = Logger._diagnostic_attachment(log_content)
-            response = requests.post(
+            log_stream = None
+            if log_path:
+                try:
+                    log_stream = Logger._diagnostic_file_attachment(log_path)
+                except OSError:
+                    log_stream = None
+            if log_stream is None:
+                log_stream = Logger._diagnostic_attachment(log_content)
+            response = _import_requests().post(
                 Config.DISCORD_WEBHOOK,
                 data={"payload_json": json.dumps(payload)},
                 files={"file": (log_filename, log_stream, "text/plain")},
                 timeout=10,
             )
         else:
-            response = requests.post(Config.DISCORD_WEBHOOK, json=payload, timeout=10)
+            response = _import_requests().post(Config.DISCORD_WEBHOOK, json=payload, timeout=10)
         response.raise_for_status()
 
     @staticmethod
@@ -530,6 +671,9 @@ class Logger:
         )
         if log_content:
             logging.error("[%s] --- Full %s ---\n%s", error_id, log_label, log_content)
+        if ctx.log_path:
+            # Only logged locally: the path contains the user's profile name.
+            logging.error("[%s] Complete output saved to %s", error_id, ctx.log_path)
 
         # Discord Notification
         should_report_discord = True
@@ -546,18 +690,515 @@ class Logger:
                     f"{context_message}"
                 )
                 Logger._send_discord_report(
-                    {"content": Logger._truncate_for_discord(final_report)}, log_content, log_label
+                    {"content": Logger._truncate_for_discord(final_report)}, log_content, log_label,
+                    ctx.log_path,
                 )
             except Exception as e:
                 logging.critical("[%s] Failed to send error report to Discord: %s", error_id, e)
 
         return error_id
 
+class CapturedOutput(str):
+    """The recent output of a yt-dlp job.
+
+    ``log_path`` names the file with the complete transcript, or is empty
+    when the job succeeded or no file could be written.
+    """
+
+    def __new__(cls, text: str, log_path: str = ""):
+        value = super().__new__(cls, text)
+        value.log_path = log_path
+        return value
+
+
+class OutputCapture:
+    """Keep the last ``Config.OUTPUT_TAIL_LINES`` lines and spool all of them.
+
+    Output of a long ``--verbose`` job is not held in memory; only the tail
+    is, and the full transcript is streamed to a file in ``Config.JOB_LOG_DIR``.
+    Transcripts still being written by this process are never pruned.
+    """
+    _live_paths: ClassVar[Set[str]] = set()
+    _live_lock = threading.Lock()
+
+    def __init__(self, label: str = "yt-dlp"):
+        self._tail = deque(maxlen=max(1, Config.OUTPUT_TAIL_LINES))
+        self._omitted = 0
+        self._lock = threading.Lock()
+        self._spool = None
+        self._finished = False
+        self.log_path = ""
+        try:
+            os.makedirs(Config.JOB_LOG_DIR, exist_ok=True)
+            with OutputCapture._live_lock:
+                self._prune_job_logs()
+                fd, self.log_path = tempfile.mkstemp(prefix=f"{label}-", suffix=".log", dir=Config.JOB_LOG_DIR)
+                OutputCapture._live_paths.add(self.log_path)
+            self._spool = os.fdopen(fd, "w", encoding="utf-8", errors="replace", newline="")
+        except OSError as e:
+            logging.warning("Could not create a job log file; keeping only recent output: %s", e)
+            self.log_path = ""
+
+    @staticmethod
+    def _prune_job_logs() -> None:
+        try:
+            entries = [
+                entry for entry in os.scandir(Config.JOB_LOG_DIR)
+                if entry.name.endswith(".log") and entry.path not in OutputCapture._live_paths
+            ]
+            entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+        except OSError:
+            return
+        for entry in entries[max(0, Config.JOB_LOG_KEEP - 1):]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                # Another job may still be writing it (Windows).
+                pass
+
+    def append(self, line: str) -> None:
+        with self._lock:
+            if len(self._tail) == self._tail.maxlen:
+                self._omitted += 1
+            self._tail.append(line)
+            if self._spool is None:
+                return
+            try:
+                self._spool.write(line)
+            except (OSError, ValueError) as e:
+                logging.warning("Job log file %s could not be written: %s", self.log_path, e)
+                self._close_spool(keep=False)
+
+    def _close_spool(self, keep: bool) -> None:
+        if self._spool is not None:
+            try:
+                self._spool.close()
+            except OSError:
+                pass
+            self._spool = None
+            with OutputCapture._live_lock:
+                OutputCapture._live_paths.discard(self.log_path)
+        if not keep and self.log_path:
+            try:
+                os.remove(self.log_path)
+            except OSError:
+                pass
+            self.log_path = ""
+
+    def close(self, keep: bool = False) -> None:
+        """Abandon an unfinished capture; a finished one is left as it is."""
+        with self._lock:
+            if not self._finished:
+                self._close_spool(keep)
+
+    def finish(self, keep: bool) -> CapturedOutput:
+        """Close the transcript, keeping its file only if ``keep`` is set."""
+        with self._lock:
+            if not self._finished:
+                self._close_spool(keep)
+                self._finished = True
+            text = "".join(self._tail)
+            if self._omitted:
+                text = f"[{self._omitted} earlier lines omitted]\n{text}"
+            return CapturedOutput(text, self.log_path)
+
+
+@dataclass(frozen=True)
+class ProgressEvent:
+    """One machine-readable yt-dlp progress report.
+
+    ``phase`` is ``"download"`` or ``"postprocess"``; ``status`` is yt-dlp's
+    own status for that phase (``downloading``, ``finished``, ``error``,
+    ``started``, ``processing``).  Sizes are bytes and times are seconds.
+    """
+    PREFIX: ClassVar[str] = "[ytdl-progress] "
+    _DOWNLOAD_FIELDS: ClassVar[str] = (
+        "status,downloaded_bytes,total_bytes,total_bytes_estimate,"
+        "speed,eta,elapsed,fragment_index,fragment_count"
+    )
+
+    phase: str
+    status: str
+    downloaded_bytes: Optional[int] = None
+    total_bytes: Optional[int] = None
+    total_is_estimate: bool = False
+    speed: Optional[float] = None
+    eta: Optional[float] = None
+    elapsed: Optional[float] = None
+    fragment_index: Optional[int] = None
+    fragment_count: Optional[int] = None
+    postprocessor: Optional[str] = None
+
+    @classmethod
+    def template_args(cls) -> list:
+        """yt-dlp arguments that print one JSON progress line per report."""
+        return [
+            '--newline',
+            '--progress-template', f"download:{cls.PREFIX}download %(progress.{{{cls._DOWNLOAD_FIELDS}}})j",
+            '--progress-template', f"postprocess:{cls.PREFIX}postprocess %(progress.{{status,postprocessor}})j",
+        ]
+
+    @classmethod
+    def parse(cls, line: str) -> Optional["ProgressEvent"]:
+        """Return the event printed on ``line``, or ``None`` for other output."""
+        if not line.startswith(cls.PREFIX):
+            return None
+        phase, _, payload = line[len(cls.PREFIX):].strip().partition(" ")
+        try:
+            status = json.loads(payload)
+        except ValueError:
+            return None
+        if not isinstance(status, dict):
+            return None
+        return cls.from_status(phase, status)
+
+    @classmethod
+    def from_status(cls, phase: str, status: dict) -> "ProgressEvent":
+        """Build an event from a yt-dlp progress hook dictionary."""
+        def number(key):
+            value = status.get(key)
+            return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+        total_bytes = number("total_bytes")
+        estimated_total = number("total_bytes_estimate")
+        return cls(
+            phase=phase,
+            status=str(status.get("status") or ""),
+            downloaded_bytes=number("downloaded_bytes"),
+            total_bytes=total_bytes if total_bytes is not None else estimated_total,
+            total_is_estimate=total_bytes is None and estimated_total is not None,
+            speed=number("speed"),
+            eta=number("eta"),
+            elapsed=number("elapsed"),
+            fragment_index=number("fragment_index"),
+            fragment_count=number("fragment_count"),
+            postprocessor=status.get("postprocessor") if isinstance(status.get("postprocessor"), str) else None,
+        )
+
+    @property
+    def fraction(self) -> Optional[float]:
+        """Completed share of the current file, from 0.0 to 1.0, if known."""
+        if self.downloaded_bytes is None or not self.total_bytes:
+            return None
+        return min(1.0, self.downloaded_bytes / self.total_bytes)
+
+    @staticmethod
+    def format_bytes(value: Optional[float]) -> str:
+        if value is None:
+            return "N/A"
+        for unit in ("B", "KiB", "MiB", "GiB"):
+            if abs(value) < 1024 or unit == "GiB":
+                return f"{value:.2f}{unit}" if unit != "B" else f"{int(value)}B"
+            value /= 1024
+        return "N/A"
+
+    @staticmethod
+    def format_eta(seconds: Optional[float]) -> str:
+        if seconds is None:
+            return "--:--"
+        minutes, seconds = divmod(int(seconds), 60)
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+    def describe(self) -> str:
+        """Return a console line similar to yt-dlp's own progress output."""
+        if self.phase == "postprocess":
+            return f"[postprocess] {self.postprocessor or 'Postprocessor'}: {self.status}"
+        if self.status != "downloading":
+            return f"[download] {self.status}: {self.format_bytes(self.downloaded_bytes or self.total_bytes)}"
+        fraction = self.fraction
+        percent = f"{fraction * 100:5.1f}%" if fraction is not None else "  N/A%"
+        total = f"{'~' if self.total_is_estimate else ''}{self.format_bytes(self.total_bytes)}"
+        line = (
+            f"[download] {percent} of {total} at {self.format_bytes(self.speed)}/s "
+            f"ETA {self.format_eta(self.eta)}"
+        )
+        if self.fragment_index is not None and self.fragment_count:
+            line += f" (frag {self.fragment_index}/{self.fragment_count})"
+        return line
+
+
+class CancelEvent(threading.Event):
+    """A ``threading.Event`` that also notifies listeners when it is set.
+
+    The subprocess supervisor registers a listener so a running job is
+    terminated as soon as cancellation is requested.  A plain
+    ``threading.Event`` still works; it is checked a few times per second.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._listeners: List[Callable[[], None]] = []
+        self._listeners_lock = threading.Lock()
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        with self._listeners_lock:
+            self._listeners.append(listener)
+        if self.is_set():
+            listener()
+
+    def remove_listener(self, listener: Callable[[], None]) -> None:
+        with self._listeners_lock:
+            try:
+                self._listeners.remove(listener)
+            except ValueError:
+                pass
+
+    def set(self) -> None:
+        super().set()
+        with self._listeners_lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener()
+            except Exception:
+                logging.error("Cancellation listener failed.\n%s", traceback.format_exc())
+
+
+class _SubprocessSupervisor:
+    """Run every yt-dlp child process on one shared event-loop thread.
+
+    Pipes are read in binary chunks and decoded incrementally, heartbeats
+    and cancellation checks are loop timers, so the number of threads does
+    not grow with the number of concurrent jobs.  Windows uses the Proactor
+    loop, which is the one that supports subprocess pipes there.  (On POSIX,
+    asyncio's default child watcher may still add a waitpid thread per child.)
+    """
+    _CHUNK_SIZE = 64 * 1024
+    # How often a plain threading.Event is checked for cancellation.
+    _CANCEL_POLL_SECONDS = 0.25
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        import asyncio
+
+        self._asyncio = asyncio
+        if platform.system() == "Windows":
+            self._loop = asyncio.ProactorEventLoop()
+        else:
+            self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run_loop, name="ytdl-subprocess-supervisor", daemon=True
+        )
+        self._thread.start()
+
+    @classmethod
+    def instance(cls) -> "_SubprocessSupervisor":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def _run_loop(self) -> None:
+        self._asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def run(
+        self,
+        args: list,
+        capture: OutputCapture,
+        cancel_event: Optional[threading.Event],
+        line_callback: Optional[Callable[[str], None]],
+        progress_callback: Optional[Callable[[ProgressEvent], None]] = None,
+    ) -> int:
+        """Run ``args`` to completion and return its exit code.
+
+        Blocks the calling thread only.  The pipes are drained on the
+        supervisor thread, but ``line_callback`` and ``progress_callback``
+        are queued and called here, on the calling thread, so a slow
+        handler (parsing an info JSON, writing the queue database) delays
+        only its own job and never the output of the others.
+        """
+        events = queue.Queue()
+
+        def deliver(callback, failure):
+            if callback is None:
+                return None
+            return lambda value: events.put((callback, value, failure))
+
+        future = self._asyncio.run_coroutine_threadsafe(
+            self.supervise(
+                args,
+                capture,
+                cancel_event,
+                deliver(line_callback, "Subprocess line handler failed."),
+                deliver(progress_callback, "Progress handler failed."),
+            ),
+            self._loop,
+        )
+        future.add_done_callback(lambda _: events.put(None))
+        try:
+            while True:
+                try:
+                    # A timeout keeps the wait interruptible by Ctrl+C on Windows.
+                    event = events.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                if event is None:
+                    break
+                callback, value, failure = event
+                try:
+                    callback(value)
+                except Exception:
+                    logging.error("%s\n%s", failure, traceback.format_exc())
+            return future.result()
+        except BaseException:
+            # KeyboardInterrupt in the caller: cancelling the task terminates
+            # the child process tree.
+            future.cancel()
+            raise
+
+    @classmethod
+    async def supervise(
+        cls,
+        args: list,
+        capture: OutputCapture,
+        cancel_event: Optional[threading.Event],
+        line_callback: Optional[Callable[[str], None]],
+        progress_callback: Optional[Callable[[ProgressEvent], None]] = None,
+    ) -> int:
+        """Run ``args`` on the running event loop and return its exit code.
+
+        Cancelling the awaiting task terminates the child process tree.
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        # stdin must not be inherited from a GUI/worker process. yt-dlp
+        # launches FFmpeg for post-processing, and FFmpeg may otherwise
+        # wait on an inherited console input handle.
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        started_at = time.monotonic()
+        last_output_at = started_at
+        last_output_line = ""
+        logging.info(f"Started subprocess PID {process.pid}: {subprocess.list2cmdline(args)}")
+
+        def emit(line: str, output_file) -> None:
+            nonlocal last_output_at, last_output_line
+            line = SubprocessRunner.handle_progress_line(line, progress_callback)
+            capture.append(line)
+            last_output_at = time.monotonic()
+            last_output_line = line.strip()
+            if line_callback is not None:
+                # An exception here must not stop this job's output from
+                # being drained, for the same reason as below.
+                try:
+                    line_callback(line)
+                except Exception:
+                    logging.error("Subprocess line handler failed.\n%s", traceback.format_exc())
+            if '[debug]' not in line and output_file is not None:
+                # Console output is best-effort. Never let an absent,
+                # disconnected, or legacy-encoded Windows console stop
+                # draining this pipe. A UnicodeEncodeError otherwise
+                # fills the pipe and makes yt-dlp/FFmpeg look frozen in
+                # a postprocessor.
+                try:
+                    print(line.strip(), file=output_file)
+                except (AttributeError, OSError, ValueError, UnicodeEncodeError):
+                    logging.debug("Subprocess console stream is unavailable; continuing to drain output.")
+
+        async def drain(stream, output_file) -> None:
+            # Universal newlines, as in text-mode pipes: yt-dlp redraws its
+            # progress line with a bare "\r".
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+            pending = ""
+            while True:
+                chunk = await stream.read(cls._CHUNK_SIZE)
+                pending += decoder.decode(chunk, final=not chunk)
+                held = ""
+                if chunk and pending.endswith("\r"):
+                    # The matching "\n" may start the next chunk.
+                    pending, held = pending[:-1], "\r"
+                *lines, pending = pending.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+                for line in lines:
+                    emit(f"{line}\n", output_file)
+                pending += held
+                if not chunk:
+                    break
+            if pending:
+                emit(pending, output_file)
+
+        def heartbeat() -> None:
+            nonlocal heartbeat_handle
+            now = time.monotonic()
+            logging.warning(
+                "Subprocess heartbeat: PID %s is still running after %ss; "
+                "no output for %ss. Last output: %s",
+                process.pid,
+                int(now - started_at),
+                int(now - last_output_at),
+                last_output_line or "(none)",
+            )
+            heartbeat_handle = loop.call_later(Config.SUBPROCESS_HEARTBEAT_SECONDS, heartbeat)
+
+        cancellation_requested = False
+
+        def request_cancel() -> None:
+            nonlocal cancellation_requested
+            if cancellation_requested or process.returncode is not None:
+                return
+            cancellation_requested = True
+            logging.info("Cancellation requested for subprocess PID %s.", process.pid)
+            # taskkill may take a moment; keep it off the loop thread.
+            loop.run_in_executor(None, SubprocessRunner._terminate_process_tree, process)
+
+        def notify_cancel() -> None:
+            loop.call_soon_threadsafe(request_cancel)
+
+        def poll_cancel() -> None:
+            nonlocal poll_handle
+            if cancel_event.is_set():
+                request_cancel()
+            else:
+                poll_handle = loop.call_later(cls._CANCEL_POLL_SECONDS, poll_cancel)
+
+        heartbeat_handle = loop.call_later(Config.SUBPROCESS_HEARTBEAT_SECONDS, heartbeat)
+        poll_handle = None
+        if isinstance(cancel_event, CancelEvent):
+            cancel_event.add_listener(notify_cancel)
+        elif cancel_event is not None:
+            poll_cancel()
+        try:
+            await asyncio.gather(
+                drain(process.stdout, sys.stdout),
+                drain(process.stderr, sys.stderr),
+                process.wait(),
+            )
+        except asyncio.CancelledError:
+            try:
+                # taskkill may take up to 15s; the loop keeps serving the
+                # other jobs meanwhile.
+                await loop.run_in_executor(None, SubprocessRunner._terminate_process_tree, process)
+                # Reap the child so its transport is closed on this loop.
+                await asyncio.wait_for(process.wait(), timeout=15)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                pass
+            raise
+        finally:
+            heartbeat_handle.cancel()
+            if poll_handle is not None:
+                poll_handle.cancel()
+            if isinstance(cancel_event, CancelEvent):
+                cancel_event.remove_listener(notify_cancel)
+        logging.info(f"Subprocess PID {process.pid} exited with code {process.returncode} after {int(time.monotonic() - started_at)}s")
+        return process.returncode
+
+
 class SubprocessRunner:
     @staticmethod
-    def _terminate_process_tree(process: subprocess.Popen) -> None:
-        """Terminate yt-dlp and its FFmpeg children after a user cancellation."""
-        if process.poll() is not None:
+    def _terminate_process_tree(process) -> None:
+        """Terminate yt-dlp and its FFmpeg children after a user cancellation.
+
+        ``process`` is a ``subprocess.Popen`` or an asyncio ``Process``.
+        """
+        if process.returncode is not None:
             return
         try:
             if platform.system() == "Windows":
@@ -582,184 +1223,576 @@ class SubprocessRunner:
         args: list,
         context: dict = None,
         cancel_event: Optional[threading.Event] = None,
+        line_callback: Optional[Callable[[str], None]] = None,
+        progress_callback: Optional[Callable[[ProgressEvent], None]] = None,
     ) -> Tuple[int, str]:
+        """Run ``args`` and return ``(returncode, full_log)``.
+
+        The process is supervised by the shared ``_SubprocessSupervisor``;
+        ``line_callback`` receives each output line on the calling thread,
+        then ``""`` once the output is complete.  ``progress_callback`` receives
+        a ``ProgressEvent`` for each ``ProgressEvent.template_args`` line.
+        """
         if context is None:
             context = {}
-        process = None
+        capture = None
         try:
-            # stdin must not be inherited from a GUI/worker process. yt-dlp
-            # launches FFmpeg for post-processing, and FFmpeg may otherwise
-            # wait on an inherited console input handle.
-            process = subprocess.Popen(
-                args,
-                stdin=subprocess.DEVNULL,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                encoding='utf-8',
-                errors='ignore',
-                bufsize=1,
+            capture = OutputCapture()
+            returncode = _SubprocessSupervisor.instance().run(
+                args, capture, cancel_event, line_callback, progress_callback
             )
-            started_at = time.monotonic()
-            last_output_at = started_at
-            last_output_line = ""
-            output_lock = threading.Lock()
-            logging.info(f"Started subprocess PID {process.pid}: {subprocess.list2cmdline(args)}")
-
-            stdout_lines = []
-            stderr_lines = []
-
-            def stream_reader(stream, line_list, output_file):
-                nonlocal last_output_at, last_output_line
-                for line in iter(stream.readline, ''):
-                    line_list.append(line)
-                    with output_lock:
-                        last_output_at = time.monotonic()
-                        last_output_line = line.strip()
-                    if '[debug]' not in line and output_file is not None:
-                        # Console output is best-effort. Never let an absent,
-                        # disconnected, or legacy-encoded Windows console stop
-                        # draining this pipe. A UnicodeEncodeError otherwise
-                        # terminates this reader, fills the pipe, and makes
-                        # yt-dlp/FFmpeg look frozen in a postprocessor.
-                        try:
-                            print(line.strip(), file=output_file)
-                        except (AttributeError, OSError, ValueError, UnicodeEncodeError):
-                            logging.debug("Subprocess console stream is unavailable; continuing to drain output.")
-                stream.close()
-
-            stdout_thread = threading.Thread(target=stream_reader, args=(process.stdout, stdout_lines, sys.stdout), daemon=True)
-            stderr_thread = threading.Thread(target=stream_reader, args=(process.stderr, stderr_lines, sys.stderr), daemon=True)
-
-            stdout_thread.start()
-            stderr_thread.start()
-            next_heartbeat_at = started_at + Config.SUBPROCESS_HEARTBEAT_SECONDS
-            cancellation_requested = False
-            while process.poll() is None:
-                if cancel_event is not None and cancel_event.is_set() and not cancellation_requested:
-                    logging.info("Cancellation requested for subprocess PID %s.", process.pid)
-                    SubprocessRunner._terminate_process_tree(process)
-                    cancellation_requested = True
-                time.sleep(0.25)
-                now = time.monotonic()
-                if now >= next_heartbeat_at:
-                    with output_lock:
-                        idle_seconds = int(now - last_output_at)
-                        latest_line = last_output_line
-                    logging.warning(
-                        "Subprocess heartbeat: PID %s is still running after %ss; "
-                        "no output for %ss. Last output: %s",
-                        process.pid,
-                        int(now - started_at),
-                        idle_seconds,
-                        latest_line or "(none)",
-                    )
-                    next_heartbeat_at = now + Config.SUBPROCESS_HEARTBEAT_SECONDS
-
-            stdout_thread.join()
-            stderr_thread.join()
+            if line_callback is not None:
+                try:
+                    line_callback("")
+                except Exception:
+                    logging.error("Subprocess line handler failed.\n%s", traceback.format_exc())
 
-            full_log = "".join(stdout_lines) + "".join(stderr_lines)
-            logging.info(f"Subprocess PID {process.pid} exited with code {process.returncode} after {int(time.monotonic() - started_at)}s")
-            return process.returncode, full_log
+            # A failed job keeps its complete transcript for diagnostics.
+            return returncode, capture.finish(keep=returncode != 0)
         except KeyboardInterrupt:
             logging.warning("Process interrupted by user.")
-            if process is not None:
+            return -1, "Interrupted by user"
+        except Exception as e:
+            return SubprocessRunner._report_run_exception(args, context, e)
+        finally:
+            if capture is not None:
+                capture.close()
+
+    @staticmethod
+    async def run_async(
+        args: list,
+        context: dict = None,
+        line_callback: Optional[Callable[[str], None]] = None,
+        progress_callback: Optional[Callable[[ProgressEvent], None]] = None,
+    ) -> Tuple[int, str]:
+        """Coroutine version of ``run`` on the caller's event loop.
+
+        Cancel the awaiting task to stop the job.  On Windows the loop must
+        be a Proactor loop, which is asyncio's default there.
+        """
+        if context is None:
+            context = {}
+        capture = None
+        try:
+            capture = OutputCapture()
+            returncode = await _SubprocessSupervisor.supervise(
+                args, capture, None, line_callback, progress_callback
+            )
+            if line_callback is not None:
                 try:
-                    process.terminate()
+                    line_callback("")
                 except Exception:
-                    pass
-            return -1, "Interrupted by user"
-        except FileNotFoundError:
+                    logging.error("Subprocess line handler failed.\n%s", traceback.format_exc())
+            return returncode, capture.finish(keep=returncode != 0)
+        except Exception as e:
+            return SubprocessRunner._report_run_exception(args, context, e)
+        finally:
+            if capture is not None:
+                capture.close()
+
+    @staticmethod
+    def handle_progress_line(
+        line: str,
+        progress_callback: Optional[Callable[[ProgressEvent], None]],
+    ) -> str:
+        """Report a JSON progress line and return the text to log in its place."""
+        event = ProgressEvent.parse(line)
+        if event is None:
+            return line
+        if progress_callback is not None:
+            try:
+                progress_callback(event)
+            except Exception:
+                logging.error("Progress handler failed.\n%s", traceback.format_exc())
+        return f"{event.describe()}\n"
+
+    @staticmethod
+    def _report_run_exception(args: list, context: dict, exception: Exception) -> Tuple[int, str]:
+        if isinstance(exception, FileNotFoundError):
             error_msg = f"Executable not found: {args[0] if args else 'N/A'}. Ensure it is installed and in PATH."
             Logger.report_error(error_msg, ctx=ErrorContext(
                 operation="Run external downloader", exception=SubprocessError(error_msg), extra=context))
             return -1, error_msg
-        except Exception as e:
-            Logger.report_error(f"An unexpected error occurred during subprocess execution.", ctx=ErrorContext(
-                operation="Run external downloader", traceback_str=traceback.format_exc(), exception=SubprocessError(str(e)), extra=context))
-            return -1, traceback.format_exc()
+        Logger.report_error(f"An unexpected error occurred during subprocess execution.", ctx=ErrorContext(
+            operation="Run external downloader", traceback_str=traceback.format_exc(), exception=SubprocessError(str(exception)), extra=context))
+        return -1, traceback.format_exc()
+
+    @staticmethod
+    def iter_log_lines(log_text: str) -> Iterator[str]:
+        """Yield the lines of a job log, from its transcript file when it has one."""
+        log_path = getattr(log_text, "log_path", "")
+        if log_path:
+            try:
+                log_file = open(log_path, "r", encoding="utf-8", errors="replace")
+            except OSError:
+                log_file = None
+            if log_file is not None:
+                with log_file:
+                    for line in log_file:
+                        yield line.rstrip("\r\n")
+                return
+        yield from log_text.splitlines()
 
     @staticmethod
     def extract_yt_dlp_error(log_text: str) -> str:
-        if not log_text:
+        if not log_text and not getattr(log_text, "log_path", ""):
             return "Unknown Error (No Log)"
         ansi_escape = re.compile(r'\x1b\[[0-9;]*m')
-        for line in log_text.splitlines():
+        last_line = ""
+        for line in SubprocessRunner.iter_log_lines(log_text):
             clean_line = ansi_escape.sub('', line).strip()
             if clean_line.startswith("ERROR:"):
                 return clean_line
-        lines = [ansi_escape.sub('', l).strip() for l in log_text.splitlines() if l.strip()]
-        return lines[-1] if lines else "Unknown Error"
+            if clean_line:
+                last_line = clean_line
+        return last_line or "Unknown Error"
+
+class SubprocessEngine:
+    """Run each yt-dlp job as a separate ``Config.EXECUTABLE`` process."""
+    name = "subprocess"
+    # --limit-rate is fixed once the executable has started.
+    live_rate_limit = False
+    _version_cache: ClassVar[Dict[Tuple[str, float], Optional[str]]] = {}
+
+    def version(self) -> Optional[str]:
+        """Return the executable's ``--version``, cached until the file changes."""
+        try:
+            key = (Config.EXECUTABLE, os.path.getmtime(Config.EXECUTABLE))
+        except OSError:
+            return None
+        if key not in self._version_cache:
+            try:
+                result = subprocess.run(
+                    [Config.EXECUTABLE, "--version"],
+                    check=False,
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                    encoding="utf-8",
+                    errors="replace",
+                    timeout=10,
+                )
+                version = result.stdout.strip() if result.returncode == 0 else ""
+            except (OSError, subprocess.SubprocessError):
+                version = ""
+            self._version_cache[key] = version.splitlines()[0] if version else None
+        return self._version_cache[key]
 
+    def run(
+        self,
+        args: list,
+        context: dict = None,
+        cancel_event: Optional[threading.Event] = None,
+        line_callback: Optional[Callable[[str], None]] = None,
+        progress_callback: Optional[Callable[[ProgressEvent], None]] = None,
+        rate_limit: Optional[Callable[[], Optional[int]]] = None,
+    ) -> Tuple[int, str]:
+        return SubprocessRunner.run(
+            args, context, cancel_event=cancel_event, line_callback=line_callback,
+            progress_callback=progress_callback,
+        )
 
-class PreferredFormatSelector:
-    """Choose a video/audio pair using the application's format policy.
+    async def run_async(
+        self,
+        args: list,
+        context: dict = None,
+        line_callback: Optional[Callable[[str], None]] = None,
+        progress_callback: Optional[Callable[[ProgressEvent], None]] = None,
+        rate_limit: Optional[Callable[[], Optional[int]]] = None,
+    ) -> Tuple[int, str]:
+        return await SubprocessRunner.run_async(
+            args, context, line_callback=line_callback, progress_callback=progress_callback
+        )
 
-    yt-dlp's ``-S`` option cannot express a custom order for repeated codec
-    fields.  The selector therefore resolves the pair from the metadata's
-    format list and passes the resulting format IDs back to yt-dlp.
-    """
 
-    _CODEC_PRIORITY = {
-        "vp9": 3,
-        "avc": 2,
-        "av1": 1,
-    }
-    _REQUIRED_AUDIO_CODEC = {
-        "vp9": "opus",
-        "avc": "mp4a",
-        "av1": "opus",
-    }
-    _HDR_PRIORITY = {
-        "DV": -1,  # Preserve yt-dlp's hdr:12 compatibility preference.
-        "SDR": 0,
-        "HLG": 1,
-        "HDR10": 2,
-        "HDR10+": 3,
-        "HDR12": 4,
-    }
-    _PROTOCOL_PRIORITY = {
-        "https": 5,
-        "ftps": 5,
-        "http": 4,
-        "ftp": 4,
-        "m3u8_native": 3,
-        "m3u8": 2,
-        "http_dash_segments": 1,
-    }
+class _InProcessLogger:
+    """Collect yt-dlp messages in the same shape as the executable's output."""
+
+    def __init__(
+        self,
+        line_callback: Optional[Callable[[str], None]] = None,
+        progress_callback: Optional[Callable[[ProgressEvent], None]] = None,
+    ):
+        self._line_callback = line_callback
+        self._progress_callback = progress_callback
+        self._capture = OutputCapture()
+        self._lock = threading.Lock()
+
+    def _emit(self, message: str, output_file) -> None:
+        for line in str(message).splitlines() or [""]:
+            line = SubprocessRunner.handle_progress_line(line, self._progress_callback).rstrip("\n")
+            with self._lock:
+                self._capture.append(f"{line}\n")
+                if self._line_callback is not None:
+                    try:
+                        self._line_callback(f"{line}\n")
+                    except Exception:
+                        logging.error("yt-dlp line handler failed.\n%s", traceback.format_exc())
+            if not line.startswith("[debug]") and output_file is not None:
+                try:
+                    print(line, file=output_file)
+                except (AttributeError, OSError, ValueError, UnicodeEncodeError):
+                    pass
 
-    @classmethod
-    def select(cls, formats: Any) -> Optional[str]:
-        """Return ``video_id+audio_id`` for the preferred matching pair.
+    def debug(self, message: str) -> None:
+        # yt-dlp routes both screen and debug messages through debug().
+        self._emit(message, sys.stdout)
 
-        The order is resolution, FPS, dynamic range, codec family, and
-        transport.  Codec family only participates after the visual
-        properties are tied: VP9+Opus, then AVC+M4A, then AV1+Opus.
-        """
-        if not isinstance(formats, list):
-            return None
+    def info(self, message: str) -> None:
+        self._emit(message, sys.stdout)
 
-        video_formats = [fmt for fmt in formats if cls._is_video_only(fmt)]
-        audio_formats = [fmt for fmt in formats if cls._is_audio_only(fmt)]
-        candidates = []
-        for video in video_formats:
-            family = cls._video_family(video)
-            if family is None:
-                continue
-            matching_audio = [
-                audio for audio in audio_formats
-                if cls._matches_required_audio(audio, family)
-            ]
-            if not matching_audio:
-                continue
-            audio = max(matching_audio, key=cls._audio_sort_key)
-            candidates.append((video, audio, family))
+    def warning(self, message: str) -> None:
+        message = str(message)
+        self._emit(message if message.startswith("WARNING:") else f"WARNING: {message}", sys.stderr)
 
-        if not candidates:
+    def error(self, message: str) -> None:
+        message = str(message)
+        self._emit(message if message.startswith("ERROR:") else f"ERROR: {message}", sys.stderr)
+
+    def finish(self, keep: bool) -> CapturedOutput:
+        with self._lock:
+            return self._capture.finish(keep)
+
+    def close(self) -> None:
+        self._capture.close()
+
+
+class InProcessEngine:
+    """Run yt-dlp jobs through ``yt_dlp.YoutubeDL`` inside this interpreter.
+
+    The argument list built for the executable is parsed with yt-dlp's own
+    option parser, so both engines share one argument model and produce a
+    comparable ``(returncode, full_log)`` result.  Each job still gets its
+    own ``YoutubeDL`` because per-job options such as ``--parse-metadata``
+    become postprocessors when it is constructed; the saving is the process
+    start-up and extractor import paid by every executable launch.
+    """
+    name = "in-process"
+    live_rate_limit = True
+
+    @staticmethod
+    def version() -> Optional[str]:
+        try:
+            from yt_dlp.version import __version__ as yt_dlp_version
+        except ImportError:
+            return None
+        return yt_dlp_version
+
+    @staticmethod
+    def is_available() -> bool:
+        try:
+            import yt_dlp  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def run(
+        self,
+        args: list,
+        context: dict = None,
+        cancel_event: Optional[threading.Event] = None,
+        line_callback: Optional[Callable[[str], None]] = None,
+        progress_callback: Optional[Callable[[ProgressEvent], None]] = None,
+        rate_limit: Optional[Callable[[], Optional[int]]] = None,
+    ) -> Tuple[int, str]:
+        """Run one job; ``rate_limit()`` is polled on each progress update
+        and replaces the job's ``ratelimit`` while it runs."""
+        import yt_dlp
+        from yt_dlp.utils import DownloadCancelled
+
+        if context is None:
+            context = {}
+        # Progress arrives as ProgressEvent.template_args lines through the
+        # logger, exactly as from the executable.
+        log = _InProcessLogger(line_callback, progress_callback)
+        started_at = time.monotonic()
+        logging.info("Started in-process yt-dlp job: %s", subprocess.list2cmdline(args))
+
+        ydl = None
+
+        def check_cancelled(*_args, **_kwargs):
+            if cancel_event is not None and cancel_event.is_set():
+                raise DownloadCancelled("Download cancelled.")
+
+        def apply_rate_limit(*_args, **_kwargs):
+            # HTTP downloads read params["ratelimit"] for every block;
+            # fragment downloaders copy it when the download starts.
+            if ydl is not None:
+                ydl.params["ratelimit"] = rate_limit()
+
+        try:
+            try:
+                parsed = yt_dlp.parse_options(list(args[1:]))
+            except SystemExit as e:
+                log.error(f"Invalid yt-dlp arguments (exit code {e.code}).")
+                return 2, log.finish(keep=True)
+
+            ydl_opts = dict(parsed.ydl_opts)
+            ydl_opts["logger"] = log
+            ydl_opts["progress_hooks"] = [*ydl_opts.get("progress_hooks", []), check_cancelled]
+            if rate_limit is not None:
+                ydl_opts["progress_hooks"].append(apply_rate_limit)
+            ydl_opts["postprocessor_hooks"] = [*ydl_opts.get("postprocessor_hooks", []), check_cancelled]
+            user_match_filter = ydl_opts.get("match_filter")
+
+            def match_filter(info_dict, incomplete=False):
+                # Called before each entry is processed, so cancellation also
+                # stops metadata extraction between playlist entries.
+                check_cancelled()
+                if user_match_filter is not None:
+                    return user_match_filter(info_dict, incomplete=incomplete)
+                return None
+
+            ydl_opts["match_filter"] = match_filter
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                info_file = getattr(parsed.options, "load_info_filename", None)
+                if info_file is not None:
+                    returncode = ydl.download_with_info_file(info_file)
+                else:
+                    returncode = ydl.download(parsed.urls)
+        except DownloadCancelled as e:
+            log.info(f"[info] {e}")
+            returncode = 1
+        except yt_dlp.utils.DownloadError:
+            # The error itself has already been logged by yt-dlp.
+            returncode = 1
+        except Exception as e:
+            Logger.report_error("An unexpected error occurred in the in-process yt-dlp engine.", ctx=ErrorContext(
+                operation="Run external downloader", traceback_str=traceback.format_exc(),
+                exception=SubprocessError(str(e)), extra=context))
+            log.close()
+            return -1, traceback.format_exc()
+
+        logging.info(
+            "In-process yt-dlp job exited with code %s after %ss",
+            returncode, int(time.monotonic() - started_at),
+        )
+        return returncode, log.finish(keep=returncode != 0)
+
+    async def run_async(
+        self,
+        args: list,
+        context: dict = None,
+        line_callback: Optional[Callable[[str], None]] = None,
+        progress_callback: Optional[Callable[[ProgressEvent], None]] = None,
+        rate_limit: Optional[Callable[[], Optional[int]]] = None,
+    ) -> Tuple[int, str]:
+        """Run the job on a worker thread; task cancellation stops it.
+
+        ``line_callback``, ``progress_callback`` and ``rate_limit`` are
+        called on that worker thread.
+        """
+        import asyncio
+
+        cancel_event = CancelEvent()
+        try:
+            return await asyncio.to_thread(
+                self.run, args, context, cancel_event, line_callback, progress_callback, rate_limit
+            )
+        except asyncio.CancelledError:
+            cancel_event.set()
+            raise
+
+
+class PreferredFormatSelector:
+    """Choose a video/audio pair using the application's format policy.
+
+    yt-dlp's ``-S`` option cannot express a custom order for repeated codec
+    fields.  The selector therefore resolves the pair from the metadata's
+    format list and passes the resulting format IDs back to yt-dlp.
+    """
+
+    _CODEC_PRIORITY = {
+        "vp9": 3,
+        "avc": 2,
+        "av1": 1,
+    }
+    _REQUIRED_AUDIO_CODEC = {
+        "vp9": "opus",
+        "avc": "mp4a",
+        "av1": "opus",
+    }
+    _HDR_PRIORITY = {
+        "DV": -1,  # Preserve yt-dlp's hdr:12 compatibility preference.
+        "SDR": 0,
+        "HLG": 1,
+        "HDR10": 2,
+        "HDR10+": 3,
+        "HDR12": 4,
+    }
+    _PROTOCOL_PRIORITY = {
+        "https": 5,
+        "ftps": 5,
+        "http": 4,
+        "ftp": 4,
+        "m3u8_native": 3,
+        "m3u8": 2,
+        "http_dash_segments": 1,
+    }
+    _VIDEO_FAMILY_PATTERNS = (
+        ("vp9", re.compile(r"^vp0?9")),
+        ("avc", re.compile(r"^(avc1|avc|h264)")),
+        ("av1", re.compile(r"^(av01|av1)")),
+    )
+    # Every format field the policy reads.  Queue records keep exactly these
+    # fields, and together they identify a format list for memoisation.
+    FORMAT_FIELDS = (
+        "format_id",
+        "format",
+        "format_note",
+        "ext",
+        "protocol",
+        "vcodec",
+        "acodec",
+        "width",
+        "height",
+        "fps",
+        "dynamic_range",
+        "audio_channels",
+        "asr",
+        "abr",
+    )
+    # Videos of one playlist usually share an itag layout, so a small memo
+    # answers most of a batch without re-ranking.
+    _MEMO_SIZE = 256
+    _memo: "OrderedDict[tuple, Optional[str]]" = OrderedDict()
+    _memo_lock = threading.Lock()
+
+    @classmethod
+    def select(cls, formats: Any) -> Optional[str]:
+        """Return ``video_id+audio_id`` for the preferred matching pair.
+
+        The order is resolution, FPS, dynamic range, codec family, and
+        transport.  Codec family only participates after the visual
+        properties are tied: VP9+Opus, then AVC+M4A, then AV1+Opus.
+        """
+        if not isinstance(formats, list):
+            return None
+        return cls._select_memoised(formats, cls._memo_key(formats))
+
+    @classmethod
+    def family(cls, selected_format: Optional[str], formats: Any) -> str:
+        """Return the codec family of the video half of ``selected_format``.
+
+        ``"fallback"`` stands for yt-dlp's own sorting and ``"unknown"`` for
+        a format list that does not contain the selected video format.
+        """
+        if not selected_format:
+            return "fallback"
+        video = cls.selected_video(selected_format, formats)
+        if video is None:
+            return "unknown"
+        return cls._video_family(video) or "other"
+
+    @classmethod
+    def selected_video(cls, selected_format: Optional[str], formats: Any) -> Optional[dict]:
+        """Return the format entry of the video half of ``selected_format``."""
+        if not selected_format:
+            return None
+        video_id = selected_format.split("+", 1)[0]
+        for fmt in formats if isinstance(formats, list) else ():
+            if isinstance(fmt, dict) and cls._format_id(fmt) == video_id:
+                return fmt
+        return None
+
+    @classmethod
+    def selected_formats(cls, selected_format: Optional[str], formats: Any) -> List[dict]:
+        """Return the format entries named by ``selected_format``, in its order."""
+        by_id = {
+            cls._format_id(fmt): fmt
+            for fmt in (formats if isinstance(formats, list) else ())
+            if isinstance(fmt, dict)
+        }
+        return [by_id[format_id] for format_id in (selected_format or "").split("+") if format_id in by_id]
+
+    @classmethod
+    def select_many(cls, format_lists: Iterable[Any]) -> List[Optional[str]]:
+        """Return ``select`` for each format list of a batch, in order.
+
+        Lists whose ``FORMAT_FIELDS`` values are identical are ranked once
+        per batch, however large the batch is relative to the shared memo.
+        """
+        by_key: Dict[tuple, Optional[str]] = {}
+        selected = []
+        for formats in format_lists:
+            if not isinstance(formats, list):
+                selected.append(None)
+                continue
+            memo_key = cls._memo_key(formats)
+            if memo_key is None:
+                selected.append(cls._select_uncached(formats))
+                continue
+            if memo_key not in by_key:
+                by_key[memo_key] = cls._select_memoised(formats, memo_key)
+            selected.append(by_key[memo_key])
+        return selected
+
+    @classmethod
+    def _memo_key(cls, formats: list) -> Optional[tuple]:
+        key = tuple(
+            tuple(fmt.get(name) for name in cls.FORMAT_FIELDS) if isinstance(fmt, dict) else None
+            for fmt in formats
+        )
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    @classmethod
+    def _select_memoised(cls, formats: list, memo_key: Optional[tuple]) -> Optional[str]:
+        if memo_key is None:
+            return cls._select_uncached(formats)
+        with cls._memo_lock:
+            if memo_key in cls._memo:
+                cls._memo.move_to_end(memo_key)
+                return cls._memo[memo_key]
+
+        selected = cls._select_uncached(formats)
+        with cls._memo_lock:
+            cls._memo[memo_key] = selected
+            cls._memo.move_to_end(memo_key)
+            while len(cls._memo) > cls._MEMO_SIZE:
+                cls._memo.popitem(last=False)
+        return selected
+
+    @classmethod
+    def _select_uncached(cls, formats: list) -> Optional[str]:
+        # Each format is classified once, and the best audio track is ranked
+        # once per required codec rather than once per video format.
+        video_formats = []
+        audio_formats = []
+        for fmt in formats:
+            if cls._is_video_only(fmt):
+                family = cls._video_family(fmt)
+                if family is not None:
+                    video_formats.append((fmt, family))
+            elif cls._is_audio_only(fmt):
+                audio_formats.append(fmt)
+
+        best_audio = {}
+        for required_codec in {cls._REQUIRED_AUDIO_CODEC[family] for _, family in video_formats}:
+            matching_audio = [
+                audio for audio in audio_formats
+                if cls._matches_required_codec(audio, required_codec)
+            ]
+            if matching_audio:
+                keyed_audio = [(cls._audio_sort_key(audio), audio) for audio in matching_audio]
+                best_audio[required_codec] = max(keyed_audio, key=lambda item: item[0])
+
+        candidates = []
+        for video, family in video_formats:
+            best = best_audio.get(cls._REQUIRED_AUDIO_CODEC[family])
+            if best is None:
+                continue
+            audio_key, audio = best
+            candidates.append((cls._pair_sort_key(video, family, audio_key), video, audio))
+
+        if not candidates:
             return None
 
-        video, audio, _ = max(candidates, key=cls._pair_sort_key)
+        _, video, audio = max(candidates, key=lambda candidate: candidate[0])
         video_id = cls._format_id(video)
         audio_id = cls._format_id(audio)
         if not video_id or not audio_id:
@@ -767,15 +1800,25 @@ class PreferredFormatSelector:
         return f"{video_id}+{audio_id}"
 
     @classmethod
-    def _pair_sort_key(cls, candidate: Tuple[dict, dict, str]) -> tuple:
-        video, audio, family = candidate
+    def signature(cls, formats: Any) -> str:
+        """Return a short digest of the format IDs offered by ``formats``.
+
+        A stored selection stays valid while the offered IDs are unchanged.
+        """
+        if not isinstance(formats, list):
+            return ""
+        format_ids = sorted(cls._format_id(fmt) for fmt in formats if isinstance(fmt, dict))
+        return hashlib.sha256("\n".join(format_ids).encode("utf-8")).hexdigest()[:16]
+
+    @classmethod
+    def _pair_sort_key(cls, video: dict, family: str, audio_key: tuple) -> tuple:
         return (
             cls._resolution(video),
             cls._number(video.get("fps")),
             cls._hdr_priority(video),
             cls._CODEC_PRIORITY[family],
             cls._protocol_priority(video),
-            cls._audio_sort_key(audio),
+            audio_key,
             cls._format_id(video),
         )
 
@@ -846,25 +1889,315 @@ class PreferredFormatSelector:
             and str(fmt.get("acodec") or "none").lower() != "none"
         )
 
-    @staticmethod
-    def _video_family(fmt: dict) -> Optional[str]:
+    @classmethod
+    def _video_family(cls, fmt: dict) -> Optional[str]:
         vcodec = str(fmt.get("vcodec") or "").lower()
-        if re.match(r"^vp0?9", vcodec):
-            return "vp9"
-        if re.match(r"^(avc1|avc|h264)", vcodec):
-            return "avc"
-        if re.match(r"^(av01|av1)", vcodec):
-            return "av1"
+        for family, pattern in cls._VIDEO_FAMILY_PATTERNS:
+            if pattern.match(vcodec):
+                return family
         return None
 
     @classmethod
     def _matches_required_audio(cls, audio: dict, family: str) -> bool:
+        return cls._matches_required_codec(audio, cls._REQUIRED_AUDIO_CODEC[family])
+
+    @staticmethod
+    def _matches_required_codec(audio: dict, required_codec: str) -> bool:
         acodec = str(audio.get("acodec") or "").lower()
-        required_codec = cls._REQUIRED_AUDIO_CODEC[family]
         if required_codec == "opus":
             return acodec == "opus"
         return acodec.startswith("mp4a") and str(audio.get("ext") or "").lower() == "m4a"
 
+
+@dataclass(frozen=True)
+class TransferSettings:
+    """Fragment concurrency and HTTP chunk size chosen for one download."""
+    protocol: str
+    host: str
+    concurrent_fragments: int
+    http_chunk_size: int = 0  # bytes; 0 leaves chunking to yt-dlp
+
+    def args(self) -> List[str]:
+        args = ['--concurrent-fragments', str(self.concurrent_fragments)]
+        if self.http_chunk_size:
+            args.extend(['--http-chunk-size', str(self.http_chunk_size)])
+        return args
+
+
+class FragmentTuner:
+    """Adapt fragment concurrency or HTTP chunk size per (protocol, host).
+
+    Fragmented protocols (DASH, HLS) tune ``--concurrent-fragments``;
+    single-file HTTP downloads tune ``--http-chunk-size``, which is what
+    limits them when the server throttles long responses.  Each finished
+    download adds its average speed to an exponentially weighted score of
+    the value it used.  The next download uses the best-scoring value, an
+    untried neighbour of it, or every ``EXPLORE_EVERY`` jobs a neighbour
+    again, so the choice keeps following the link as it speeds up or gets
+    throttled.  Scores persist in ``Config.FRAGMENT_TUNING_FILE``;
+    ``Config.CONCURRENT_FRAGMENTS`` is the starting value for new keys.
+    """
+    FRAGMENT_LADDER: ClassVar[Tuple[int, ...]] = (1, 2, 3, 4, 6, 8, 12, 16)
+    # 0 (no explicit chunking) is treated as the largest chunk.
+    CHUNK_LADDER: ClassVar[Tuple[int, ...]] = (
+        1 << 20, 2 << 20, 5 << 20, 10 << 20, 20 << 20, 0,
+    )
+    FRAGMENTED_PROTOCOLS: ClassVar[frozenset] = frozenset({"dash", "m3u8", "ism", "f4m"})
+    SMOOTHING = 0.3
+    EXPLORE_EVERY = 5
+    # Smaller downloads finish before the transfer settles and are ignored.
+    MIN_SAMPLE_BYTES = 8 << 20
+
+    _lock = threading.Lock()
+    _state: ClassVar[Optional[Dict[str, dict]]] = None
+    _state_path: ClassVar[Optional[str]] = None
+
+    @staticmethod
+    def normalize_protocol(protocol: Optional[str]) -> str:
+        protocol = str(protocol or "").lower()
+        if not protocol:
+            return "unknown"
+        if protocol.startswith("m3u8"):
+            return "m3u8"
+        if protocol in ("http_dash_segments", "dash", "dash_frag_urls"):
+            return "dash"
+        if protocol in ("http", "https"):
+            return "https"
+        return protocol
+
+    @staticmethod
+    def normalize_host(url: Optional[str]) -> str:
+        host = (urlparse(url or "").hostname or "").lower()
+        for prefix in ("www.", "m.", "music."):
+            if host.startswith(prefix):
+                host = host[len(prefix):]
+        return host or "unknown"
+
+    @classmethod
+    def settings_for(cls, protocol: Optional[str], url: Optional[str]) -> TransferSettings:
+        protocol = cls.normalize_protocol(protocol)
+        host = cls.normalize_host(url)
+        with cls._lock:
+            entry = cls._load().get(cls._key(protocol, host))
+        value = entry.get("current") if isinstance(entry, dict) else None
+        if cls._tunes_chunks(protocol):
+            chunk_size = value if value in cls.CHUNK_LADDER else cls.CHUNK_LADDER[-1]
+            return TransferSettings(protocol, host, cls._initial_fragments(), chunk_size)
+        fragments = value if value in cls.FRAGMENT_LADDER else cls._initial_fragments()
+        return TransferSettings(protocol, host, fragments)
+
+    @classmethod
+    def observe(cls, record: dict) -> None:
+        """Update the scores from a finished download's metrics record."""
+        protocol = record.get("protocol")
+        host = record.get("host")
+        speed = record.get("average_speed")
+        if (
+            not protocol or not host or record.get("exit_code") != 0 or not speed
+            # A capped job measures the cap, not the link.
+            or record.get("rate_limit")
+            or (record.get("bytes") or 0) < cls.MIN_SAMPLE_BYTES
+        ):
+            return
+        if cls._tunes_chunks(protocol):
+            ladder, value = cls.CHUNK_LADDER, record.get("http_chunk_size") or 0
+        else:
+            ladder, value = cls.FRAGMENT_LADDER, record.get("concurrent_fragments")
+        if value not in ladder:
+            return
+
+        with cls._lock:
+            state = cls._load()
+            entry = state.get(cls._key(protocol, host))
+            if not isinstance(entry, dict) or not isinstance(entry.get("scores"), dict):
+                entry = state[cls._key(protocol, host)] = {"scores": {}, "jobs": 0}
+            scores = entry["scores"]
+            previous = scores.get(str(value))
+            scores[str(value)] = round(
+                speed if previous is None else previous + cls.SMOOTHING * (speed - previous), 1
+            )
+            entry["jobs"] = int(entry.get("jobs") or 0) + 1
+            entry["current"] = cls._next_value(ladder, scores, entry["jobs"])
+            cls._save(state)
+
+    @classmethod
+    def _next_value(cls, ladder: Tuple[int, ...], scores: Dict[str, float], jobs: int) -> int:
+        tried = [value for value in ladder if str(value) in scores]
+        best = max(tried, key=lambda value: scores[str(value)])
+        index = ladder.index(best)
+        neighbours = [ladder[i] for i in (index + 1, index - 1) if 0 <= i < len(ladder)]
+        for neighbour in neighbours:
+            if str(neighbour) not in scores:
+                return neighbour
+        if jobs % cls.EXPLORE_EVERY == 0:
+            # Alternate directions so both sides are re-measured.
+            return neighbours[(jobs // cls.EXPLORE_EVERY) % len(neighbours)]
+        return best
+
+    @classmethod
+    def _tunes_chunks(cls, protocol: str) -> bool:
+        return protocol == "https"
+
+    @classmethod
+    def _initial_fragments(cls) -> int:
+        try:
+            fragments = int(Config.CONCURRENT_FRAGMENTS)
+        except ValueError:
+            fragments = cls.FRAGMENT_LADDER[1]
+        return min(cls.FRAGMENT_LADDER, key=lambda value: abs(value - fragments))
+
+    @staticmethod
+    def _key(protocol: str, host: str) -> str:
+        return f"{protocol} {host}"
+
+    @classmethod
+    def _load(cls) -> Dict[str, dict]:
+        if cls._state is None or cls._state_path != Config.FRAGMENT_TUNING_FILE:
+            cls._state_path = Config.FRAGMENT_TUNING_FILE
+            try:
+                with open(cls._state_path, "r", encoding="utf-8") as f:
+                    state = json.load(f)
+            except FileNotFoundError:
+                state = {}
+            except (OSError, ValueError) as e:
+                logging.warning("Ignoring unreadable fragment tuning file %s: %s", cls._state_path, e)
+                state = {}
+            cls._state = state if isinstance(state, dict) else {}
+        return cls._state
+
+    @classmethod
+    def _save(cls, state: Dict[str, dict]) -> None:
+        data = json.dumps(state, indent=1, sort_keys=True).encode("utf-8")
+        try:
+            _write_atomically(cls._state_path, lambda f: f.write(data), prefix=".fragment-tuning-")
+        except OSError as e:
+            # Tuning is an optimisation only and must never fail a download.
+            logging.warning("Could not save fragment tuning to %s: %s", cls._state_path, e)
+
+
+class BandwidthLease:
+    """A running download's claim on the shared bandwidth budget."""
+
+    def __init__(self, adjustable: bool):
+        self.adjustable = adjustable
+        # Set when the job starts for jobs whose rate cannot change later.
+        self.fixed_limit: Optional[int] = None
+
+    def limit(self) -> Optional[int]:
+        """Return this job's current rate limit in bytes per second, or ``None``."""
+        return BandwidthGovernor.share(self)
+
+
+class BandwidthGovernor:
+    """Split one download rate budget across the running yt-dlp jobs.
+
+    The budget is the rate of the first ``Config.BANDWIDTH_SCHEDULE``
+    window containing the local time, else ``Config.BANDWIDTH_LIMIT``;
+    ``None`` means unlimited.  Engines that can change a running job's
+    rate (``live_rate_limit``) ask for their share again on each progress
+    update, so it follows jobs starting and finishing and the schedule.
+    A subprocess job's ``--limit-rate`` is fixed when it starts, so it gets
+    the budget divided by the jobs running at that moment, itself included;
+    a job that started alone keeps its larger rate until it ends, and a
+    schedule change reaches subprocess jobs only when they are restarted.
+    Adjustable jobs divide whatever the fixed reservations leave.
+    """
+    MIN_JOB_RATE = 64 << 10
+    _RATE_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+    _lock = threading.Lock()
+    _active: ClassVar[List[BandwidthLease]] = []
+    _parsed_config: ClassVar[Optional[tuple]] = None
+    _parsed: ClassVar[Tuple[Optional[int], List[Tuple[int, int, Optional[int]]]]] = (None, [])
+
+    @classmethod
+    def parse_rate(cls, value: Any) -> Optional[int]:
+        """Parse ``None``, bytes per second or a string such as ``"4M"`` / ``"500KiB"``."""
+        if value is None:
+            return None
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            rate = int(value)
+        else:
+            match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMG]?)(?:i?B)?\s*", str(value), re.IGNORECASE)
+            if not match:
+                raise ValueError(f"Invalid rate: {value!r}")
+            rate = int(float(match.group(1)) * cls._RATE_UNITS[match.group(2).upper()])
+        if rate <= 0:
+            raise ValueError(f"Rate must be positive: {value!r}")
+        return rate
+
+    @staticmethod
+    def _parse_time(value: str) -> int:
+        hours, minutes = str(value).split(":")
+        minute = int(hours) * 60 + int(minutes)
+        if not 0 <= int(minutes) < 60 or not 0 <= minute <= 24 * 60:
+            raise ValueError(f"Invalid time of day: {value!r}")
+        return minute
+
+    @classmethod
+    def _settings(cls) -> Tuple[Optional[int], List[Tuple[int, int, Optional[int]]]]:
+        config = (Config.BANDWIDTH_LIMIT, tuple(Config.BANDWIDTH_SCHEDULE))
+        if config != cls._parsed_config:
+            try:
+                default = cls.parse_rate(Config.BANDWIDTH_LIMIT)
+            except ValueError as e:
+                logging.warning("Ignoring BANDWIDTH_LIMIT: %s", e)
+                default = None
+            windows = []
+            for entry in Config.BANDWIDTH_SCHEDULE:
+                try:
+                    start, end, rate = entry
+                    windows.append((cls._parse_time(start), cls._parse_time(end), cls.parse_rate(rate)))
+                except (TypeError, ValueError) as e:
+                    logging.warning("Ignoring BANDWIDTH_SCHEDULE entry %r: %s", entry, e)
+            cls._parsed_config = config
+            cls._parsed = (default, windows)
+        return cls._parsed
+
+    @classmethod
+    def budget(cls, now: Optional[datetime] = None) -> Optional[int]:
+        """Return the total rate allowed at ``now`` (local time), or ``None``."""
+        now = now or datetime.now()
+        minute = now.hour * 60 + now.minute
+        default, windows = cls._settings()
+        for start, end, rate in windows:
+            # A window whose end is not after its start runs past midnight.
+            if (start <= minute < end) if start < end else (minute >= start or minute < end):
+                return rate
+        return default
+
+    @classmethod
+    @contextmanager
+    def lease(cls, adjustable: bool) -> Iterator[BandwidthLease]:
+        """Hold a share of the budget for the duration of one job."""
+        lease = BandwidthLease(adjustable)
+        with cls._lock:
+            cls._active.append(lease)
+            if not adjustable:
+                budget = cls.budget()
+                if budget is not None:
+                    lease.fixed_limit = max(cls.MIN_JOB_RATE, budget // len(cls._active))
+        try:
+            yield lease
+        finally:
+            with cls._lock:
+                cls._active.remove(lease)
+
+    @classmethod
+    def share(cls, lease: BandwidthLease) -> Optional[int]:
+        if not lease.adjustable:
+            return lease.fixed_limit
+        budget = cls.budget()
+        if budget is None:
+            return None
+        with cls._lock:
+            fixed = [other for other in cls._active if not other.adjustable]
+            adjustable_count = max(1, len(cls._active) - len(fixed))
+            # Fixed jobs started while unlimited are counted at a fixed share.
+            reserved = sum(other.fixed_limit or budget // len(cls._active) for other in fixed)
+        return max(cls.MIN_JOB_RATE, (budget - reserved) // adjustable_count)
+
+
 class Video:
     PRESERVED_METADATA_FIELDS = (
         "playlist",
@@ -879,34 +2212,251 @@ class Video:
         "playlist_count",
     )
 
-    def __init__(self, meta_filepath: str):
+    # The only info JSON fields a queued video keeps in memory.  The format
+    # list is read from the file when the download arguments are built.
+    PROJECTED_FIELDS = (
+        "id",
+        "extractor_key",
+        "title",
+        "webpage_url",
+        "original_url",
+        "playlist_url",
+        *PRESERVED_METADATA_FIELDS,
+    )
+
+    __slots__ = (
+        "meta_filepath",
+        "record",
+        "is_valid",
+        "webpage_url",
+        "playlist",
+        "playlist_id",
+        "playlist_url",
+        "playlist_index",
+        "title",
+        "video_id",
+        "selected_format",
+        "formats_signature",
+        "transfer",
+    )
+
+    def __init__(
+        self,
+        meta_filepath: str,
+        record: Optional[dict] = None,
+        selected_format: Optional[str] = None,
+        formats_signature: Optional[str] = None,
+    ):
+        """Queue one info JSON, using a stored ``record`` instead of the file if given.
+
+        ``selected_format`` is a stored ``PreferredFormatSelector`` decision:
+        ``None`` when it has not been made yet and ``""`` for the fallback.
+        """
         self.meta_filepath = meta_filepath
-        self.meta = self._read_meta()
-        self.is_valid = bool(self.meta)
-        
-        self.webpage_url = self._clean_meta_value(self.meta.get("webpage_url")) or self._clean_meta_value(self.meta.get("original_url"))
-        self.playlist = self._clean_meta_value(self.meta.get("playlist")) or self._clean_meta_value(self.meta.get("playlist_title"))
-        self.playlist_id = self._clean_meta_value(self.meta.get("playlist_id"))
-        self.playlist_url = self._clean_meta_value(self.meta.get("playlist_webpage_url")) or self._clean_meta_value(self.meta.get("playlist_url"))
-        self.playlist_index = self.meta.get("playlist_index")
-        self.title = self.meta.get("title", "N/A")
-        
+        self.selected_format = selected_format
+        self.formats_signature = formats_signature
+        self.record = record if record is not None else self.project(self._read_meta())
+        self.is_valid = bool(self.record)
+
+        self.webpage_url = self._clean_meta_value(self.record.get("webpage_url")) or self._clean_meta_value(self.record.get("original_url"))
+        self.playlist = self._clean_meta_value(self.record.get("playlist")) or self._clean_meta_value(self.record.get("playlist_title"))
+        self.playlist_id = self._clean_meta_value(self.record.get("playlist_id"))
+        self.playlist_url = self._clean_meta_value(self.record.get("playlist_webpage_url")) or self._clean_meta_value(self.record.get("playlist_url"))
+        self.playlist_index = self.record.get("playlist_index")
+        self.title = self.record.get("title", "N/A")
+        self.video_id = self._clean_meta_value(self.record.get("id"))
+        # Set by get_download_args; recorded with the job's metrics.
+        self.transfer: Optional[TransferSettings] = None
+
+    @classmethod
+    def project(cls, meta: dict) -> dict:
+        """Return the subset of an info JSON that a queued video needs."""
+        return {key: meta[key] for key in cls.PROJECTED_FIELDS if key in meta}
+
+    # Format fields read by PreferredFormatSelector; everything else in a
+    # format entry (URLs, fragments, HTTP headers) is dropped from records.
+    RECORD_FORMAT_FIELDS = PreferredFormatSelector.FORMAT_FIELDS
+    RECORD_SUFFIX = ".json.gz"
+    # The info JSON kept for --load-info-json while its format URLs are
+    # valid.  The suffix does not end in ".json", so a new queue store does
+    # not adopt it as a queued video.
+    REUSE_SUFFIX = ".reuse.info"
+    _URL_EXPIRY_RE = re.compile(r"(?:[?&]expire=|/expire/)(\d+)")
+
+    @classmethod
+    def from_info_json(
+        cls,
+        meta_filepath: str,
+        stored_selection: Optional[Callable[[str, str], Optional[str]]] = None,
+        overrides: Optional[dict] = None,
+    ) -> Optional["Video"]:
+        """Queue a freshly written info JSON as a compact, compressed record.
+
+        The record keeps the projected fields and the selector's format
+        fields only.  An entry without a source URL is downloaded with
+        ``--load-info-json``, which needs yt-dlp's complete file, so that
+        file is kept as written.  The format pair is chosen here, unless
+        ``stored_selection(video_id, signature)`` returns an earlier
+        decision for the same format IDs.  ``overrides`` replace fields of
+        the info JSON, such as the playlist fields of an entry resolved on
+        its own.  While the selected format URLs are far from expiring, the
+        info JSON is also kept, trimmed to those formats, so the download
+        can load it instead of extracting the video again.
+        """
+        meta = cls._read_meta_file(meta_filepath)
+        if not meta:
+            return None
+        if overrides:
+            meta = {**meta, **overrides}
+        record = cls.project(meta)
+        formats = meta.get("formats")
+        signature = PreferredFormatSelector.signature(formats)
+        selected_format = None
+        if stored_selection is not None:
+            selected_format = stored_selection(cls._clean_meta_value(record.get("id")), signature)
+        if selected_format is None:
+            selected_format = PreferredFormatSelector.select(formats) or ""
+        record.update(cls.selection_details(selected_format, formats))
+        video = cls(meta_filepath, record, selected_format, signature)
+        if video._loads_info_json():
+            return video
+
+        base_path = meta_filepath[:-len(".info.json")] if meta_filepath.endswith(".info.json") else meta_filepath
+        selected_formats = PreferredFormatSelector.selected_formats(selected_format, formats)
+        expires = cls._url_expiry(selected_formats if selected_format else formats)
+        if expires is not None and expires - Config.INFO_JSON_REUSE_MARGIN > time.time():
+            reuse = {**meta, "formats": selected_formats} if selected_format else meta
+            cls._write_atomically(base_path + cls.REUSE_SUFFIX, json.dumps(reuse, ensure_ascii=False).encode("utf-8"))
+            record["info_json_expires"] = expires
+
+        compact = dict(record)
+        if isinstance(formats, list):
+            compact["formats"] = [
+                {key: fmt[key] for key in cls.RECORD_FORMAT_FIELDS if key in fmt}
+                for fmt in formats
+                if isinstance(fmt, dict)
+            ]
+        record_path = base_path + cls.RECORD_SUFFIX
+        cls._write_atomically(record_path, gzip.compress(
+            json.dumps(compact, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), mtime=0
+        ))
+        os.remove(meta_filepath)
+        return cls(record_path, record, selected_format, signature)
+
+    @staticmethod
+    def selection_details(selected_format: Optional[str], formats: Any) -> dict:
+        """Return the record fields describing a format decision.
+
+        The record does not keep the format list, so the codec family
+        reported in the metrics and the protocol the transfer settings are
+        tuned for are stored when the format is selected.
+        """
+        video = PreferredFormatSelector.selected_video(selected_format, formats)
+        return {
+            "format_family": PreferredFormatSelector.family(selected_format, formats),
+            "format_protocol": video.get("protocol") if video else None,
+        }
+
+    @staticmethod
+    def _write_atomically(path: str, data: bytes) -> None:
+        _write_atomically(path, lambda f: f.write(data), prefix=".record-")
+
+    @classmethod
+    def _url_expiry(cls, formats: Any) -> Optional[int]:
+        """Return when the first of the formats' URLs expires, if all of them say."""
+        expiries = []
+        for fmt in formats if isinstance(formats, list) else ():
+            if not isinstance(fmt, dict):
+                continue
+            found = []
+            for key in ("url", "manifest_url", "fragment_base_url"):
+                match = cls._URL_EXPIRY_RE.search(fmt.get(key) or "")
+                if match:
+                    found.append(int(match.group(1)))
+            if not found:
+                return None
+            expiries.append(min(found))
+        return min(expiries) if expiries else None
+
+    def reuse_path(self) -> str:
+        """Return the path of the info JSON kept for ``--load-info-json``."""
+        path = self.meta_filepath
+        for suffix in (self.RECORD_SUFFIX, ".info.json"):
+            if path.endswith(suffix):
+                path = path[:-len(suffix)]
+                break
+        return path + self.REUSE_SUFFIX
+
+    def remove_files(self) -> None:
+        """Delete the queued info JSON and any copy kept for reuse."""
+        for path in (self.meta_filepath, self.reuse_path()):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _reusable_info_json(self) -> Optional[str]:
+        """Return the kept info JSON if its format URLs are still fresh enough."""
+        expires = self.record.get("info_json_expires")
+        path = self.reuse_path()
+        if not isinstance(expires, (int, float)) or not os.path.isfile(path):
+            return None
+        if expires - Config.INFO_JSON_REUSE_MARGIN <= time.time():
+            logging.info("Stored format URLs expire soon; extracting %s again.", self.title)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return path
+
     def _read_meta(self) -> dict:
+        return self._read_meta_file(self.meta_filepath)
+
+    @staticmethod
+    def _read_meta_file(meta_filepath: str) -> dict:
         try:
-            with open(self.meta_filepath, 'r', encoding='utf-8') as f:
+            if meta_filepath.endswith(".gz"):
+                with gzip.open(meta_filepath, 'rt', encoding='utf-8') as f:
+                    return json.load(f)
+            with open(meta_filepath, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except Exception as e:
-            Logger.report_error(f"Failed to read or parse meta file: {self.meta_filepath}", ctx=ErrorContext(
+            Logger.report_error(f"Failed to read or parse meta file: {meta_filepath}", ctx=ErrorContext(
                 traceback_str=traceback.format_exc(), exception=MetadataError(str(e))))
             return {}
 
-    def get_download_args(self) -> list:
-        # Determine template based on content type
+    def _is_playlist_download(self) -> bool:
         # Check for truthy 'playlist' value; the key often exists with None for single videos
-        is_playlist = bool(self.playlist) or bool(self.playlist_url) or Config.is_playlist_or_channel_url(self.webpage_url)
-        template = self._get_output_template(is_playlist)
+        return bool(self.playlist) or bool(self.playlist_url) or Config.is_playlist_or_channel_url(self.webpage_url)
+
+    def archive_key(self) -> Optional[str]:
+        """Return the ``DownloadArchive`` key of this video."""
+        extractor = self._clean_meta_value(self.record.get("extractor_key"))
+        if not extractor and Config.is_youtube_url(self.webpage_url):
+            extractor = "Youtube"
+        return DownloadArchive.key(extractor, self.video_id)
+
+    def existing_download(self) -> Optional[str]:
+        """Return the merged output file of an earlier download, if present."""
+        if not self.video_id:
+            return None
+        folder = os.path.dirname(self._get_output_template(self._is_playlist_download())).replace('%%', '%')
+        matches = glob.glob(os.path.join(glob.escape(folder), f"*.{glob.escape(self.video_id)}.mkv"))
+        return matches[0] if matches else None
+
+    def get_download_args(self, limit_rate: Optional[int] = None) -> list:
+        # Determine template based on content type
+        template = self._get_output_template(self._is_playlist_download())
         
-        selected_format = PreferredFormatSelector.select(self.meta.get("formats"))
+        selected_format = self.selected_format
+        if selected_format is None:
+            # The format list is often most of the info JSON; it is only
+            # held while the decision for this queue entry is made.
+            formats = self._read_meta().get("formats")
+            selected_format = PreferredFormatSelector.select(formats) or ""
+            self.selected_format = selected_format
+            self.record.update(self.selection_details(selected_format, formats))
         if selected_format:
             format_args = ['-f', selected_format]
             logging.info("Selected preferred format pair: %s", selected_format)
@@ -915,6 +2465,7 @@ class Video:
             # compatible video-only/audio-only pair.
             format_args = ['-f', 'bv+ba', '-S', 'res,fps,hdr:12,proto']
             logging.warning("No preferred codec pair found; falling back to yt-dlp format sorting.")
+        self.transfer = self.transfer_settings()
 
         args = [
             Config.EXECUTABLE,
@@ -927,14 +2478,17 @@ class Video:
             '--merge-output-format', 'mkv',
             '--encoding', 'utf-8',
             '--force-ipv4',
-            '--concurrent-fragments', Config.CONCURRENT_FRAGMENTS,
+            *self.transfer.args(),
+            *(['--limit-rate', str(limit_rate)] if limit_rate else []),
             '--progress-delta', Config.PROGRESS_BAR_SECONDS,
+            *ProgressEvent.template_args(),
             '-o', template,
             '--verbose'
         ]
 
-        if Config.FFMPEG_BINARY:
-            args.extend(['--ffmpeg-location', Config.FFMPEG_BINARY])
+        ffmpeg_binary = Config.ffmpeg_binary()
+        if ffmpeg_binary:
+            args.extend(['--ffmpeg-location', ffmpeg_binary])
 
         source_url = self.webpage_url or self.playlist_url
         if Config.is_youtube_url(source_url):
@@ -955,7 +2509,7 @@ class Video:
     def _get_preserved_metadata_args(self) -> list:
         args = []
         for field in self.PRESERVED_METADATA_FIELDS:
-            value = self.meta.get(field)
+            value = self.record.get(field)
             if self._clean_meta_value(value) == "":
                 continue
             args.extend(['--parse-metadata', f"{self._metadata_constant_source(value)}:%({field})s"])
@@ -979,7 +2533,32 @@ class Video:
         value = str(value).strip()
         return "" if value.upper() == "NA" else value
 
+    def _selection_detail(self, field: str) -> Any:
+        if field not in self.record:
+            # Records queued before the details were stored: the compact
+            # record file still has the format list.
+            self.record.update(self.selection_details(self.selected_format, self._read_meta().get("formats")))
+        return self.record[field]
+
+    def format_family(self) -> str:
+        """Return the codec family of the stored format decision."""
+        return self._selection_detail("format_family")
+
+    def transfer_settings(self) -> TransferSettings:
+        """Return the tuned transfer settings for the selected video format."""
+        return FragmentTuner.settings_for(self._selection_detail("format_protocol"), self.webpage_url)
+
+    def _loads_info_json(self) -> bool:
+        """Return whether the download falls back to ``--load-info-json``."""
+        return not (self.playlist_url and self.playlist_index is not None) and not self.webpage_url
+
     def _get_fresh_source_args(self) -> list:
+        reusable = self._reusable_info_json()
+        if reusable is not None:
+            # yt-dlp extracts from webpage_url itself if the stored URLs fail.
+            logging.info("Reusing the queued info JSON of %s.", self.title)
+            return ['--load-info-json', reusable]
+
         if self.playlist_url and self.playlist_index is not None:
             return ['--playlist-items', str(self.playlist_index), self.playlist_url]
 
@@ -1023,9 +2602,1057 @@ class Video:
             return f"_{value}"
         return value
 
-class YTDLManager:
-    @staticmethod
-    def acquire_queue_lock() -> DownloadQueueLock:
+class _InfoJsonWatcher:
+    """Emit each info JSON as soon as yt-dlp has finished writing it.
+
+    yt-dlp announces an info JSON before writing it and then replaces the
+    target atomically, so a file that exists once a later output line (or
+    the end of output, signalled by an empty line) arrives is complete.
+    """
+    _WRITING_RE = re.compile(r"^\[info\] Writing video metadata as JSON to: (.+?)\s*$")
+
+    def __init__(self, on_info_json: Callable[[str], None]):
+        self._on_info_json = on_info_json
+        self._pending: List[str] = []
+
+    def __call__(self, line: str) -> None:
+        ready = [path for path in self._pending if os.path.isfile(path)]
+        for path in ready:
+            self._pending.remove(path)
+            self._on_info_json(path)
+
+        match = self._WRITING_RE.match(line)
+        if match:
+            self._pending.append(os.path.abspath(match.group(1)))
+
+
+class _EntryResolver:
+    """Extract listed playlist entries on a bounded pool while the listing continues.
+
+    ``submit`` records a video entry in the queue store before handing it
+    to ``resolve(entry_url, name, entry_fields)``, which returns the usual
+    ``(success, error)``.  The record is dropped once the entry is queued or
+    has failed, and kept when the batch is cancelled so that the next
+    session resumes it.  A failed entry does not stop the others.
+    """
+
+    def __init__(
+        self,
+        name_prefix: Optional[str],
+        resolve: Callable[[str, str, dict], Tuple[bool, Optional[str]]],
+        cancel_event: Optional[threading.Event] = None,
+        on_resolved: Optional[Callable[[dict, bool], None]] = None,
+    ):
+        self._name_prefix = name_prefix
+        self._resolve = resolve
+        self._cancel_event = cancel_event
+        self._on_resolved = on_resolved
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, int(Config.CONCURRENT_ENTRY_RESOLUTIONS)),
+            thread_name_prefix="ytdl-entry",
+        )
+        self._futures = []
+        self._lock = threading.Lock()
+        self.failed = 0
+        self.first_error = None
+
+    def __enter__(self) -> "_EntryResolver":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=exc_type is not None)
+
+    @property
+    def submitted(self) -> int:
+        return len(self._futures)
+
+    def _cancelled(self) -> bool:
+        return self._cancel_event is not None and self._cancel_event.is_set()
+
+    def submit(self, entry_url: str, entry_fields: dict, entry: dict) -> None:
+        """Queue ``entry``; tabs and playlists are resolved but not recorded."""
+        name = f"{self._name_prefix}-{self.submitted + 1:05d}"
+        if not Config.is_playlist_or_channel_url(entry_url):
+            YTDLManager.get_queue_store().add_listed(name, entry["id"], entry.get("title"), entry_url, entry_fields)
+        self._futures.append(self._executor.submit(self._run, name, entry_url, entry_fields, entry))
+
+    def resume(self, name: str, entry_url: str, entry_fields: dict) -> None:
+        """Extract an entry recorded by an earlier session."""
+        self._futures.append(self._executor.submit(self._run, name, entry_url, entry_fields, None))
+
+    def _run(self, name: str, entry_url: str, entry_fields: dict, entry: Optional[dict]) -> None:
+        if self._cancelled():
+            return
+        success, error = self._resolve(entry_url, name, entry_fields)
+        if not success and self._cancelled():
+            return
+        YTDLManager.get_queue_store().forget(name)
+        if not success:
+            with self._lock:
+                self.failed += 1
+                if self.first_error is None:
+                    self.first_error = error
+        if self._on_resolved is not None and entry is not None:
+            self._on_resolved(entry, success)
+
+    def wait(self) -> Optional[str]:
+        """Wait for every submitted entry and return the first error."""
+        for future in self._futures:
+            future.result()
+        return self.first_error
+
+
+class _SQLiteStore:
+    """A SQLite database in WAL mode, shared by threads, with a versioned schema.
+
+    Reads hold ``_lock``; writes go through ``_transaction``.  Subclasses set
+    ``_SCHEMA_VERSION`` and implement ``_upgrade``, which brings a database
+    from the stored ``PRAGMA user_version`` up to date inside one transaction.
+    """
+    _SCHEMA_VERSION = 0
+    # Keys per "IN (...)" lookup, well below SQLite's bound parameter limit.
+    _LOOKUP_BATCH = 500
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+
+    @contextmanager
+    def _transaction(self):
+        """Serialize writers and commit or roll back as one transaction."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _migrate(self) -> None:
+        with self._transaction():
+            self._upgrade(self._conn.execute("PRAGMA user_version").fetchone()[0])
+            self._conn.execute(f"PRAGMA user_version = {self._SCHEMA_VERSION}")
+
+    def _upgrade(self, version: int) -> None:
+        raise NotImplementedError
+
+    @classmethod
+    def _batches(cls, values: list) -> Iterator[list]:
+        for start in range(0, len(values), cls._LOOKUP_BATCH):
+            yield values[start:start + cls._LOOKUP_BATCH]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class QueueStore(_SQLiteStore):
+    """SQLite index of the download queue kept in the meta directory.
+
+    Each row points at one info JSON by file name and records the fields
+    needed to report on the queue, its state and the number of attempts.
+    Pending items are read through an index, so resuming a long queue does
+    not list or parse the finished part of it.  Playlist entries that are
+    listed but not yet extracted have no info JSON; they are ``listed``
+    rows named after the file prefix they will be extracted under.
+    """
+    STATE_PENDING = "pending"
+    STATE_LISTED = "listed"
+    STATE_DONE = "done"
+    _SCHEMA_VERSION = 3
+
+    def __init__(self, db_path: str, meta_dir: str):
+        self.meta_dir = meta_dir
+        is_new = not os.path.isfile(db_path)
+        super().__init__(db_path)
+        if is_new:
+            self._import_existing_meta_files()
+
+    def _upgrade(self, version: int) -> None:
+        if version < 1:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS queue_items (
+                    meta_name TEXT PRIMARY KEY,
+                    video_id TEXT,
+                    webpage_url TEXT,
+                    title TEXT,
+                    playlist TEXT,
+                    playlist_id TEXT,
+                    playlist_url TEXT,
+                    playlist_index INTEGER,
+                    state TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    queued_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS queue_items_state ON queue_items (state, meta_name)"
+            )
+        if version < 2:
+            # Projected Video fields, so resuming does not parse info JSON.
+            self._conn.execute("ALTER TABLE queue_items ADD COLUMN record TEXT")
+        if version < 3:
+            # PreferredFormatSelector decision ('' for the fallback) and
+            # the format IDs it was made for.
+            self._conn.execute("ALTER TABLE queue_items ADD COLUMN selected_format TEXT")
+            self._conn.execute("ALTER TABLE queue_items ADD COLUMN formats_signature TEXT")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS queue_items_video ON queue_items (video_id)"
+            )
+
+    def _import_existing_meta_files(self) -> None:
+        """Adopt a queue written before this store existed."""
+        if not os.path.isdir(self.meta_dir):
+            return
+        for name in sorted(os.listdir(self.meta_dir)):
+            if name.endswith((".json", Video.RECORD_SUFFIX)):
+                video = Video(os.path.join(self.meta_dir, name))
+                if video.is_valid:
+                    self.add(video)
+
+    def _meta_name(self, meta_filepath: str) -> str:
+        return os.path.basename(meta_filepath)
+
+    def add(self, video: Video) -> None:
+        """Queue ``video``; re-adding a file resets it to pending."""
+        now = time.time()
+        with self._transaction():
+            self._conn.execute(
+                """
+                INSERT INTO queue_items (
+                    meta_name, video_id, webpage_url, title, playlist, playlist_id,
+                    playlist_url, playlist_index, record, selected_format, formats_signature,
+                    state, queued_at, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (meta_name) DO UPDATE SET
+                    video_id = excluded.video_id,
+                    webpage_url = excluded.webpage_url,
+                    title = excluded.title,
+                    playlist = excluded.playlist,
+                    playlist_id = excluded.playlist_id,
+                    playlist_url = excluded.playlist_url,
+                    playlist_index = excluded.playlist_index,
+                    record = excluded.record,
+                    selected_format = excluded.selected_format,
+                    formats_signature = excluded.formats_signature,
+                    state = excluded.state,
+                    updated_at = excluded.updated_at
+                """,
+                (
+                    self._meta_name(video.meta_filepath),
+                    video.video_id,
+                    video.webpage_url,
+                    video.title,
+                    video.playlist,
+                    video.playlist_id,
+                    video.playlist_url,
+                    video.playlist_index if isinstance(video.playlist_index, int) else None,
+                    json.dumps(video.record, ensure_ascii=False),
+                    video.selected_format,
+                    video.formats_signature,
+                    self.STATE_PENDING,
+                    now,
+                    now,
+                ),
+            )
+
+    def pending_paths(self) -> List[str]:
+        """Return the info JSON paths still waiting for download, in queue order."""
+        return [entry["meta_filepath"] for entry in self.pending_records()]
+
+    def pending_records(self) -> List[Dict[str, Any]]:
+        """Return the stored ``Video`` arguments for pending items, in queue order.
+
+        ``record`` is ``None`` for rows queued before records were stored.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT meta_name, record, selected_format, formats_signature
+                FROM queue_items WHERE state = ? ORDER BY meta_name
+                """,
+                (self.STATE_PENDING,),
+            ).fetchall()
+        return [
+            {
+                "meta_filepath": os.path.join(self.meta_dir, name),
+                "record": json.loads(record) if record else None,
+                "selected_format": selected_format,
+                "formats_signature": formats_signature,
+            }
+            for name, record, selected_format, formats_signature in rows
+        ]
+
+    def stored_format_selection(self, video_id: str, formats_signature: str) -> Optional[str]:
+        """Return an earlier selection for ``video_id`` with the same format IDs."""
+        if not video_id:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT selected_format FROM queue_items
+                WHERE video_id = ? AND formats_signature = ? AND selected_format IS NOT NULL
+                ORDER BY updated_at DESC LIMIT 1
+                """,
+                (video_id, formats_signature),
+            ).fetchone()
+        return row[0] if row else None
+
+    def add_listed(self, name: str, video_id: str, title: Optional[str], entry_url: str, entry_fields: dict) -> None:
+        """Record a playlist entry that is still to be extracted."""
+        now = time.time()
+        with self._transaction():
+            self._conn.execute(
+                """
+                INSERT OR IGNORE INTO queue_items (
+                    meta_name, video_id, webpage_url, title, playlist, playlist_id,
+                    playlist_index, record, state, queued_at, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    name,
+                    video_id,
+                    entry_url,
+                    title,
+                    entry_fields.get("playlist"),
+                    entry_fields.get("playlist_id"),
+                    entry_fields.get("playlist_index") if isinstance(entry_fields.get("playlist_index"), int) else None,
+                    json.dumps(entry_fields, ensure_ascii=False),
+                    self.STATE_LISTED,
+                    now,
+                    now,
+                ),
+            )
+
+    def listed_records(self) -> List[Dict[str, Any]]:
+        """Return the entries still to be extracted, in queue order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT meta_name, webpage_url, record FROM queue_items WHERE state = ? ORDER BY meta_name",
+                (self.STATE_LISTED,),
+            ).fetchall()
+        return [
+            {"name": name, "url": entry_url, "entry_fields": json.loads(record) if record else {}}
+            for name, entry_url, record in rows
+        ]
+
+    def pending_count(self) -> int:
+        """Count queued videos, including entries still to be extracted."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM queue_items WHERE state IN (?, ?)",
+                (self.STATE_PENDING, self.STATE_LISTED),
+            ).fetchone()[0]
+
+    def record_attempt(self, video: Video) -> None:
+        with self._transaction():
+            self._conn.execute(
+                "UPDATE queue_items SET attempts = attempts + 1, updated_at = ? WHERE meta_name = ?",
+                (time.time(), self._meta_name(video.meta_filepath)),
+            )
+
+    def record_failure(self, video: Video, error: str) -> None:
+        with self._transaction():
+            self._conn.execute(
+                "UPDATE queue_items SET last_error = ?, updated_at = ? WHERE meta_name = ?",
+                (error, time.time(), self._meta_name(video.meta_filepath)),
+            )
+
+    def complete(self, video: Video) -> None:
+        """Mark ``video`` done and delete its info JSON in one transaction.
+
+        The state change is rolled back if the file cannot be removed, so a
+        completed item is never left both pending and on disk.
+        """
+        with self._transaction():
+            self._conn.execute(
+                "UPDATE queue_items SET state = ?, last_error = NULL, updated_at = ? WHERE meta_name = ?",
+                (self.STATE_DONE, time.time(), self._meta_name(video.meta_filepath)),
+            )
+            video.remove_files()
+
+    def forget(self, meta_filepath: str) -> None:
+        with self._transaction():
+            self._conn.execute(
+                "DELETE FROM queue_items WHERE meta_name = ?", (self._meta_name(meta_filepath),)
+            )
+
+    def purge_done(self) -> None:
+        with self._transaction():
+            self._conn.execute("DELETE FROM queue_items WHERE state = ?", (self.STATE_DONE,))
+
+    def clear(self) -> None:
+        with self._transaction():
+            self._conn.execute("DELETE FROM queue_items")
+
+
+class DownloadArchive(_SQLiteStore):
+    """SQLite set of completed downloads, keyed like yt-dlp's archive.
+
+    Keys are ``"<extractor> <id>"`` (``"youtube dQw4w9WgXcQ"``) in a
+    ``WITHOUT ROWID`` table, so the key is the B-tree and a lookup touches a
+    few pages even with millions of entries.  yt-dlp only reads plain text
+    archives, so ``yt_dlp_archive_path`` keeps a text copy next to the
+    database for ``--download-archive``; it is appended to with every new
+    key and rebuilt from the database when its size no longer matches.
+    """
+    _SCHEMA_VERSION = 1
+
+    def __init__(self, db_path: str):
+        self.mirror_path = os.path.splitext(db_path)[0] + ".txt"
+        super().__init__(db_path)
+
+    @staticmethod
+    def key(extractor: Optional[str], video_id: Optional[str]) -> Optional[str]:
+        """Return yt-dlp's archive key, or ``None`` when either part is missing."""
+        if not extractor or not video_id:
+            return None
+        return f"{str(extractor).lower()} {video_id}"
+
+    def _upgrade(self, version: int) -> None:
+        if version < 1:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS archive (archive_key TEXT PRIMARY KEY) WITHOUT ROWID"
+            )
+            # Expected size of the text copy; anything else means it is
+            # missing, stale or was edited, and is rebuilt.
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS archive_state (name TEXT PRIMARY KEY, value INTEGER) WITHOUT ROWID"
+            )
+
+    def __contains__(self, archive_key: Optional[str]) -> bool:
+        if not archive_key:
+            return False
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM archive WHERE archive_key = ?", (archive_key,)
+            ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT count(*) FROM archive").fetchone()[0]
+
+    def known(self, archive_keys: Iterable[str]) -> set:
+        """Return the subset of ``archive_keys`` that is archived."""
+        keys = list(dict.fromkeys(key for key in archive_keys if key))
+        found = set()
+        with self._lock:
+            for batch in self._batches(keys):
+                found.update(row[0] for row in self._conn.execute(
+                    f"SELECT archive_key FROM archive WHERE archive_key IN ({','.join('?' * len(batch))})",
+                    batch,
+                ))
+        return found
+
+    def add(self, archive_key: Optional[str]) -> bool:
+        """Archive ``archive_key``; return whether it was new."""
+        if not archive_key:
+            return False
+        with self._transaction():
+            added = self._conn.execute(
+                "INSERT OR IGNORE INTO archive (archive_key) VALUES (?)", (archive_key,)
+            ).rowcount == 1
+            if added:
+                self._append_to_mirror(archive_key)
+        return added
+
+    def _mirror_size(self) -> Optional[int]:
+        row = self._conn.execute("SELECT value FROM archive_state WHERE name = 'mirror_size'").fetchone()
+        return row[0] if row else None
+
+    def _set_mirror_size(self, size: Optional[int]) -> None:
+        if size is None:
+            self._conn.execute("DELETE FROM archive_state WHERE name = 'mirror_size'")
+        else:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO archive_state (name, value) VALUES ('mirror_size', ?)", (size,)
+            )
+
+    def _append_to_mirror(self, archive_key: str) -> None:
+        expected = self._mirror_size()
+        try:
+            if expected is None or os.path.getsize(self.mirror_path) != expected:
+                return  # rebuilt on the next yt_dlp_archive_path call
+            with open(self.mirror_path, "ab") as f:
+                f.write(f"{archive_key}\n".encode("utf-8"))
+                size = f.tell()
+        except OSError:
+            size = None
+        self._set_mirror_size(size)
+
+    def yt_dlp_archive_path(self) -> str:
+        """Return an up-to-date text archive for ``--download-archive``."""
+        with self._transaction():
+            expected = self._mirror_size()
+            try:
+                current = os.path.getsize(self.mirror_path)
+            except OSError:
+                current = None
+            if expected is None or current != expected:
+                self._set_mirror_size(_write_atomically(self.mirror_path, self._write_mirror, prefix=".archive-"))
+        return self.mirror_path
+
+    def _write_mirror(self, f) -> int:
+        for (archive_key,) in self._conn.execute("SELECT archive_key FROM archive"):
+            f.write(f"{archive_key}\n".encode("utf-8"))
+        return f.tell()
+
+
+class FlatPlaylist:
+    """List playlist and channel entries without extracting each video.
+
+    ``args`` runs yt-dlp with ``--flat-playlist --lazy-playlist``, which
+    reads the listing page by page and prints one ``PREFIX`` JSON line per
+    entry as soon as it is known, so the caller can stop the job early.
+    """
+    PREFIX = "[ytdl-entry] "
+    # Copied into each queued entry so a video resolved on its own is still
+    # filed and tagged under its playlist.  The playlist URL is left out:
+    # with it, the download would enumerate the playlist again.
+    QUEUED_FIELDS = (
+        "playlist",
+        "playlist_id",
+        "playlist_title",
+        "playlist_uploader",
+        "playlist_uploader_id",
+        "playlist_channel",
+        "playlist_channel_id",
+        "playlist_index",
+        "playlist_count",
+    )
+    ENTRY_FIELDS = (
+        "id", "url", "ie_key", "title", "upload_date", "timestamp", "availability",
+        "playlist_webpage_url", *QUEUED_FIELDS,
+    )
+
+    @classmethod
+    def args(cls, url: str) -> list:
+        return [
+            Config.EXECUTABLE,
+            '--flat-playlist', '--lazy-playlist',
+            '--print', f"{cls.PREFIX}%(.{{{','.join(cls.ENTRY_FIELDS)}}})j",
+            '--encoding', 'utf-8', '--force-ipv4',
+            url,
+        ]
+
+    @classmethod
+    def parse(cls, line: str) -> Optional[dict]:
+        """Return the entry printed on ``line``, or ``None`` for other output."""
+        if not line.startswith(cls.PREFIX):
+            return None
+        try:
+            entry = json.loads(line[len(cls.PREFIX):])
+        except ValueError:
+            return None
+        return entry if isinstance(entry, dict) and entry.get("id") else None
+
+    @staticmethod
+    def entry_url(entry: dict) -> Optional[str]:
+        url = entry.get("url")
+        if isinstance(url, str) and "://" in url:
+            return url
+        if str(entry.get("ie_key") or "").lower() == "youtube":
+            return f"https://www.youtube.com/watch?v={entry['id']}"
+        return None
+
+    @classmethod
+    def queued_fields(cls, entry: dict) -> dict:
+        return {key: entry[key] for key in cls.QUEUED_FIELDS if entry.get(key) is not None}
+
+
+class SyncCursorStore(_SQLiteStore):
+    """Per-source sync cursors: the entry IDs already queued and the newest upload.
+
+    A source is the URL as submitted.  Entry IDs are kept per source in a
+    ``WITHOUT ROWID`` table, so checking a listing against them costs one
+    index probe per entry.
+    """
+    _SCHEMA_VERSION = 1
+
+    def _upgrade(self, version: int) -> None:
+        if version < 1:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sync_sources (
+                    source TEXT PRIMARY KEY,
+                    newest_id TEXT,
+                    newest_upload TEXT,
+                    synced_at REAL
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sync_entries (
+                    source TEXT NOT NULL,
+                    entry_id TEXT NOT NULL,
+                    PRIMARY KEY (source, entry_id)
+                ) WITHOUT ROWID
+                """
+            )
+
+    def cursor(self, source: str) -> Optional[dict]:
+        """Return the source's last sync, or ``None`` if it was never synced."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT newest_id, newest_upload, synced_at FROM sync_sources WHERE source = ?", (source,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"newest_id": row[0], "newest_upload": row[1], "synced_at": row[2]}
+
+    def known(self, source: str, entry_ids: Iterable[str]) -> set:
+        ids = list(dict.fromkeys(entry_id for entry_id in entry_ids if entry_id))
+        found = set()
+        with self._lock:
+            for batch in self._batches(ids):
+                found.update(row[0] for row in self._conn.execute(
+                    f"SELECT entry_id FROM sync_entries WHERE source = ? AND entry_id IN ({','.join('?' * len(batch))})",
+                    (source, *batch),
+                ))
+        return found
+
+    def mark_known(self, source: str, entry_ids: Iterable[str]) -> None:
+        with self._transaction():
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO sync_entries (source, entry_id) VALUES (?, ?)",
+                ((source, entry_id) for entry_id in entry_ids if entry_id),
+            )
+
+    def update_cursor(self, source: str, newest_id: Optional[str], newest_upload: Optional[str]) -> None:
+        """Record a finished sync; an empty listing keeps the previous newest entry."""
+        with self._transaction():
+            self._conn.execute(
+                """
+                INSERT INTO sync_sources (source, newest_id, newest_upload, synced_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (source) DO UPDATE SET
+                    newest_id = COALESCE(excluded.newest_id, newest_id),
+                    newest_upload = COALESCE(excluded.newest_upload, newest_upload),
+                    synced_at = excluded.synced_at
+                """,
+                (source, newest_id, newest_upload, time.time()),
+            )
+
+
+class JobMetrics:
+    """Timings and transfer figures of one yt-dlp job.
+
+    Fed with the job's output lines and ``ProgressEvent``s; ``record``
+    returns the row appended to the ``MetricsStore``.  Phases are
+    ``extract`` (start-up and extraction until the first transfer),
+    ``download`` and ``postprocess`` (merging, embedding, moving).
+    """
+    KIND_METADATA = "metadata"
+    KIND_DOWNLOAD = "download"
+    _VERSION_RE = re.compile(r"^\[debug\] yt-dlp version (\S+)")
+
+    def __init__(self, kind: str, **fields):
+        self.kind = kind
+        self.fields = fields
+        self.started_at = datetime.now(timezone.utc)
+        self._started = time.monotonic()
+        self._download_started = None
+        self._download_finished = None
+        self._postprocess_started = None
+        self._postprocess_finished = None
+        self._finished_bytes = 0
+        self._current_bytes = 0
+        self._peak_speed = None
+        self._yt_dlp_version = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_video(cls, video: "Video", **fields) -> "JobMetrics":
+        return cls(
+            cls.KIND_DOWNLOAD,
+            video_id=video.video_id,
+            title=video.title,
+            playlist=video.playlist or "",
+            format=video.selected_format or "",
+            format_family=video.format_family(),
+            **(asdict(video.transfer) if video.transfer is not None else {}),
+            **fields,
+        )
+
+    def observe_line(self, line: str) -> None:
+        if self._yt_dlp_version is None:
+            match = self._VERSION_RE.match(line)
+            if match:
+                self._yt_dlp_version = match.group(1)
+
+    def observe_progress(self, event: ProgressEvent) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if event.phase == "postprocess":
+                if self._postprocess_started is None:
+                    self._postprocess_started = now
+                if event.status == "finished":
+                    self._postprocess_finished = now
+                return
+            if self._download_started is None:
+                self._download_started = now
+            if event.speed is not None:
+                self._peak_speed = max(self._peak_speed or 0.0, event.speed)
+            if event.status == "finished":
+                self._finished_bytes += event.downloaded_bytes or event.total_bytes or self._current_bytes
+                self._current_bytes = 0
+                self._download_finished = now
+            elif event.downloaded_bytes is not None:
+                self._current_bytes = event.downloaded_bytes
+
+    def chain_lines(self, line_callback: Optional[Callable[[str], None]]) -> Callable[[str], None]:
+        def on_line(line: str) -> None:
+            self.observe_line(line)
+            if line_callback is not None:
+                line_callback(line)
+        return on_line
+
+    def chain_progress(
+        self, progress_callback: Optional[Callable[[ProgressEvent], None]]
+    ) -> Callable[[ProgressEvent], None]:
+        def on_progress(event: ProgressEvent) -> None:
+            self.observe_progress(event)
+            if progress_callback is not None:
+                progress_callback(event)
+        return on_progress
+
+    def record(self, exit_code: int, error_class: Optional[str] = None, **fields) -> dict:
+        ended = time.monotonic()
+        engine = YTDLManager.get_engine()
+        with self._lock:
+            phases = {}
+            first_activity = self._download_started or self._postprocess_started or ended
+            phases["extract"] = round(first_activity - self._started, 3)
+            if self._download_started is not None:
+                download_end = self._download_finished or self._postprocess_started or ended
+                phases["download"] = round(max(0.0, download_end - self._download_started), 3)
+            if self._postprocess_started is not None:
+                postprocess_end = self._postprocess_finished or ended
+                phases["postprocess"] = round(max(0.0, postprocess_end - self._postprocess_started), 3)
+            transferred = self._finished_bytes + self._current_bytes
+            download_seconds = phases.get("download")
+            return {
+                "kind": self.kind,
+                **self.fields,
+                **fields,
+                "started_at": self.started_at.isoformat(timespec="seconds"),
+                "duration": round(ended - self._started, 3),
+                "phases": phases,
+                "bytes": transferred,
+                "average_speed": round(transferred / download_seconds, 1) if download_seconds else None,
+                "peak_speed": self._peak_speed,
+                "exit_code": exit_code,
+                "error_class": error_class,
+                "engine": engine.name,
+                "yt_dlp_version": self._yt_dlp_version or engine.version(),
+                "app_version": __version__,
+            }
+
+
+class MetricsStore:
+    """Append-only JSON Lines file of ``JobMetrics`` records.
+
+    Records are never rewritten, so the file can be copied or tailed while
+    jobs run; ``report`` summarises it for ``YTDL.py --report``.
+    """
+    GROUPINGS = {
+        "day": lambda record: str(record.get("started_at") or "")[:10] or "(unknown)",
+        "playlist": lambda record: record.get("playlist") or "(single videos)",
+        "format": lambda record: record.get("format_family") or "(unknown)",
+        "yt-dlp": lambda record: record.get("yt_dlp_version") or "(unknown)",
+    }
+    _lock = threading.Lock()
+
+    @staticmethod
+    def append(record: dict) -> None:
+        line = (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        try:
+            with MetricsStore._lock:
+                with open(Config.METRICS_FILE, "a+b") as f:
+                    if f.seek(0, os.SEEK_END) > 0:
+                        # Start a fresh line after a record torn by a crash.
+                        f.seek(-1, os.SEEK_END)
+                        if f.read(1) != b"\n":
+                            line = b"\n" + line
+                    f.write(line)
+        except OSError as e:
+            # Metrics are diagnostic only and must never fail a download.
+            logging.warning("Could not write job metrics to %s: %s", Config.METRICS_FILE, e)
+
+    @staticmethod
+    def iter_records(path: Optional[str] = None) -> Iterator[dict]:
+        """Yield the stored records, skipping lines that cannot be parsed."""
+        try:
+            metrics_file = open(path or Config.METRICS_FILE, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with metrics_file:
+            for line in metrics_file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict):
+                    yield record
+
+    @staticmethod
+    def summarize(records: Iterable[dict], group_by: str) -> List[Dict[str, Any]]:
+        """Return per-group download totals, ordered by group key."""
+        key_of = MetricsStore.GROUPINGS[group_by]
+        groups: Dict[str, Dict[str, Any]] = {}
+        for record in records:
+            if record.get("kind") != JobMetrics.KIND_DOWNLOAD:
+                continue
+            group = groups.setdefault(key_of(record), {
+                "jobs": 0, "failed": 0, "bytes": 0, "download_seconds": 0.0,
+                "duration": 0.0, "peak_speed": None,
+            })
+            group["jobs"] += 1
+            if record.get("exit_code") != 0:
+                group["failed"] += 1
+            group["bytes"] += record.get("bytes") or 0
+            group["download_seconds"] += (record.get("phases") or {}).get("download") or 0.0
+            group["duration"] += record.get("duration") or 0.0
+            if record.get("peak_speed") is not None:
+                group["peak_speed"] = max(group["peak_speed"] or 0.0, record["peak_speed"])
+        summary = []
+        for key in sorted(groups):
+            group = groups[key]
+            summary.append({
+                "group": key,
+                **group,
+                "throughput": group["bytes"] / group["download_seconds"] if group["download_seconds"] else None,
+                "average_duration": group["duration"] / group["jobs"],
+            })
+        return summary
+
+    @staticmethod
+    def report(group_bys: Iterable[str], since: Optional[str] = None, path: Optional[str] = None) -> str:
+        """Return a plain-text throughput report, optionally from ``since`` (YYYY-MM-DD)."""
+        records = [
+            record for record in MetricsStore.iter_records(path)
+            if not since or str(record.get("started_at") or "")[:10] >= since
+        ]
+        if not records:
+            return "No job metrics recorded yet."
+
+        metadata_jobs = [record for record in records if record.get("kind") == JobMetrics.KIND_METADATA]
+        lines = []
+        if metadata_jobs:
+            average = sum(record.get("duration") or 0.0 for record in metadata_jobs) / len(metadata_jobs)
+            failed = sum(1 for record in metadata_jobs if record.get("exit_code") != 0)
+            lines.append(
+                f"Metadata jobs: {len(metadata_jobs)} ({failed} failed), average {average:.1f}s"
+            )
+        for group_by in group_bys:
+            summary = MetricsStore.summarize(records, group_by)
+            lines.append("")
+            lines.append(f"Downloads by {group_by}")
+            lines.append(
+                f"{'group':<28} {'jobs':>5} {'failed':>6} {'size':>11} {'throughput':>12} {'peak':>12} {'avg time':>9}"
+            )
+            for row in summary:
+                throughput = row["throughput"]
+                lines.append(
+                    f"{row['group'][:28]:<28} {row['jobs']:>5} {row['failed']:>6} "
+                    f"{ProgressEvent.format_bytes(row['bytes']):>11} "
+                    f"{(ProgressEvent.format_bytes(throughput) + '/s') if throughput else 'N/A':>12} "
+                    f"{(ProgressEvent.format_bytes(row['peak_speed']) + '/s') if row['peak_speed'] else 'N/A':>12} "
+                    f"{row['average_duration']:>8.1f}s"
+                )
+        return "\n".join(lines).strip("\n")
+
+
+class MaintenanceState:
+    """The startup checks that last passed, kept in ``Config.MAINTENANCE_STATE_FILE``.
+
+    Each check is stored with the time it passed, the configuration it was
+    run for (such as ``Config.DENO_VERSION``) and the size and modification
+    time of the binaries it covered.  A check is fresh, and skipped at the
+    next launch, while all three still match and
+    ``Config.MAINTENANCE_CHECK_INTERVAL`` has not passed.  Failed checks
+    are never stored, so they run again at every launch.
+    """
+    _lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(paths: Iterable[str]) -> List[list]:
+        fingerprints = []
+        for path in paths:
+            try:
+                stat_result = os.stat(path)
+                fingerprints.append([path, stat_result.st_size, stat_result.st_mtime_ns])
+            except OSError:
+                fingerprints.append([path, None, None])
+        return fingerprints
+
+    @classmethod
+    def is_fresh(cls, name: str, key: str, paths: Iterable[str] = ()) -> bool:
+        with cls._lock:
+            entry = cls._load().get(name)
+        if not isinstance(entry, dict) or entry.get("key") != key:
+            return False
+        checked_at = entry.get("checked_at")
+        if not isinstance(checked_at, (int, float)):
+            return False
+        age = time.time() - checked_at
+        if not 0 <= age < Config.MAINTENANCE_CHECK_INTERVAL:
+            return False
+        return entry.get("fingerprints") == cls.fingerprint(paths)
+
+    @classmethod
+    def record(cls, name: str, key: str, paths: Iterable[str] = (), detail: str = "") -> None:
+        """Store a passed check; the binaries are fingerprinted as they are now."""
+        entry = {
+            "key": key,
+            "checked_at": time.time(),
+            "fingerprints": cls.fingerprint(paths),
+            "detail": detail,
+        }
+        with cls._lock:
+            state = cls._load()
+            state[name] = entry
+            cls._save(state)
+
+    @staticmethod
+    def _load() -> Dict[str, dict]:
+        try:
+            with open(Config.MAINTENANCE_STATE_FILE, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logging.warning("Ignoring unreadable maintenance state %s: %s", Config.MAINTENANCE_STATE_FILE, e)
+            return {}
+        return state if isinstance(state, dict) else {}
+
+    @staticmethod
+    def _save(state: Dict[str, dict]) -> None:
+        path = Config.MAINTENANCE_STATE_FILE
+        data = json.dumps(state, indent=1, sort_keys=True).encode("utf-8")
+        try:
+            _write_atomically(path, lambda f: f.write(data), prefix=".maintenance-state-")
+        except OSError as e:
+            # Without the state the checks simply run again next time.
+            logging.warning("Could not save maintenance state to %s: %s", path, e)
+
+
+class YTDLManager:
+    _engine = None
+    _engine_setting = None
+    _engine_lock = threading.Lock()
+    _queue_store = None
+    _queue_store_lock = threading.Lock()
+    _archive = None
+    _archive_lock = threading.Lock()
+    _sync_store = None
+    _sync_store_lock = threading.Lock()
+
+    @staticmethod
+    def get_queue_store() -> QueueStore:
+        """Return the queue index for ``Config.QUEUE_DB`` and ``Config.META_DIR``."""
+        with YTDLManager._queue_store_lock:
+            store = YTDLManager._queue_store
+            if store is None or store.db_path != Config.QUEUE_DB or store.meta_dir != Config.META_DIR:
+                if store is not None:
+                    store.close()
+                store = QueueStore(Config.QUEUE_DB, Config.META_DIR)
+                YTDLManager._queue_store = store
+            return store
+
+    @staticmethod
+    def get_archive() -> DownloadArchive:
+        """Return the download archive for ``Config.ARCHIVE_DB``."""
+        with YTDLManager._archive_lock:
+            archive = YTDLManager._archive
+            if archive is None or archive.db_path != Config.ARCHIVE_DB:
+                if archive is not None:
+                    archive.close()
+                archive = DownloadArchive(Config.ARCHIVE_DB)
+                YTDLManager._archive = archive
+            return archive
+
+    @staticmethod
+    def get_sync_store() -> SyncCursorStore:
+        """Return the sync cursors for ``Config.SYNC_DB``."""
+        with YTDLManager._sync_store_lock:
+            store = YTDLManager._sync_store
+            if store is None or store.db_path != Config.SYNC_DB:
+                if store is not None:
+                    store.close()
+                store = SyncCursorStore(Config.SYNC_DB)
+                YTDLManager._sync_store = store
+            return store
+
+    @staticmethod
+    def is_downloaded(video: Video) -> bool:
+        """Return whether ``video`` is archived or its output file already exists.
+
+        An existing file from before the archive is added to it, so the next
+        pass over the same source skips the video before extraction.
+        """
+        archive = YTDLManager.get_archive()
+        archive_key = video.archive_key()
+        if archive_key in archive:
+            return True
+        existing = video.existing_download()
+        if existing is None:
+            return False
+        logging.info("Found existing download %s; adding it to the archive.", existing)
+        archive.add(archive_key)
+        return True
+
+    @staticmethod
+    def _url_is_downloaded(url: str) -> bool:
+        archive_key = DownloadArchive.key("youtube", Config.youtube_video_id(url))
+        return archive_key is not None and archive_key in YTDLManager.get_archive()
+
+    @staticmethod
+    def has_pending_videos() -> bool:
+        """Return whether a previous session left videos in the queue."""
+        store = YTDLManager.get_queue_store()
+        if not os.path.isdir(Config.META_DIR):
+            # The documented way to drop a queue is deleting meta/ by hand.
+            store.clear()
+            return False
+        return store.pending_count() > 0
+
+    @staticmethod
+    def discard_queue() -> None:
+        """Delete every queued info JSON together with its queue entries."""
+        if os.path.isdir(Config.META_DIR):
+            shutil.rmtree(Config.META_DIR)
+        YTDLManager.get_queue_store().clear()
+
+    @staticmethod
+    def get_engine():
+        """Return the yt-dlp engine selected by ``Config.YT_DLP_ENGINE``."""
+        with YTDLManager._engine_lock:
+            if YTDLManager._engine is None or YTDLManager._engine_setting != Config.YT_DLP_ENGINE:
+                YTDLManager._engine_setting = Config.YT_DLP_ENGINE
+                if Config.YT_DLP_ENGINE == InProcessEngine.name and InProcessEngine.is_available():
+                    YTDLManager._engine = InProcessEngine()
+                else:
+                    if Config.YT_DLP_ENGINE != SubprocessEngine.name:
+                        logging.warning(
+                            "yt-dlp engine %r is unavailable; using the %s engine.",
+                            Config.YT_DLP_ENGINE, SubprocessEngine.name,
+                        )
+                    YTDLManager._engine = SubprocessEngine()
+            return YTDLManager._engine
+
+    @staticmethod
+    def acquire_queue_lock() -> DownloadQueueLock:
         """Reserve this installation's metadata queue for one app instance."""
         queue_lock = DownloadQueueLock(Config._APP_DIR)
         queue_lock.acquire()
@@ -1033,20 +3660,43 @@ class YTDLManager:
 
     @staticmethod
     def _detect_specific_error(log_text: str) -> Optional[YTDLError]:
-        if not log_text:
+        if not log_text and not getattr(log_text, "log_path", ""):
             return None
 
-        if "Private video" in log_text:
+        found = set()
+        for line in SubprocessRunner.iter_log_lines(log_text):
+            if "Private video" in line:
+                found.add("private")
+            if "Video unavailable" in line or "404 Not Found" in line:
+                found.add("unavailable")
+            if "Sign in to confirm your age" in line:
+                found.add("age")
+            if "members-only" in line or "join this channel" in line:
+                found.add("members")
+
+        if "private" in found:
             return PrivateVideoError("Video is private.")
-        if "Video unavailable" in log_text or "404 Not Found" in log_text:
+        if "unavailable" in found:
             return VideoUnavailableError("Video is unavailable or not found.")
-        if "Sign in to confirm your age" in log_text:
+        if "age" in found:
             return AgeRestrictedError("Video is age-restricted.")
-        if "members-only" in log_text or "join this channel" in log_text:
+        if "members" in found:
             return PremiumRequiredError("Video requires membership.")
-        
+
         return None
 
+    @staticmethod
+    def _record_metrics(metrics: JobMetrics, returncode: int, full_log: str, cancelled: bool = False) -> None:
+        error_class = None
+        if cancelled:
+            error_class = "Cancelled"
+        elif returncode != 0:
+            error_class = type(YTDLManager._detect_specific_error(full_log) or DownloadError("")).__name__
+        record = metrics.record(returncode, error_class)
+        MetricsStore.append(record)
+        if record["kind"] == JobMetrics.KIND_DOWNLOAD:
+            FragmentTuner.observe(record)
+
     @staticmethod
     def _report_yt_dlp_failure(
         operation: str,
@@ -1068,93 +3718,481 @@ class YTDLManager:
             url=url,
             title=title,
             log_output=f"```\n{full_log}\n```",
+            log_path=getattr(full_log, "log_path", ""),
             exception=exception_to_report,
             extra={"Exit code": str(returncode)},
         ))
         return f"{extracted_error}\n錯誤代碼: {error_id}"
 
     @staticmethod
-    def _report_download_exception(
-        operation: str,
-        message: str,
-        exception: Exception,
-        url: str = "",
-        title: str = "",
-    ) -> str:
-        err_obj = DownloadError(str(exception))
-        error_id = Logger.report_error(message, ctx=ErrorContext(
-            operation=operation,
-            url=url,
-            title=title,
-            traceback_str=traceback.format_exc(),
-            exception=err_obj,
-        ))
-        return f"{err_obj.reason_title_zh_tw}\n詳細錯誤: {exception}\n錯誤代碼: {error_id}"
+    def _report_download_exception(
+        operation: str,
+        message: str,
+        exception: Exception,
+        url: str = "",
+        title: str = "",
+    ) -> str:
+        err_obj = DownloadError(str(exception))
+        # Formatted from the exception itself so it can be reported from a
+        # worker thread, away from the except block that caught it.
+        traceback_str = "".join(
+            traceback.format_exception(type(exception), exception, exception.__traceback__)
+        )
+        error_id = Logger.report_error(message, ctx=ErrorContext(
+            operation=operation,
+            url=url,
+            title=title,
+            traceback_str=traceback_str,
+            exception=err_obj,
+        ))
+        return f"{err_obj.reason_title_zh_tw}\n詳細錯誤: {exception}\n錯誤代碼: {error_id}"
+
+    @staticmethod
+    def dl_meta_from_url(
+        url: str,
+        cancel_event: Optional[threading.Event] = None,
+        on_video: Optional[Callable[[Video], None]] = None,
+        name_prefix: Optional[str] = None,
+        entry_fields: Optional[dict] = None,
+    ) -> Tuple[bool, Optional[str]]:
+        """Write info JSON files for ``url`` into the meta queue.
+
+        ``on_video`` is called with each queued ``Video`` as soon as its info
+        JSON has been written, while yt-dlp continues with later entries.
+        yt-dlp's autonumber restarts for every call, so each call's files are
+        named below ``name_prefix``; the prefix also orders the queue.
+        ``entry_fields`` are stored over the extracted fields of each video.
+        Playlists and channels are listed first and their entries extracted
+        one by one (``fetch_listing``).
+        """
+        try:
+            if cancel_event is not None and cancel_event.is_set():
+                return False, "Download cancelled."
+            if Config.is_playlist_or_channel_url(url):
+                return YTDLManager.fetch_listing(url, cancel_event, on_video, name_prefix)
+            if YTDLManager._url_is_downloaded(url):
+                logging.info("Already downloaded; skipping %s", url)
+                return True, None
+            metrics = JobMetrics(JobMetrics.KIND_METADATA, url=url)
+            returncode, full_log = YTDLManager.get_engine().run(
+                YTDLManager._meta_fetch_args(url, name_prefix),
+                {"URL": url},
+                cancel_event=cancel_event,
+                line_callback=metrics.chain_lines(_InfoJsonWatcher(
+                    lambda meta_filepath: YTDLManager._queue_info_json(meta_filepath, on_video, entry_fields)
+                )),
+            )
+
+            if cancel_event is not None and cancel_event.is_set():
+                YTDLManager._record_metrics(metrics, returncode, full_log, cancelled=True)
+                return False, "Download cancelled."
+            return YTDLManager._meta_fetch_result(url, returncode, full_log, metrics)
+
+        except Exception as e:
+            return False, YTDLManager._report_download_exception(
+                "Fetch metadata", "Error fetching metadata.", e, url=url
+            )
+
+    @staticmethod
+    async def dl_meta_from_url_async(
+        url: str,
+        on_video: Optional[Callable[[Video], None]] = None,
+        name_prefix: Optional[str] = None,
+        entry_fields: Optional[dict] = None,
+    ) -> Tuple[bool, Optional[str]]:
+        """Coroutine version of ``dl_meta_from_url``; cancel the task to stop it.
+
+        The job runs on the event loop; everything that blocks (the queue
+        and archive databases, the Deno probe, writing the records and
+        metrics) runs on worker threads, and so does ``on_video``.
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        try:
+            if Config.is_playlist_or_channel_url(url):
+                return await YTDLManager._run_cancellable_async(
+                    YTDLManager.fetch_listing, url, on_video=on_video, name_prefix=name_prefix
+                )
+            if await asyncio.to_thread(YTDLManager._url_is_downloaded, url):
+                logging.info("Already downloaded; skipping %s", url)
+                return True, None
+            metrics = JobMetrics(JobMetrics.KIND_METADATA, url=url)
+            args = await asyncio.to_thread(YTDLManager._meta_fetch_args, url, name_prefix)
+            # Info JSON files are queued in the order yt-dlp wrote them, one
+            # at a time, by a task that hands each to a worker thread.
+            written = asyncio.Queue()
+
+            async def queue_written() -> None:
+                while (meta_filepath := await written.get()) is not None:
+                    await asyncio.to_thread(YTDLManager._queue_info_json, meta_filepath, on_video, entry_fields)
+
+            queuing = asyncio.create_task(queue_written())
+            try:
+                returncode, full_log = await YTDLManager.get_engine().run_async(
+                    args,
+                    {"URL": url},
+                    # The in-process engine reports from a worker thread.
+                    line_callback=metrics.chain_lines(_InfoJsonWatcher(
+                        lambda meta_filepath: loop.call_soon_threadsafe(written.put_nowait, meta_filepath)
+                    )),
+                )
+                loop.call_soon_threadsafe(written.put_nowait, None)
+                await queuing
+            finally:
+                queuing.cancel()
+            return await asyncio.to_thread(YTDLManager._meta_fetch_result, url, returncode, full_log, metrics)
+        except Exception as e:
+            # Reporting may upload to the Discord webhook.
+            return False, await asyncio.to_thread(
+                YTDLManager._report_download_exception, "Fetch metadata", "Error fetching metadata.", e, url=url
+            )
+
+    @staticmethod
+    async def _run_cancellable_async(func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run ``func(*args, cancel_event=..., **kwargs)`` on a worker thread.
+
+        Cancelling the task sets the event, which stops the yt-dlp jobs.
+        """
+        import asyncio
+
+        cancel_event = CancelEvent()
+        try:
+            return await asyncio.to_thread(func, *args, cancel_event=cancel_event, **kwargs)
+        except asyncio.CancelledError:
+            cancel_event.set()
+            raise
 
     @staticmethod
-    def dl_meta_from_url(
+    def fetch_listing(
         url: str,
         cancel_event: Optional[threading.Event] = None,
+        on_video: Optional[Callable[[Video], None]] = None,
+        name_prefix: Optional[str] = None,
     ) -> Tuple[bool, Optional[str]]:
+        """Queue a playlist or channel in two phases.
+
+        The flat listing (``FlatPlaylist``) records each entry in the queue
+        store as soon as yt-dlp prints it, and up to
+        ``Config.CONCURRENT_ENTRY_RESOLUTIONS`` entries are extracted while
+        the listing continues, so the first videos are queued within
+        seconds of the first listing page.  Archived entries are skipped
+        before extraction.  A failed entry is reported on its own and the
+        rest of the playlist is still queued.
+        """
         try:
             if cancel_event is not None and cancel_event.is_set():
                 return False, "Download cancelled."
-            if not os.path.exists(Config.META_DIR):
-                os.makedirs(Config.META_DIR)
-            
-            args = [
-                Config.EXECUTABLE,
-                '--no-download',
-                '--no-write-playlist-metafiles', '-o',
-                os.path.join(Config.META_DIR, "%(autonumber)s_%(id)s"),
-                '--write-info-json', '--encoding', 'utf-8', '--verbose',
-                '--force-ipv4',
-                '--concurrent-fragments', Config.CONCURRENT_FRAGMENTS,
-                url
-            ]
-            
-            if not Config.is_playlist_or_channel_url(url):
-                args.append('--no-playlist')
+            archive = YTDLManager.get_archive()
+            listed = 0
+
+            def resolve(entry_url: str, name: str, entry_fields: dict) -> Tuple[bool, Optional[str]]:
+                return YTDLManager.dl_meta_from_url(entry_url, cancel_event, on_video, name, entry_fields)
+
+            def on_entry(entry: dict) -> bool:
+                nonlocal listed
+                listed += 1
+                entry_url = FlatPlaylist.entry_url(entry)
+                if entry_url is None:
+                    logging.warning("Listing of %s: no URL for entry %s; skipped.", url, entry["id"])
+                elif (
+                    Config.is_playlist_or_channel_url(entry_url)
+                    or DownloadArchive.key(entry.get("ie_key"), entry["id"]) not in archive
+                ):
+                    resolver.submit(entry_url, FlatPlaylist.queued_fields(entry), entry)
+                return True
+
+            YTDLManager._open_meta_queue()
+            with _EntryResolver(
+                name_prefix or YTDLManager._new_meta_batch_prefix(), resolve, cancel_event
+            ) as resolver:
+                success, error = YTDLManager._run_listing(url, on_entry, cancel_event)
+                first_error = resolver.wait()
+            if cancel_event is not None and cancel_event.is_set():
+                return False, "Download cancelled."
+            logging.info(
+                "Listing of %s: %d entries, %d extracted, %d failed.",
+                url, listed, resolver.submitted, resolver.failed,
+            )
+            if not success:
+                return False, error
+            return first_error is None, first_error
+        except Exception as e:
+            return False, YTDLManager._report_download_exception(
+                "Fetch metadata", "Error listing playlist or channel.", e, url=url
+            )
 
-            if Config.is_youtube_url(url):
-                js_runtime_args, reason = Config.get_youtube_js_runtime_args()
-                if js_runtime_args:
-                    args.extend(js_runtime_args)
-                else:
-                    logging.warning("Portable Deno is unavailable; fetching metadata without a JS runtime: %s", reason)
+    @staticmethod
+    def resolve_listed(
+        cancel_event: Optional[threading.Event] = None,
+        on_video: Optional[Callable[[Video], None]] = None,
+    ) -> Tuple[bool, Optional[str]]:
+        """Extract the playlist entries an earlier session listed but did not queue."""
+        try:
+            records = YTDLManager.get_queue_store().listed_records()
+            if not records:
+                return True, None
+            logging.info("Resuming %d listed playlist entries.", len(records))
 
-            returncode, full_log = SubprocessRunner.run(
-                args, {"URL": url}, cancel_event=cancel_event
-            )
+            def resolve(entry_url: str, name: str, entry_fields: dict) -> Tuple[bool, Optional[str]]:
+                return YTDLManager.dl_meta_from_url(entry_url, cancel_event, on_video, name, entry_fields)
 
+            YTDLManager._open_meta_queue()
+            with _EntryResolver(None, resolve, cancel_event) as resolver:
+                for record in records:
+                    resolver.resume(record["name"], record["url"], record["entry_fields"])
+                first_error = resolver.wait()
             if cancel_event is not None and cancel_event.is_set():
                 return False, "Download cancelled."
+            return first_error is None, first_error
+        except Exception as e:
+            return False, YTDLManager._report_download_exception(
+                "Fetch metadata", "Error resuming listed playlist entries.", e
+            )
 
-            if returncode == 0:
-                return True, None
-
-            return False, YTDLManager._report_yt_dlp_failure(
-                "Fetch metadata",
-                f"Failed to download metadata. yt-dlp exited with code {returncode}",
-                returncode,
-                full_log,
-                url=url,
+    @staticmethod
+    def sync_source(
+        url: str,
+        cancel_event: Optional[threading.Event] = None,
+        on_video: Optional[Callable[[Video], None]] = None,
+        name_prefix: Optional[str] = None,
+        _nested: bool = False,
+    ) -> Tuple[bool, Optional[str]]:
+        """Queue only the entries of a playlist or channel not seen by an earlier sync.
+
+        Like ``fetch_listing``, but channel tabs list the newest uploads
+        first, so once the source has a cursor the listing stops after
+        ``Config.SYNC_KNOWN_STREAK`` entries in a row that were already
+        queued or downloaded.  Playlists are listed in full, which costs one
+        request per page of entries.  Each new entry is marked known once it
+        is queued, so an interrupted sync resumes where it stopped.  A
+        listing of tabs or playlists syncs each of them as its own source.
+        """
+        try:
+            if cancel_event is not None and cancel_event.is_set():
+                return False, "Download cancelled."
+            store = YTDLManager.get_sync_store()
+            archive = YTDLManager.get_archive()
+            stop_at_known = store.cursor(url) is not None and Config._youtube_url_kind(url) == "channel"
+            known_ids = []
+            newest = None
+            streak = 0
+
+            def resolve(entry_url: str, name: str, entry_fields: dict) -> Tuple[bool, Optional[str]]:
+                if Config.is_playlist_or_channel_url(entry_url):
+                    return YTDLManager.sync_source(entry_url, cancel_event, on_video, name, _nested=True)
+                return YTDLManager.dl_meta_from_url(entry_url, cancel_event, on_video, name, entry_fields)
+
+            def on_resolved(entry: dict, success: bool) -> None:
+                if success and not Config.is_playlist_or_channel_url(FlatPlaylist.entry_url(entry)):
+                    store.mark_known(url, [entry["id"]])
+
+            def on_entry(entry: dict) -> bool:
+                nonlocal newest, streak
+                if newest is None or str(entry.get("upload_date") or "") > str(newest.get("upload_date") or ""):
+                    newest = entry
+                entry_url = FlatPlaylist.entry_url(entry)
+                if entry_url is None:
+                    logging.warning("Sync of %s: no URL for entry %s; skipped.", url, entry["id"])
+                    return True
+                if Config.is_playlist_or_channel_url(entry_url):
+                    if not _nested:  # a tab or playlist; synced on its own
+                        resolver.submit(entry_url, {}, entry)
+                    return True
+                if store.known(url, [entry["id"]]) or DownloadArchive.key(entry.get("ie_key"), entry["id"]) in archive:
+                    known_ids.append(entry["id"])
+                    streak += 1
+                    return not (stop_at_known and streak >= Config.SYNC_KNOWN_STREAK)
+                streak = 0
+                resolver.submit(entry_url, FlatPlaylist.queued_fields(entry), entry)
+                return True
+
+            YTDLManager._open_meta_queue()
+            with _EntryResolver(
+                name_prefix or YTDLManager._new_meta_batch_prefix(), resolve, cancel_event, on_resolved
+            ) as resolver:
+                success, error = YTDLManager._run_listing(url, on_entry, cancel_event, operation="Sync source", sync=True)
+                # Entries downloaded before the first sync become part of the cursor.
+                store.mark_known(url, known_ids)
+                first_error = resolver.wait()
+            if cancel_event is not None and cancel_event.is_set():
+                return False, "Download cancelled."
+            logging.info(
+                "Sync of %s: %d new of %d listed entries.",
+                url, resolver.submitted, resolver.submitted + len(known_ids),
             )
+            if not success:
+                return False, error
 
+            upload = (newest or {}).get("upload_date") or (newest or {}).get("timestamp")
+            store.update_cursor(url, (newest or {}).get("id"), str(upload) if upload else None)
+            return first_error is None, first_error
         except Exception as e:
             return False, YTDLManager._report_download_exception(
-                "Fetch metadata", "Error fetching metadata.", e, url=url
+                "Sync source", "Error syncing playlist or channel.", e, url=url
+            )
+
+    @staticmethod
+    def _run_listing(
+        url: str,
+        on_entry: Callable[[dict], bool],
+        cancel_event: Optional[threading.Event] = None,
+        operation: str = "Fetch metadata",
+        **metric_fields,
+    ) -> Tuple[bool, Optional[str]]:
+        """Run ``_enumerate_flat``, record its metrics and report a failed listing."""
+        metrics = JobMetrics(JobMetrics.KIND_METADATA, url=url, listing=True, **metric_fields)
+        stopped, returncode, full_log = YTDLManager._enumerate_flat(
+            url, on_entry, cancel_event, line_callback=metrics.observe_line
+        )
+        if cancel_event is not None and cancel_event.is_set():
+            YTDLManager._record_metrics(metrics, returncode, full_log, cancelled=True)
+            return False, "Download cancelled."
+        YTDLManager._record_metrics(metrics, 0 if stopped else returncode, full_log)
+        if stopped or returncode == 0:
+            return True, None
+        return False, YTDLManager._report_yt_dlp_failure(
+            operation,
+            f"Listing failed. yt-dlp exited with code {returncode}.",
+            returncode,
+            full_log,
+            url=url,
+        )
+
+    @staticmethod
+    def _enumerate_flat(
+        url: str,
+        on_entry: Callable[[dict], bool],
+        cancel_event: Optional[threading.Event] = None,
+        line_callback: Optional[Callable[[str], None]] = None,
+    ) -> Tuple[bool, int, str]:
+        """Stream the flat listing of ``url`` to ``on_entry`` until it returns ``False``.
+
+        Returns whether the listing was stopped that way, and yt-dlp's exit
+        code and output; a stopped job exits with an error code.
+        """
+        stop_event = CancelEvent()
+        stopped = threading.Event()
+
+        def on_line(line: str) -> None:
+            if line_callback is not None:
+                line_callback(line)
+            if cancel_event is not None and cancel_event.is_set():
+                stop_event.set()
+            entry = FlatPlaylist.parse(line.rstrip("\r\n"))
+            if entry is None or stop_event.is_set():
+                return
+            if not on_entry(entry):
+                stopped.set()
+                stop_event.set()
+
+        if isinstance(cancel_event, CancelEvent):
+            cancel_event.add_listener(stop_event.set)
+        try:
+            returncode, full_log = YTDLManager.get_engine().run(
+                FlatPlaylist.args(url), {"URL": url}, cancel_event=stop_event, line_callback=on_line
             )
+        finally:
+            if isinstance(cancel_event, CancelEvent):
+                cancel_event.remove_listener(stop_event.set)
+        return stopped.is_set(), returncode, full_log
+
+    @staticmethod
+    def _open_meta_queue() -> None:
+        if not os.path.exists(Config.META_DIR):
+            os.makedirs(Config.META_DIR, exist_ok=True)
+        # Open the store before yt-dlp writes anything: a new store adopts
+        # the files already in META_DIR, which would otherwise include the
+        # raw info JSON that is about to be compacted.
+        YTDLManager.get_queue_store()
+
+    @staticmethod
+    def _meta_fetch_args(url: str, name_prefix: Optional[str]) -> list:
+        YTDLManager._open_meta_queue()
+        if name_prefix is None:
+            name_prefix = YTDLManager._new_meta_batch_prefix()
+
+        args = [
+            Config.EXECUTABLE,
+            '--no-download',
+            '--no-write-playlist-metafiles', '-o',
+            os.path.join(Config.META_DIR, f"{name_prefix}_%(autonumber)s_%(id)s"),
+            '--write-info-json', '--encoding', 'utf-8', '--verbose',
+            '--force-ipv4',
+            # Archived playlist entries are skipped before extraction.
+            '--download-archive', YTDLManager.get_archive().yt_dlp_archive_path(),
+            url
+        ]
+
+        if not Config.is_playlist_or_channel_url(url):
+            args.append('--no-playlist')
+
+        if Config.is_youtube_url(url):
+            js_runtime_args, reason = Config.get_youtube_js_runtime_args()
+            if js_runtime_args:
+                args.extend(js_runtime_args)
+            else:
+                logging.warning("Portable Deno is unavailable; fetching metadata without a JS runtime: %s", reason)
+        return args
+
+    @staticmethod
+    def _meta_fetch_result(
+        url: str,
+        returncode: int,
+        full_log: str,
+        metrics: Optional[JobMetrics] = None,
+    ) -> Tuple[bool, Optional[str]]:
+        if metrics is not None:
+            YTDLManager._record_metrics(metrics, returncode, full_log)
+        if returncode == 0:
+            return True, None
+
+        return False, YTDLManager._report_yt_dlp_failure(
+            "Fetch metadata",
+            f"Failed to download metadata. yt-dlp exited with code {returncode}",
+            returncode,
+            full_log,
+            url=url,
+        )
+
+    @staticmethod
+    def _queue_info_json(
+        meta_filepath: str,
+        on_video: Optional[Callable[[Video], None]] = None,
+        entry_fields: Optional[dict] = None,
+    ) -> None:
+        """Compact a newly written info JSON and add it to the queue store."""
+        store = YTDLManager.get_queue_store()
+        video = Video.from_info_json(meta_filepath, store.stored_format_selection, entry_fields)
+        if video is None or not video.is_valid:
+            return
+        if YTDLManager.is_downloaded(video):
+            logging.info("Already downloaded; not queueing %s", video.title)
+            try:
+                video.remove_files()
+            except OSError:
+                pass
+            return
+        store.add(video)
+        if on_video is not None:
+            on_video(video)
+
+    @staticmethod
+    def _new_meta_batch_prefix() -> str:
+        """Return a sortable, per-batch prefix for newly queued meta files."""
+        return datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S%f")
 
     @staticmethod
     def load_videos() -> List[Video]:
-        if not os.path.isdir(Config.META_DIR):
-            return []
+        """Return the pending videos recorded in the queue store, in queue order."""
+        store = YTDLManager.get_queue_store()
         videos = []
-        for f in sorted(os.listdir(Config.META_DIR)):
-            if not f.endswith('.json'):
+        for entry in store.pending_records():
+            if not os.path.isfile(entry["meta_filepath"]):
+                store.forget(entry["meta_filepath"])
+                Video(entry["meta_filepath"], entry["record"] or {}).remove_files()
                 continue
-            v = Video(os.path.join(Config.META_DIR, f))
+            v = Video(**entry)
             if v.is_valid:
                 videos.append(v)
         return videos
@@ -1163,36 +4201,87 @@ class YTDLManager:
     def download_video(
         video: Video,
         cancel_event: Optional[threading.Event] = None,
+        progress_callback: Optional[Callable[[ProgressEvent], None]] = None,
     ) -> Tuple[bool, Optional[str]]:
         logging.info(f"--- Downloading: {video.title} ---")
         try:
             if cancel_event is not None and cancel_event.is_set():
                 return False, "Download cancelled."
-            args = video.get_download_args()
-            returncode, full_log = SubprocessRunner.run(
-                args,
-                {"Title": video.title, "URL": video.webpage_url},
-                cancel_event=cancel_event,
-            )
+            if YTDLManager.is_downloaded(video):
+                return YTDLManager._skip_downloaded(video)
+            engine = YTDLManager.get_engine()
+            with BandwidthGovernor.lease(engine.live_rate_limit) as bandwidth:
+                rate_limit = bandwidth.limit()
+                args = video.get_download_args(limit_rate=rate_limit)
+                YTDLManager.get_queue_store().record_attempt(video)
+                metrics = JobMetrics.for_video(
+                    video, rate_limit=rate_limit, loaded_info_json='--load-info-json' in args
+                )
+                returncode, full_log = engine.run(
+                    args,
+                    {"Title": video.title, "URL": video.webpage_url},
+                    cancel_event=cancel_event,
+                    line_callback=metrics.observe_line,
+                    progress_callback=metrics.chain_progress(progress_callback),
+                    rate_limit=bandwidth.limit,
+                )
 
             if cancel_event is not None and cancel_event.is_set():
+                YTDLManager._record_metrics(metrics, returncode, full_log, cancelled=True)
                 return False, "Download cancelled."
+            return YTDLManager._download_result(video, returncode, full_log, metrics)
 
-            if returncode == 0:
-                os.remove(video.meta_filepath)
-                return True, None
-            
-            return False, YTDLManager._report_yt_dlp_failure(
+        except Exception as e:
+            return False, YTDLManager._report_download_exception(
                 "Download video",
-                f"Download failed. yt-dlp exited with code {returncode}.",
-                returncode,
-                full_log,
+                "Unexpected error during download.",
+                e,
                 url=video.webpage_url,
                 title=video.title,
             )
 
+    @staticmethod
+    async def download_video_async(
+        video: Video,
+        progress_callback: Optional[Callable[[ProgressEvent], None]] = None,
+    ) -> Tuple[bool, Optional[str]]:
+        """Coroutine version of ``download_video``; cancel the task to stop it.
+
+        The job runs on the event loop; building its arguments (which may
+        probe Deno), the queue and archive databases and the metrics run on
+        worker threads.  ``progress_callback`` is called on the loop thread,
+        or on a worker thread with the in-process engine.
+        """
+        import asyncio
+
+        logging.info(f"--- Downloading: {video.title} ---")
+        try:
+            if await asyncio.to_thread(YTDLManager.is_downloaded, video):
+                return await asyncio.to_thread(YTDLManager._skip_downloaded, video)
+            engine = YTDLManager.get_engine()
+            with BandwidthGovernor.lease(engine.live_rate_limit) as bandwidth:
+                rate_limit = bandwidth.limit()
+
+                def prepare() -> Tuple[list, JobMetrics]:
+                    args = video.get_download_args(limit_rate=rate_limit)
+                    YTDLManager.get_queue_store().record_attempt(video)
+                    return args, JobMetrics.for_video(
+                        video, rate_limit=rate_limit, loaded_info_json='--load-info-json' in args
+                    )
+
+                args, metrics = await asyncio.to_thread(prepare)
+                returncode, full_log = await engine.run_async(
+                    args,
+                    {"Title": video.title, "URL": video.webpage_url},
+                    line_callback=metrics.observe_line,
+                    progress_callback=metrics.chain_progress(progress_callback),
+                    rate_limit=bandwidth.limit,
+                )
+            return await asyncio.to_thread(YTDLManager._download_result, video, returncode, full_log, metrics)
         except Exception as e:
-            return False, YTDLManager._report_download_exception(
+            # Reporting may upload to the Discord webhook.
+            return False, await asyncio.to_thread(
+                YTDLManager._report_download_exception,
                 "Download video",
                 "Unexpected error during download.",
                 e,
@@ -1201,23 +4290,348 @@ class YTDLManager:
             )
 
     @staticmethod
-    def download_pending_videos(cancel_event: Optional[threading.Event] = None):
-        """Download every valid metadata file currently queued in the meta directory."""
-        videos = YTDLManager.load_videos()
-        for video in videos:
-            if cancel_event is not None and cancel_event.is_set():
-                break
-            success, error = YTDLManager.download_video(video, cancel_event=cancel_event)
-            if cancel_event is not None and cancel_event.is_set():
-                break
+    def _skip_downloaded(video: Video) -> Tuple[bool, Optional[str]]:
+        logging.info("Already downloaded; skipping %s", video.title)
+        YTDLManager.get_queue_store().complete(video)
+        return True, None
+
+    @staticmethod
+    def _download_result(
+        video: Video,
+        returncode: int,
+        full_log: str,
+        metrics: Optional[JobMetrics] = None,
+    ) -> Tuple[bool, Optional[str]]:
+        if metrics is not None:
+            YTDLManager._record_metrics(metrics, returncode, full_log)
+        if returncode == 0:
+            YTDLManager.get_archive().add(video.archive_key())
+            YTDLManager.get_queue_store().complete(video)
+            return True, None
+
+        error = YTDLManager._report_yt_dlp_failure(
+            "Download video",
+            f"Download failed. yt-dlp exited with code {returncode}.",
+            returncode,
+            full_log,
+            url=video.webpage_url,
+            title=video.title,
+        )
+        YTDLManager.get_queue_store().record_failure(video, error)
+        return False, error
+
+    @staticmethod
+    def download_videos(
+        videos: Iterable[Video],
+        cancel_event: Optional[threading.Event] = None,
+        on_start: Optional[Callable[[Video, int, int], None]] = None,
+        on_result: Optional[Callable[[Video, bool, Optional[str]], None]] = None,
+        on_progress: Optional[Callable[[Video, ProgressEvent], None]] = None,
+    ) -> None:
+        """Download videos with a bounded pool of concurrent yt-dlp jobs.
+
+        ``videos`` may be a generator that yields items as they are queued.
+        ``on_start`` receives the video, its 1-based start position and the
+        number of videos known so far; ``on_result`` receives each
+        ``download_video`` result and ``on_progress`` each of its progress
+        events.  The callbacks run on the worker threads.
+        Results of a cancelled batch are not reported.
+        """
+        if cancel_event is None:
+            cancel_event = CancelEvent()
+        known_total = len(videos) if hasattr(videos, "__len__") else None
+        submitted = 0
+        started = 0
+        counter_lock = threading.Lock()
+
+        def download_one(video: Video) -> None:
+            nonlocal started
+            if cancel_event.is_set():
+                return
+            with counter_lock:
+                started += 1
+                position = started
+                total = known_total if known_total is not None else submitted
+            if on_start is not None:
+                on_start(video, position, total)
+            success, error = YTDLManager.download_video(
+                video,
+                cancel_event=cancel_event,
+                progress_callback=YTDLManager._video_progress_callback(video, on_progress),
+            )
+            if on_result is not None and not cancel_event.is_set():
+                on_result(video, success, error)
+
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, int(Config.CONCURRENT_DOWNLOADS)),
+            thread_name_prefix="ytdl-download",
+        )
+        try:
+            futures = []
+            for video in videos:
+                if cancel_event.is_set():
+                    break
+                with counter_lock:
+                    submitted += 1
+                futures.append(executor.submit(download_one, video))
+            for future in as_completed(futures):
+                future.result()
+        except BaseException:
+            # Ctrl+C is delivered to the waiting main thread only; stop every
+            # worker's yt-dlp process tree before leaving the pool.
+            cancel_event.set()
+            raise
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def _video_progress_callback(
+        video: Video,
+        on_progress: Optional[Callable[[Video, ProgressEvent], None]],
+    ) -> Optional[Callable[[ProgressEvent], None]]:
+        if on_progress is None:
+            return None
+        return lambda event: on_progress(video, event)
+
+    @staticmethod
+    async def download_videos_async(
+        videos: Iterable[Video],
+        limit: Optional[int] = None,
+        on_start: Optional[Callable[[Video, int, int], None]] = None,
+        on_result: Optional[Callable[[Video, bool, Optional[str]], None]] = None,
+        on_progress: Optional[Callable[[Video, ProgressEvent], None]] = None,
+    ) -> List[Tuple[bool, Optional[str]]]:
+        """Download ``videos`` with at most ``limit`` jobs at a time.
+
+        ``limit`` defaults to ``Config.CONCURRENT_DOWNLOADS``.  Results are
+        returned in input order.  ``on_start`` and ``on_result`` run on the
+        event loop thread, ``on_progress`` as described for
+        ``download_video_async``.  Cancelling the awaiting task stops every job.
+        """
+        import asyncio
+
+        videos = list(videos)
+        semaphore = asyncio.Semaphore(max(1, int(limit or Config.CONCURRENT_DOWNLOADS)))
+        started = 0
+
+        async def download_one(video: Video) -> Tuple[bool, Optional[str]]:
+            nonlocal started
+            async with semaphore:
+                started += 1
+                if on_start is not None:
+                    on_start(video, started, len(videos))
+                success, error = await YTDLManager.download_video_async(
+                    video, YTDLManager._video_progress_callback(video, on_progress)
+                )
+            if on_result is not None:
+                on_result(video, success, error)
+            return success, error
+
+        return list(await asyncio.gather(*(download_one(video) for video in videos)))
+
+    @staticmethod
+    async def download_pending_videos_async(
+        urls: Iterable[str] = (),
+        limit: Optional[int] = None,
+    ) -> None:
+        """Coroutine version of ``download_pending_videos``.
+
+        Queued videos start first; metadata for ``urls`` is fetched by up to
+        ``Config.CONCURRENT_METADATA_FETCHES`` jobs, and each new video is
+        downloaded as soon as it is queued, by at most ``limit`` jobs.
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        download_slots = asyncio.Semaphore(max(1, int(limit or Config.CONCURRENT_DOWNLOADS)))
+        metadata_slots = asyncio.Semaphore(max(1, int(Config.CONCURRENT_METADATA_FETCHES)))
+        batch_prefix = YTDLManager._new_meta_batch_prefix()
+        queued_paths = set()
+        downloads = []
+
+        async def download(video: Video) -> None:
+            async with download_slots:
+                success, error = await YTDLManager.download_video_async(video)
+            if not success:
+                print(f"Error downloading {video.title}: {error}")
+
+        def schedule(video: Video) -> None:
+            if video.meta_filepath in queued_paths:
+                return
+            queued_paths.add(video.meta_filepath)
+            downloads.append(loop.create_task(download(video)))
+
+        async def fetch(index: int, url: str) -> None:
+            async with metadata_slots:
+                success, error = await YTDLManager.dl_meta_from_url_async(
+                    url,
+                    # The in-process engine reports from a worker thread.
+                    on_video=lambda video: loop.call_soon_threadsafe(schedule, video),
+                    name_prefix=f"{batch_prefix}-{index:04d}",
+                )
+            if not success:
+                print(f"ERROR: {error}")
+
+        async def resume_listed() -> None:
+            async with metadata_slots:
+                success, error = await YTDLManager._run_cancellable_async(
+                    YTDLManager.resolve_listed, on_video=lambda video: loop.call_soon_threadsafe(schedule, video)
+                )
+            if not success:
+                print(f"ERROR: {error}")
+
+        try:
+            for video in await asyncio.to_thread(YTDLManager.load_videos):
+                schedule(video)
+            await asyncio.gather(
+                resume_listed(), *(fetch(index, url) for index, url in enumerate(urls, start=1))
+            )
+            # Let videos reported by the last jobs be scheduled.
+            await asyncio.sleep(0)
+            while True:
+                pending = [task for task in downloads if not task.done()]
+                if not pending:
+                    break
+                await asyncio.wait(pending)
+        except BaseException:
+            for task in downloads:
+                task.cancel()
+            await asyncio.gather(*downloads, return_exceptions=True)
+            raise
+        YTDLManager.cleanup_meta()
+        logging.info("Batch complete.")
+
+    @staticmethod
+    def fetch_and_download(
+        urls: Iterable[str],
+        cancel_event: Optional[threading.Event] = None,
+        on_meta_error: Optional[Callable[[str, str], None]] = None,
+        on_start: Optional[Callable[[Video, int, int], None]] = None,
+        on_result: Optional[Callable[[Video, bool, Optional[str]], None]] = None,
+        on_progress: Optional[Callable[[Video, ProgressEvent], None]] = None,
+        sync: bool = False,
+    ) -> None:
+        """Download the queue while metadata for ``urls`` is still being fetched.
+
+        Videos already waiting in the meta directory are queued first.  Each
+        new video is handed to the download pool as soon as its info JSON
+        lands, so extraction of later entries overlaps earlier transfers.
+        Up to ``Config.CONCURRENT_METADATA_FETCHES`` URLs are extracted at
+        the same time.  With ``sync``, playlist and channel URLs queue only
+        the entries that earlier syncs have not seen (``sync_source``).
+        """
+        if cancel_event is None:
+            cancel_event = CancelEvent()
+        ready_videos = queue.Queue()
+        finished = object()
+
+        batch_prefix = YTDLManager._new_meta_batch_prefix()
+
+        def fetch(index: int, url: str) -> None:
+            if cancel_event.is_set():
+                return
+            fetch_url = (
+                YTDLManager.sync_source if sync and Config.is_playlist_or_channel_url(url)
+                else YTDLManager.dl_meta_from_url
+            )
+            success, error = fetch_url(
+                url,
+                cancel_event=cancel_event,
+                on_video=ready_videos.put,
+                name_prefix=f"{batch_prefix}-{index:04d}",
+            )
+            if not success and not cancel_event.is_set() and on_meta_error is not None:
+                on_meta_error(url, error)
+
+        def resume_listed() -> None:
+            success, error = YTDLManager.resolve_listed(cancel_event, ready_videos.put)
+            if not success and not cancel_event.is_set() and on_meta_error is not None:
+                on_meta_error("", error)
+
+        def produce() -> None:
+            try:
+                for video in YTDLManager.load_videos():
+                    ready_videos.put(video)
+                # Extraction is dominated by network latency, so several URLs
+                # are fetched at once.  File names keep the submitted order.
+                with ThreadPoolExecutor(
+                    max_workers=max(1, int(Config.CONCURRENT_METADATA_FETCHES)),
+                    thread_name_prefix="ytdl-metadata",
+                ) as executor:
+                    futures = [executor.submit(resume_listed)] + [
+                        executor.submit(fetch, index, url)
+                        for index, url in enumerate(urls, start=1)
+                    ]
+                    for future in futures:
+                        future.result()
+            except Exception:
+                Logger.report_error("Unexpected error while queueing metadata.", ctx=ErrorContext(
+                    operation="Fetch metadata", traceback_str=traceback.format_exc(),
+                    exception=MetadataError("Metadata producer failed")))
+            finally:
+                ready_videos.put(finished)
+
+        def consume():
+            queued_paths = set()
+            while True:
+                try:
+                    # A timeout keeps the waiting main thread responsive to Ctrl+C.
+                    video = ready_videos.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                if video is finished:
+                    return
+                if video.meta_filepath in queued_paths:
+                    continue
+                queued_paths.add(video.meta_filepath)
+                yield video
+
+        producer = threading.Thread(target=produce, name="ytdl-metadata", daemon=True)
+        producer.start()
+        try:
+            YTDLManager.download_videos(
+                consume(),
+                cancel_event=cancel_event,
+                on_start=on_start,
+                on_result=on_result,
+                on_progress=on_progress,
+            )
+        finally:
+            producer.join()
+
+    @staticmethod
+    def download_pending_videos(
+        cancel_event: Optional[threading.Event] = None,
+        urls: Iterable[str] = (),
+        sync: bool = False,
+    ):
+        """Download every queued video, streaming in new metadata for ``urls``.
+
+        ``sync`` queues only new entries of playlists and channels.
+        """
+        def report_meta_error(url: str, error: str):
+            print(f"ERROR: {error}")
+
+        def report_result(video: Video, success: bool, error: Optional[str]):
             if not success:
                 print(f"Error downloading {video.title}: {error}")
 
+        YTDLManager.fetch_and_download(
+            urls,
+            cancel_event=cancel_event,
+            on_meta_error=report_meta_error,
+            on_result=report_result,
+            sync=sync,
+        )
         YTDLManager.cleanup_meta()
         logging.info("Batch complete.")
 
     @staticmethod
     def cleanup_meta():
+        store = YTDLManager.get_queue_store()
+        if store.pending_count() > 0:
+            return  # listed entries keep meta/, which marks the queue as live
+        store.purge_done()
         if os.path.isdir(Config.META_DIR) and not os.listdir(Config.META_DIR):
             try:
                 os.rmdir(Config.META_DIR)
@@ -1227,11 +4641,15 @@ class YTDLManager:
                     exception=MetadataError(str(e)), extra={"Error": str(e)}))
 
     @staticmethod
-    def update_self():
-        """Checks for updates and updates if necessary. (Simplified logic)"""
+    def update_self() -> Tuple[bool, str]:
+        """Checks for updates and updates if necessary. (Simplified logic)
+
+        Returns ``(completed, latest release tag or error)``; a new release
+        exits instead.
+        """
         if __version__ == "dev":
             logging.info("Dev version, skipping update check.")
-            return
+            return True, "dev"
 
         logging.info(f"Current version: {__version__}")
         try:
@@ -1275,21 +4693,34 @@ class YTDLManager:
             # Cleanup old updater
             if os.path.exists(os.path.join(Config._APP_DIR, "self_update.py")):
                 os.remove(os.path.join(Config._APP_DIR, "self_update.py"))
+            return True, latest_version
                 
         except Exception:
             Logger.report_error(traceback.format_exc(), ctx=ErrorContext(
                 traceback_str=traceback.format_exc(), exception=UpdateError("Self-update failed")))
+            return False, "Self-update failed"
 
     @staticmethod
-    def update_yt_dlp():
-        """Checks for yt-dlp updates (dynamic nightly check)."""
+    def update_yt_dlp() -> Tuple[bool, str]:
+        """Checks for yt-dlp updates (dynamic nightly check).
+
+        Returns ``(updated, yt-dlp version now installed or error)``.
+        """
         try:
             channel = Config.YT_DLP_VERSION_CHANNEL
             logging.info(f"Checking for yt-dlp updates ({channel})...")
             # We use --update-to [channel] which automatically checks if a newer version is available
             subprocess.run([Config.EXECUTABLE, '--update-to', channel], check=True)
+            result = subprocess.run(
+                [Config.EXECUTABLE, '--version'],
+                check=True, stdin=subprocess.DEVNULL, capture_output=True,
+                text=True, encoding="utf-8", errors="replace", timeout=30,
+            )
+            version = result.stdout.strip().splitlines()
+            return True, version[0] if version else "unknown"
         except Exception as e:
              logging.error(f"Failed to check/update yt-dlp: {e}")
+             return False, str(e)
 
     @staticmethod
     def _ensure_component_with_updater(
@@ -1301,9 +4732,15 @@ class YTDLManager:
         verification_failure_message: str,
         repair_failure_message: str,
         on_ready: Optional[Callable[[], None]] = None,
+        status: Optional[Tuple[bool, str]] = None,
     ) -> bool:
-        """Use self_update.py to repair one portable dependency when needed."""
-        ready, reason = status_check()
+        """Use self_update.py to repair one portable dependency when needed.
+
+        ``status`` is a ``status_check()`` result that is already known.
+        Several repairs can run at once, so an updater fetched for one of
+        them gets its own file name.
+        """
+        ready, reason = status if status is not None else status_check()
         if ready:
             if on_ready:
                 on_ready()
@@ -1318,12 +4755,17 @@ class YTDLManager:
                 repo = "minhung1126/YTDL"
                 updater_url = f"https://raw.githubusercontent.com/{repo}/main/self_update.py"
                 response = _http_get_with_retry(updater_url, timeout=15)
-                with open(updater_path, "wb") as f:
-                    f.write(response.content)
+                with tempfile.NamedTemporaryFile(
+                    mode="wb", delete=False, dir=Config._APP_DIR,
+                    prefix=".self_update-", suffix=".py",
+                ) as temporary_updater:
+                    temporary_updater.write(response.content)
+                    updater_path = temporary_updater.name
                 downloaded_updater = True
 
+            # The status check above already found the tools broken.
             result = subprocess.run(
-                [sys.executable, updater_path, updater_flag, Config.DISCORD_WEBHOOK],
+                [sys.executable, updater_path, updater_flag, Config.DISCORD_WEBHOOK, "--skip-check"],
                 cwd=Config._APP_DIR,
                 stdin=subprocess.DEVNULL,
                 stdout=subprocess.PIPE,
@@ -1358,7 +4800,7 @@ class YTDLManager:
         return ready
 
     @staticmethod
-    def ensure_ffmpeg():
+    def ensure_ffmpeg(status: Optional[Tuple[bool, str]] = None):
         """Repair portable FFmpeg tools when either required binary is missing."""
         return YTDLManager._ensure_component_with_updater(
             Config.ffmpeg_status,
@@ -1369,10 +4811,11 @@ class YTDLManager:
             "FFmpeg repair completed but tools are not ready: %s",
             "Unable to repair portable FFmpeg tools.\n%s",
             Config.refresh_ffmpeg_binaries,
+            status,
         )
 
     @staticmethod
-    def ensure_deno():
+    def ensure_deno(status: Optional[Tuple[bool, str]] = None):
         """Repair the portable Deno runtime used by yt-dlp JavaScript challenges."""
         return YTDLManager._ensure_component_with_updater(
             Config.deno_status,
@@ -1382,10 +4825,14 @@ class YTDLManager:
             "Deno",
             "Deno repair completed but the runtime is not ready: %s",
             "Unable to repair portable Deno runtime.\n%s",
+            status=status,
         )
 
     @staticmethod
-    def run_startup_maintenance(progress_callback: Optional[Callable[[str], None]] = None) -> Dict[str, bool]:
+    def run_startup_maintenance(
+        progress_callback: Optional[Callable[[str], None]] = None,
+        force_check: bool = False,
+    ) -> Dict[str, bool]:
         """Run the shared update and dependency checks required before downloading.
 
         Both the command-line and GUI entry points must use this method so a
@@ -1393,7 +4840,18 @@ class YTDLManager:
         behaviour depending on how it is launched.  Individual repair
         failures are logged and intentionally do not prevent yt-dlp from
         attempting its normal fallback behaviour.
+
+        The program update check runs alongside the read-only Deno and FFmpeg
+        probes.  The yt-dlp update and the repairs wait for it, because a new
+        release restarts the application (``update_self`` exits) and replaces
+        the updater they run; the relaunched program then does that work
+        itself, so the exit is raised at once without waiting for the probes.
+        ``progress_callback`` is called on the calling thread as each
+        component starts.  Checks that passed recently are skipped
+        (``MaintenanceState``) unless ``force_check`` is set.
         """
+        progress = queue.Queue()
+
         def report_progress(message: str):
             if progress_callback is None:
                 return
@@ -1402,31 +4860,157 @@ class YTDLManager:
             except Exception:
                 logging.warning("Unable to report startup progress.\n%s", traceback.format_exc())
 
-        report_progress("正在檢查程式更新…")
-        YTDLManager.update_self()
-        report_progress("正在檢查 yt-dlp nightly 更新…")
-        YTDLManager.update_yt_dlp()
-        report_progress("正在檢查或修復 Deno JavaScript runtime…")
-        deno_ready = YTDLManager.ensure_deno()
-        report_progress("正在檢查或修復 FFmpeg 與 FFprobe…")
-        ffmpeg_ready = YTDLManager.ensure_ffmpeg()
+        def step(message: str, func: Callable[..., Any], *args):
+            progress.put(message)
+            return func(*args)
+
+        def wait(*futures):
+            # Progress is drained here so the callback may touch a GUI; a
+            # finished future posts None to wake the loop.
+            for future in futures:
+                future.add_done_callback(lambda _: progress.put(None))
+            while True:
+                try:
+                    # A timeout keeps the waiting main thread responsive to Ctrl+C.
+                    message = progress.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                if message is not None:
+                    report_progress(message)
+                elif all(future.done() for future in futures):
+                    while not progress.empty():
+                        message = progress.get()
+                        if message is not None:
+                            report_progress(message)
+                    return [future.result() for future in futures]
+
+        def fresh(name: str, key: str, paths: Iterable[str] = ()) -> bool:
+            if force_check or not MaintenanceState.is_fresh(name, key, paths):
+                return False
+            logging.info("Skipping the %s check; it passed within the last check interval.", name)
+            return True
+
+        def check(
+            name: str, key: str, paths: Callable[[], List[str]], message: str,
+            func: Callable[[], Tuple[bool, str]],
+        ) -> None:
+            if fresh(name, key, paths()):
+                return
+            passed, detail = step(message, func)
+            if passed:
+                # Keeps the release tag or yt-dlp version the check found.
+                MaintenanceState.record(name, key, paths(), detail)
+
+        def probe(name: str, key: str, paths: Callable[[], List[str]], status_check: Callable[[], Tuple[bool, str]]):
+            # None marks a component that passed recently and is not probed again.
+            return None if fresh(name, key, paths()) else status_check()
+
+        def ensure(name, key, paths, message, func, status) -> bool:
+            status = status.result()
+            if status is None:
+                return func((True, "ready (checked recently)"))
+            ready = step(message, func, status)
+            if ready:
+                MaintenanceState.record(name, key, paths(), status[1])
+            return ready
+
+        # Paths are looked up again after an update or repair may have replaced the binaries.
+        no_paths = lambda: []
+        yt_dlp_paths = lambda: [shutil.which(Config.EXECUTABLE) or Config.EXECUTABLE]
+        deno_paths = lambda: [Config.get_deno_path()]
+        ffmpeg_paths = lambda: list(Config.get_ffmpeg_paths().values())
+        executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ytdl-maintenance")
+        try:
+            self_update = executor.submit(
+                check, "program", __version__, no_paths, "正在檢查程式更新…", YTDLManager.update_self
+            )
+            deno_status = executor.submit(probe, "deno", Config.DENO_VERSION, deno_paths, Config.deno_status)
+            ffmpeg_status = executor.submit(
+                probe, "ffmpeg", Config.FFMPEG_MIN_BUILD_DATE, ffmpeg_paths, Config.ffmpeg_status
+            )
+            wait(self_update)
+            yt_dlp_update = executor.submit(
+                check, "yt-dlp", Config.YT_DLP_VERSION_CHANNEL, yt_dlp_paths,
+                "正在檢查 yt-dlp nightly 更新…", YTDLManager.update_yt_dlp,
+            )
+            deno_ready = executor.submit(
+                ensure, "deno", Config.DENO_VERSION, deno_paths,
+                "正在檢查或修復 Deno JavaScript runtime…", YTDLManager.ensure_deno, deno_status,
+            )
+            ffmpeg_ready = executor.submit(
+                ensure, "ffmpeg", Config.FFMPEG_MIN_BUILD_DATE, ffmpeg_paths,
+                "正在檢查或修復 FFmpeg 與 FFprobe…", YTDLManager.ensure_ffmpeg, ffmpeg_status,
+            )
+            wait(yt_dlp_update, deno_ready, ffmpeg_ready)
+        except BaseException:
+            # After update_self exits, the relaunched program redoes the rest.
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown()
         return {
-            "deno": deno_ready,
-            "ffmpeg": ffmpeg_ready,
+            "deno": deno_ready.result(),
+            "ffmpeg": ffmpeg_ready.result(),
         }
 
-def main():
+def parse_args(argv: Optional[List[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Download YouTube videos and playlists with yt-dlp.",
+        fromfile_prefix_chars="@",
+    )
+    parser.add_argument(
+        "--sync", nargs="+", metavar="URL",
+        help="download only the new entries of these playlists or channels and exit "
+             "(@FILE reads one URL per line)",
+    )
+    parser.add_argument(
+        "--force-check", action="store_true",
+        help="run the startup update and dependency checks even if they passed recently",
+    )
+    parser.add_argument(
+        "--report", action="store_true",
+        help=f"print the job metrics recorded in {Config.METRICS_FILE} and exit",
+    )
+    parser.add_argument(
+        "--by", action="append", choices=sorted(MetricsStore.GROUPINGS), dest="group_bys",
+        help="group the report by this field (repeatable; default: day, playlist, format)",
+    )
+    parser.add_argument(
+        "--since", metavar="YYYY-MM-DD",
+        help="only report jobs started on or after this date (UTC)",
+    )
+    args = parser.parse_args(argv)
+    if args.sync:
+        invalid = [url for url in args.sync if not Config.is_youtube_url(url)]
+        if invalid:
+            parser.error(f"--sync expects YouTube URLs, got {', '.join(invalid)}")
+    if args.since is not None:
+        try:
+            datetime.strptime(args.since, "%Y-%m-%d")
+        except ValueError:
+            parser.error(f"--since expects YYYY-MM-DD, got {args.since!r}")
+    return args
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    if args.report:
+        print(MetricsStore.report(args.group_bys or ["day", "playlist", "format"], since=args.since))
+        return
     Logger.setup()
     queue_lock = None
     try:
-        YTDLManager.run_startup_maintenance()
+        YTDLManager.run_startup_maintenance(force_check=args.force_check)
         queue_lock = YTDLManager.acquire_queue_lock()
+        if args.sync:
+            YTDLManager.download_pending_videos(urls=args.sync, sync=True)
+            return
         while True:
             # Simple CLI Interaction
-            if os.path.isdir(Config.META_DIR) and os.listdir(Config.META_DIR):
+            if YTDLManager.has_pending_videos():
                 resp = input("Found temp files. Continue downloading? (Y/N) ").lower()
                 if resp == 'n':
-                    shutil.rmtree(Config.META_DIR)
+                    YTDLManager.discard_queue()
                 elif resp == 'y':
                     YTDLManager.download_pending_videos()
                 elif resp != 'y':
@@ -1437,12 +5021,7 @@ def main():
                 sys.exit(0)
             
             if Config.is_youtube_url(resp):
-                success, error = YTDLManager.dl_meta_from_url(resp)
-                if not success:
-                    print(f"ERROR: {error}")
-                    continue
-                
-                YTDLManager.download_pending_videos()
+                YTDLManager.download_pending_videos(urls=[resp])
             else:
                 logging.warning("Invalid URL.")
 
@@ -1,6 +1,10 @@
-import sys
 import os
-import shutil
+import sys
+
+# Cache bytecode, YTDL's included, in the private folder YTDL.py uses.
+if sys.pycache_prefix is None and not sys.flags.dont_write_bytecode:
+    sys.pycache_prefix = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".pycache")
+
 import traceback
 import threading
 import queue
@@ -8,8 +12,6 @@ import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 import YTDL 
 
-sys.dont_write_bytecode = True
-
 # Initialize logging immediately
 YTDL.Logger.setup()
 
@@ -21,9 +23,17 @@ UI_TEXT = {
     "window_title": "YouTube 網址自動下載器 | YouTube URL Auto-Downloader",
     "instructions": "點擊「開始偵測」後，程式會自動尋找您複製的 YouTube 網址。\n網址會顯示在下方列表中，您可以隨時點擊「全部下載」。",
     "detected_urls": "偵測到的網址 | Detected URLs",
+    "download_progress": "下載進度 | Download Progress",
+    "column_title": "標題 | Title",
+    "column_progress": "進度 | Progress",
+    "column_speed": "速度 | Speed",
+    "column_eta": "剩餘時間 | ETA",
+    "progress_postprocessing": "後處理中 | Post-processing",
     "start_detecting": "開始偵測 | Start Detecting",
     "stop_detecting": "停止偵測 | Stop Detecting",
     "download_all": "全部下載 | Download All",
+    "check_updates": "立即檢查更新 | Check for Updates",
+    "sync_mode": "同步模式：播放清單與頻道只下載新影片 | Sync mode: only new videos of playlists and channels",
     "status_ready": "就緒。請點擊「開始偵測」。 | Ready. Click 'Start Detecting' to begin.",
     "status_stopped": "已停止。點擊「開始偵測」以繼續。 | Stopped. Click 'Start Detecting' to resume.",
     "status_watching": "正在偵測剪貼簿中的網址... | Detecting URLs in clipboard...",
@@ -34,6 +44,8 @@ UI_TEXT = {
     "status_all_done": "所有下載已完成！可開始新一輪任務。 | All downloads complete! Ready for next session.",
     "status_error": "發生錯誤，請檢查日誌。 | An error occurred. Check logs.",
     "status_clipboard_error": "錯誤：無法存取剪貼簿。 | Error: Could not access clipboard.",
+    "status_checks_done": "更新與相依元件檢查完成。 | Update and dependency checks complete.",
+    "status_restarting": "發現新版本，程式即將重新啟動… | New version found. Restarting…",
     "msg_download_in_progress_title": "下載進行中 | Download In Progress",
     "msg_download_in_progress_body": "一個下載任務正在執行中。 | A download process is already running.",
     "msg_no_urls_title": "沒有網址 | No URLs",
@@ -50,14 +62,14 @@ class ClipboardWatcherApp:
     def __init__(self, master):
         self.master = master
         master.title(UI_TEXT["window_title"])
-        master.geometry("750x550")
+        master.geometry("750x620")
         master.resizable(False, False)
 
         self.is_watching = False
         self.detected_urls = set()
         self.clipboard_after_id = None
         self.download_thread = None
-        self._cancel_download = threading.Event()
+        self._cancel_download = YTDL.CancelEvent()
         self._ui_events = queue.Queue()
         self._closing = False
         self._queue_lock = YTDL.YTDLManager.acquire_queue_lock()
@@ -71,14 +83,14 @@ class ClipboardWatcherApp:
 
     def check_and_handle_existing_meta(self):
         """Check if there are unfinished downloads and ask user if they want to continue."""
-        if os.path.isdir(YTDL.Config.META_DIR) and os.listdir(YTDL.Config.META_DIR):
+        if YTDL.YTDLManager.has_pending_videos():
             result = self._show_resume_dialog(
                 UI_TEXT["msg_resume_download_title"],
                 UI_TEXT["msg_resume_download_body"]
             )
             if not result:
                 try:
-                    shutil.rmtree(YTDL.Config.META_DIR)
+                    YTDL.YTDLManager.discard_queue()
                 except Exception as e:
                     YTDL.Logger.report_error(
                         f"Failed to delete meta directory: {YTDL.Config.META_DIR}",
@@ -148,13 +160,32 @@ class ClipboardWatcherApp:
         self.download_button = ttk.Button(button_frame, text=UI_TEXT["download_all"], command=self.start_download)
         self.download_button.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=5)
 
+        # Same as launching with --force-check: rerun every startup check now.
+        self.check_button = ttk.Button(button_frame, text=UI_TEXT["check_updates"], command=self.start_maintenance_check)
+        self.check_button.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=5)
+
+        self.sync_var = tk.BooleanVar(value=False)
+        sync_check = ttk.Checkbutton(main_frame, text=UI_TEXT["sync_mode"], variable=self.sync_var)
+        sync_check.pack(anchor=tk.W, padx=5)
+
         url_frame = ttk.LabelFrame(main_frame, text=UI_TEXT["detected_urls"])
         url_frame.pack(fill=tk.BOTH, expand=True, pady=5)
 
-        self.url_text = scrolledtext.ScrolledText(url_frame, wrap=tk.WORD, height=15)
+        self.url_text = scrolledtext.ScrolledText(url_frame, wrap=tk.WORD, height=10)
         self.url_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         self.url_text.config(state=tk.DISABLED)
 
+        progress_frame = ttk.LabelFrame(main_frame, text=UI_TEXT["download_progress"])
+        progress_frame.pack(fill=tk.X, pady=5)
+
+        self.progress_tree = ttk.Treeview(
+            progress_frame, columns=("title", "progress", "speed", "eta"), show="headings", height=4
+        )
+        for column, width in (("title", 380), ("progress", 120), ("speed", 100), ("eta", 90)):
+            self.progress_tree.heading(column, text=UI_TEXT[f"column_{column}"])
+            self.progress_tree.column(column, width=width, anchor=tk.W if column == "title" else tk.E)
+        self.progress_tree.pack(fill=tk.X, padx=5, pady=5)
+
         self.status_var = tk.StringVar()
         self.status_var.set(UI_TEXT["status_ready"])
         status_bar = ttk.Label(self.master, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W, padding="2 5")
@@ -219,9 +250,27 @@ class ClipboardWatcherApp:
                         "下載失敗 | Download Failed",
                         f"錯誤原因 | Error Reason:\n{payload[0]}",
                     )
+                elif event_type == "progress_start" and not self._closing:
+                    key, title = payload
+                    if not self.progress_tree.exists(key):
+                        self.progress_tree.insert("", tk.END, iid=key, values=(title, "", "", ""))
+                elif event_type == "progress" and not self._closing:
+                    key, values = payload
+                    if self.progress_tree.exists(key):
+                        title = self.progress_tree.set(key, "title")
+                        self.progress_tree.item(key, values=(title, *values))
+                elif event_type == "progress_done" and not self._closing:
+                    if self.progress_tree.exists(payload[0]):
+                        self.progress_tree.delete(payload[0])
                 elif event_type == "download_done" and not self._closing:
+                    self.progress_tree.delete(*self.progress_tree.get_children())
                     self.watch_button.config(state=tk.NORMAL)
                     self.download_button.config(state=tk.NORMAL)
+                    self.check_button.config(state=tk.NORMAL)
+                elif event_type == "restart" and not self._closing:
+                    # The updater started by update_self relaunches the program.
+                    self._closing = True
+                    self._close_window()
         except queue.Empty:
             pass
 
@@ -232,6 +281,7 @@ class ClipboardWatcherApp:
         """Start downloading from existing meta files (resume flow)."""
         self.watch_button.config(state=tk.DISABLED)
         self.download_button.config(state=tk.DISABLED)
+        self.check_button.config(state=tk.DISABLED)
         self.status_var.set(UI_TEXT["status_meta_done"])
         self._cancel_download.clear()
         self.download_thread = threading.Thread(target=self._download_worker, args=([],), daemon=True)
@@ -254,6 +304,7 @@ class ClipboardWatcherApp:
 
         self.watch_button.config(state=tk.DISABLED)
         self.download_button.config(state=tk.DISABLED)
+        self.check_button.config(state=tk.DISABLED)
         self.status_var.set(UI_TEXT["status_starting_download"])
         self._cancel_download.clear()
 
@@ -263,47 +314,80 @@ class ClipboardWatcherApp:
         self.url_text.delete(1.0, tk.END)
         self.url_text.config(state=tk.DISABLED)
 
-        self.download_thread = threading.Thread(target=self._download_worker, args=(urls_to_download,), daemon=True)
+        self.download_thread = threading.Thread(
+            target=self._download_worker, args=(urls_to_download, self.sync_var.get()), daemon=True
+        )
         self.download_thread.start()
 
-    def _download_worker(self, urls):
+    def start_maintenance_check(self):
+        """Run the startup checks again, ignoring the recently-passed ones."""
+        if self.download_thread and self.download_thread.is_alive():
+            messagebox.showwarning(UI_TEXT["msg_download_in_progress_title"], UI_TEXT["msg_download_in_progress_body"])
+            return
+        self.watch_button.config(state=tk.DISABLED)
+        self.download_button.config(state=tk.DISABLED)
+        self.check_button.config(state=tk.DISABLED)
+        # Shares the download slot so checks and downloads never overlap.
+        self.download_thread = threading.Thread(target=self._maintenance_worker, daemon=True)
+        self.download_thread.start()
+
+    def _maintenance_worker(self):
+        try:
+            YTDL.YTDLManager.run_startup_maintenance(
+                lambda message: self._post_ui_event("status", message), force_check=True
+            )
+            self._post_ui_event("status", UI_TEXT["status_checks_done"])
+        except SystemExit:
+            self._post_ui_event("status", UI_TEXT["status_restarting"])
+            self._post_ui_event("restart")
+        except Exception:
+            self._post_ui_event("status", UI_TEXT["status_error"])
+            YTDL.Logger.report_error(
+                "The update and dependency check failed.", ctx=YTDL.ErrorContext(traceback_str=traceback.format_exc())
+            )
+        finally:
+            self._post_ui_event("download_done")
+
+    def _download_worker(self, urls, sync=False):
         try:
             if urls:
                 self._post_ui_event(
                     "status", UI_TEXT["status_processing_meta"].format(count=len(urls))
                 )
-                for url in urls:
-                    if self._cancel_download.is_set():
-                        return
-                    success, error = YTDL.YTDLManager.dl_meta_from_url(
-                        url, cancel_event=self._cancel_download
-                    )
-                    if self._cancel_download.is_set():
-                        return
-                    if not success:
-                        self._schedule_error_popup(error)
-
-            self._post_ui_event("status", UI_TEXT["status_meta_done"])
-            videos_to_download = YTDL.YTDLManager.load_videos()
-            total_videos = len(videos_to_download)
-            for i, video in enumerate(videos_to_download):
-                if self._cancel_download.is_set():
-                    return
-                title = video.title[:25]
+
+            def on_meta_error(url, error):
+                self._schedule_error_popup(error)
+
+            def on_start(video, position, total):
                 self._post_ui_event(
                     "status",
                     UI_TEXT["status_downloading"].format(
-                        i=i + 1, total=total_videos, title=title
+                        i=position, total=total, title=video.title[:25]
                     ),
                 )
-                success, error = YTDL.YTDLManager.download_video(
-                    video, cancel_event=self._cancel_download
-                )
-                if self._cancel_download.is_set():
-                    return
+                self._post_ui_event("progress_start", video.meta_filepath, video.title)
+
+            def on_progress(video, event):
+                self._post_ui_event("progress", video.meta_filepath, self._progress_values(event))
+
+            def on_result(video, success, error):
+                self._post_ui_event("progress_done", video.meta_filepath)
                 if not success:
                     self._schedule_error_popup(error)
 
+            # Downloads start as soon as each video's metadata is queued.
+            YTDL.YTDLManager.fetch_and_download(
+                urls,
+                cancel_event=self._cancel_download,
+                on_meta_error=on_meta_error,
+                on_start=on_start,
+                on_result=on_result,
+                on_progress=on_progress,
+                sync=sync,
+            )
+            if self._cancel_download.is_set():
+                return
+
             YTDL.YTDLManager.cleanup_meta()
             self._post_ui_event("status", UI_TEXT["status_all_done"])
         except Exception:
@@ -313,6 +397,21 @@ class ClipboardWatcherApp:
         finally:
             self._post_ui_event("download_done")
 
+    @staticmethod
+    def _progress_values(event):
+        """Return the progress, speed and ETA cells for one progress event."""
+        if event.phase == "postprocess":
+            return (UI_TEXT["progress_postprocessing"], "", "")
+        fraction = event.fraction
+        if fraction is not None:
+            progress = f"{fraction * 100:.1f}%"
+        else:
+            progress = YTDL.ProgressEvent.format_bytes(event.downloaded_bytes)
+        if event.fragment_index is not None and event.fragment_count:
+            progress += f" ({event.fragment_index}/{event.fragment_count})"
+        speed = f"{YTDL.ProgressEvent.format_bytes(event.speed)}/s" if event.speed is not None else ""
+        return (progress, speed, YTDL.ProgressEvent.format_eta(event.eta))
+
     def on_closing(self):
         if self.download_thread and self.download_thread.is_alive():
             if messagebox.askokcancel(UI_TEXT["msg_quit_title"], UI_TEXT["msg_quit_body"]):
@@ -376,7 +475,9 @@ if __name__ == "__main__":
             startup_window.update()
 
         # Keep the GUI startup lifecycle identical to the command-line mode.
-        YTDL.YTDLManager.run_startup_maintenance(show_startup_progress)
+        YTDL.YTDLManager.run_startup_maintenance(
+            show_startup_progress, force_check="--force-check" in sys.argv[1:]
+        )
         show_startup_progress("準備完成，正在開啟主視窗…")
         startup_window.destroy()
         startup_window = None
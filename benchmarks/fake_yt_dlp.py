@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Stand-in for yt-dlp that writes progress-style output at a fixed rate.
+
+Unknown arguments are ignored, so the script can replace ``Config.EXECUTABLE``
+for manual runs as well as drive ``SubprocessRunner.run`` in benchmarks.
+"""
+import argparse
+import sys
+import time
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=10000, help="number of lines to write")
+    parser.add_argument("--rate", type=float, default=0.0, help="lines per second; 0 writes as fast as possible")
+    parser.add_argument("--stderr-every", type=int, default=100, help="write every Nth line to stderr; 0 disables")
+    parser.add_argument("--exit-code", type=int, default=0)
+    options, _ = parser.parse_known_args()
+
+    interval = 1.0 / options.rate if options.rate > 0 else 0.0
+    started_at = time.monotonic()
+    for index in range(options.lines):
+        if interval:
+            delay = started_at + index * interval - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        if options.stderr_every and index % options.stderr_every == options.stderr_every - 1:
+            print(f"WARNING: [youtube] fake{index:07d}: synthetic warning line", file=sys.stderr, flush=True)
+            continue
+        percent = 100.0 * (index + 1) / options.lines
+        print(
+            f"[download] {percent:5.1f}% of ~ 512.00MiB at    8.00MiB/s ETA 00:{index % 60:02d} (frag {index}/{options.lines})",
+            flush=bool(interval),
+        )
+    return options.exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
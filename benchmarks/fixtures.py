@@ -0,0 +1,89 @@
+"""Info JSON fixtures for the benchmark suite."""
+import json
+import os
+import random
+import shutil
+from typing import List
+
+from YTDL import Video
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+# Format table of a 4K HDR YouTube upload (storyboards, DRC audio, DASH and
+# HLS variants of every itag) with URLs and signatures replaced.
+RECORDED_INFO_JSON = os.path.join(FIXTURE_DIR, "youtube_4k_info.json")
+
+_VIDEO_CODECS = ("vp9", "vp09.02.51.10", "avc1.640028", "avc1.4d401f", "av01.0.12M.08", "hev1.1.6.L150")
+_AUDIO_CODECS = ("opus", "mp4a.40.2", "mp4a.40.5", "ac-3")
+_PROTOCOLS = ("https", "m3u8_native", "http_dash_segments")
+
+
+def recorded_info() -> dict:
+    with open(RECORDED_INFO_JSON, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def synthetic_formats(count: int, seed: int = 0) -> List[dict]:
+    """Return ``count`` mixed video-only and audio-only formats."""
+    rng = random.Random(seed)
+    formats = []
+    for index in range(count):
+        if index % 5 == 0:
+            note = "medium, DRC" if rng.random() < 0.2 else "medium"
+            formats.append({
+                "format_id": f"a{index}",
+                "format_note": note,
+                "ext": rng.choice(("webm", "m4a")),
+                "protocol": rng.choice(_PROTOCOLS),
+                "vcodec": "none",
+                "acodec": rng.choice(_AUDIO_CODECS),
+                "audio_channels": rng.choice((2, 6)),
+                "asr": rng.choice((44100, 48000)),
+                "abr": rng.choice((48, 70, 129, 160)),
+            })
+            continue
+        height = rng.choice((144, 240, 360, 480, 720, 1080, 1440, 2160))
+        formats.append({
+            "format_id": f"v{index}",
+            "format_note": f"{height}p",
+            "ext": "webm",
+            "protocol": rng.choice(_PROTOCOLS),
+            "vcodec": rng.choice(_VIDEO_CODECS),
+            "acodec": "none",
+            "width": height * 16 // 9,
+            "height": height,
+            "fps": rng.choice((24, 30, 60)),
+            "dynamic_range": rng.choice(("SDR", "SDR", "HDR10", "HLG")),
+        })
+    return formats
+
+
+def synthetic_info(index: int, format_count: int = 120) -> dict:
+    video_id = f"bench{index:06d}"
+    return {
+        "id": video_id,
+        "title": f"Benchmark video {index}",
+        "webpage_url": f"https://www.youtube.com/watch?v={video_id}",
+        "playlist": "Benchmark playlist",
+        "playlist_id": "PLbenchmark",
+        "playlist_index": index + 1,
+        "formats": synthetic_formats(format_count, seed=index),
+    }
+
+
+def populate_meta_dir(meta_dir: str, count: int) -> List[str]:
+    """Fill ``meta_dir`` with ``count`` compact queue records of the recorded fixture.
+
+    One record is written through ``Video.from_info_json`` and copied, so
+    the files are byte-identical to what the metadata stage produces.
+    """
+    os.makedirs(meta_dir, exist_ok=True)
+    template_json = os.path.join(meta_dir, "template.info.json")
+    shutil.copyfile(RECORDED_INFO_JSON, template_json)
+    template = Video.from_info_json(template_json)
+    paths = []
+    for index in range(count):
+        path = os.path.join(meta_dir, f"bench_{index:06d}_fixture{Video.RECORD_SUFFIX}")
+        shutil.copyfile(template.meta_filepath, path)
+        paths.append(path)
+    os.remove(template.meta_filepath)
+    return paths
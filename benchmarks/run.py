@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""Microbenchmarks for the YTDL hot paths.
+
+Usage:
+    python benchmarks/run.py                         # run everything
+    python benchmarks/run.py -k selector             # names containing "selector"
+    python benchmarks/run.py --baseline old.json     # compare against an earlier run
+
+Results are written as JSON (``benchmarks/results/<UTC time>.json`` unless
+``--output`` is given) so that any two runs can be compared.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import YTDL  # noqa: E402
+from YTDL import (  # noqa: E402
+    Config, DownloadArchive, PreferredFormatSelector, QueueStore, SubprocessRunner, Video, YTDLManager,
+)
+import fixtures  # noqa: E402
+
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+FAKE_YT_DLP = os.path.join(BENCH_DIR, "fake_yt_dlp.py")
+
+
+@dataclass
+class Benchmark:
+    name: str
+    # Returns the timed callable, the number of items one call processes,
+    # and a cleanup callable.
+    setup: Callable[[argparse.Namespace], Tuple[Callable[[], object], int, Callable[[], None]]]
+    repeat: int
+    number: int
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str, repeat: int = 5, number: int = 1):
+    def register(setup):
+        BENCHMARKS.append(Benchmark(name, setup, repeat, number))
+        return setup
+    return register
+
+
+def _no_cleanup() -> None:
+    pass
+
+
+def _uncached_select(formats: list) -> Callable[[], object]:
+    def run():
+        PreferredFormatSelector._memo.clear()
+        return PreferredFormatSelector.select(formats)
+    return run
+
+
+@benchmark("selector.select.synthetic_120", repeat=7, number=200)
+def _selector_synthetic(options):
+    return _uncached_select(fixtures.synthetic_formats(120)), 1, _no_cleanup
+
+
+@benchmark("selector.select.synthetic_400", repeat=7, number=50)
+def _selector_synthetic_large(options):
+    return _uncached_select(fixtures.synthetic_formats(400, seed=1)), 1, _no_cleanup
+
+
+@benchmark("selector.select.recorded", repeat=7, number=200)
+def _selector_recorded(options):
+    return _uncached_select(fixtures.recorded_info()["formats"]), 1, _no_cleanup
+
+
+@benchmark("selector.select.memoised", repeat=7, number=200)
+def _selector_memoised(options):
+    formats = fixtures.recorded_info()["formats"]
+    PreferredFormatSelector.select(formats)
+    return (lambda: PreferredFormatSelector.select(formats)), 1, _no_cleanup
+
+
+@benchmark("selector.select_many.playlist_200", repeat=5, number=1)
+def _selector_batch(options):
+    # A playlist shares a handful of format layouts across its entries.
+    layouts = [fixtures.synthetic_formats(120, seed=seed) for seed in range(8)]
+    batch = [[dict(fmt) for fmt in layouts[index % len(layouts)]] for index in range(200)]
+
+    def run():
+        PreferredFormatSelector._memo.clear()
+        return PreferredFormatSelector.select_many(batch)
+    return run, len(batch), _no_cleanup
+
+
+_URL_SAMPLES = (
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://youtu.be/dQw4w9WgXcQ?t=42",
+    "https://www.youtube.com/playlist?list=PL590L5WQmH8fJ54F369BLDSqIwcs-TCfs",
+    "https://music.youtube.com/watch?v=dQw4w9WgXcQ&list=RDAMVM",
+    "https://www.youtube.com/@fixture/videos",
+    "https://www.youtube.com/channel/UCuAXFkgsw1L7xaCfnd5JJOw/streams",
+    "https://www.youtube.com/shorts/abcdefghijk",
+    "https://www.youtube-nocookie.com/embed/dQw4w9WgXcQ",
+    "https://m.youtube.com/watch?v=dQw4w9WgXcQ&feature=share",
+    "https://www.youtube.com/feed/subscriptions",
+    "https://example.com/watch?v=dQw4w9WgXcQ",
+    "youtube.com/watch?v=dQw4w9WgXcQ",
+)
+
+
+@benchmark("config.youtube_url_kind", repeat=7, number=5)
+def _url_kind(options):
+    urls = [f"{_URL_SAMPLES[index % len(_URL_SAMPLES)]}&n={index}" for index in range(1000)]
+
+    def run():
+        for url in urls:
+            Config._youtube_url_kind(url)
+    return run, len(urls), _no_cleanup
+
+
+@benchmark("config.extract_youtube_urls", repeat=7, number=5)
+def _extract_urls(options):
+    parts = []
+    for index in range(1000):
+        parts.append(f"Item {index}: see ({_URL_SAMPLES[index % len(_URL_SAMPLES)]}), then")
+        parts.append("some unrelated clipboard prose with https://example.org/page and punctuation.")
+    text = "\n".join(parts)
+    return (lambda: Config.extract_youtube_urls(text)), 1000, _no_cleanup
+
+
+@contextlib.contextmanager
+def _temporary_queue(options):
+    """Point Config at a temporary meta dir and queue database."""
+    temp_dir = tempfile.mkdtemp(prefix="ytdl-bench-")
+    saved = (Config.META_DIR, Config.QUEUE_DB)
+    Config.META_DIR = os.path.join(temp_dir, "meta")
+    Config.QUEUE_DB = os.path.join(temp_dir, "queue.sqlite3")
+    try:
+        yield temp_dir
+    finally:
+        if YTDLManager._queue_store is not None:
+            YTDLManager._queue_store.close()
+            YTDLManager._queue_store = None
+        Config.META_DIR, Config.QUEUE_DB = saved
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def _with_temporary_queue(options, prepare):
+    context = _temporary_queue(options)
+    temp_dir = context.__enter__()
+    try:
+        run, items = prepare(temp_dir)
+    except BaseException:
+        context.__exit__(*sys.exc_info())
+        raise
+    return run, items, lambda: context.__exit__(None, None, None)
+
+
+@benchmark("video.from_info_json.recorded", repeat=5, number=20)
+def _ingest(options):
+    def prepare(temp_dir):
+        os.makedirs(Config.META_DIR)
+        source = os.path.join(temp_dir, "source.info.json")
+        shutil.copyfile(fixtures.RECORDED_INFO_JSON, source)
+        target = os.path.join(Config.META_DIR, "bench.info.json")
+
+        def run():
+            shutil.copyfile(source, target)
+            return Video.from_info_json(target)
+        return run, 1
+
+    return _with_temporary_queue(options, prepare)
+
+
+@benchmark("queue_store.adopt_meta_dir", repeat=3, number=1)
+def _adopt(options):
+    def prepare(temp_dir):
+        fixtures.populate_meta_dir(Config.META_DIR, options.meta_files)
+
+        def run():
+            for suffix in ("", "-wal", "-shm"):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(Config.QUEUE_DB + suffix)
+            store = QueueStore(Config.QUEUE_DB, Config.META_DIR)
+            store.close()
+        return run, options.meta_files
+
+    return _with_temporary_queue(options, prepare)
+
+
+@benchmark("ytdl_manager.load_videos", repeat=5, number=1)
+def _load_videos(options):
+    def prepare(temp_dir):
+        fixtures.populate_meta_dir(Config.META_DIR, options.meta_files)
+        YTDLManager.get_queue_store()
+
+        def run():
+            videos = YTDLManager.load_videos()
+            assert len(videos) == options.meta_files, len(videos)
+        return run, options.meta_files
+
+    return _with_temporary_queue(options, prepare)
+
+
+@benchmark("download_archive.known.channel_resync", repeat=5, number=1)
+def _archive_resync(options):
+    """Check a 3,000-entry channel with 5 new uploads against a large archive."""
+    temp_dir = tempfile.mkdtemp(prefix="ytdl-bench-")
+    archive = DownloadArchive(os.path.join(temp_dir, "archive.sqlite3"))
+    with archive._transaction():
+        archive._conn.executemany(
+            "INSERT INTO archive (archive_key) VALUES (?)",
+            ((f"youtube {index:011d}",) for index in range(options.archive_entries)),
+        )
+    step = max(1, options.archive_entries // 2995)
+    channel = [f"youtube {index:011d}" for index in range(0, step * 2995, step)]
+    channel += [f"youtube new{index:08d}" for index in range(5)]
+
+    def run():
+        known = archive.known(channel)
+        new = [key for key in channel if key not in known]
+        assert len(new) == 5, len(new)
+
+    def cleanup():
+        archive.close()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return run, len(channel), cleanup
+
+
+@benchmark("subprocess_runner.run.drain", repeat=3, number=1)
+def _runner_drain(options):
+    args = [
+        sys.executable, FAKE_YT_DLP,
+        "--lines", str(options.fake_lines),
+        "--rate", str(options.fake_rate),
+    ]
+
+    def run():
+        # The runner echoes every line to the console; that cost is measured
+        # too, but the output itself is discarded.
+        with open(os.devnull, "w", encoding="utf-8") as devnull:
+            with contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+                returncode, _ = SubprocessRunner.run(args)
+        assert returncode == 0, returncode
+    return run, options.fake_lines, _no_cleanup
+
+
+def _measure(bench: Benchmark, options: argparse.Namespace) -> Dict[str, object]:
+    run, items, cleanup = bench.setup(options)
+    try:
+        run()  # warm-up
+        timings = []
+        for _ in range(max(1, bench.repeat if options.repeat is None else options.repeat)):
+            started_at = time.perf_counter()
+            for _ in range(bench.number):
+                run()
+            timings.append((time.perf_counter() - started_at) / bench.number)
+    finally:
+        cleanup()
+    median = statistics.median(timings)
+    return {
+        "seconds_min": min(timings),
+        "seconds_median": median,
+        "seconds_mean": statistics.fmean(timings),
+        "seconds_stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "repeat": len(timings),
+        "number": bench.number,
+        "items": items,
+        "items_per_second": items / median if median > 0 else None,
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_DIR, capture_output=True, text=True, check=False, timeout=10,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def _compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """Print a comparison table and return the names that regressed."""
+    regressions = []
+    print()
+    print(f"{'benchmark':<40} {'baseline':>12} {'current':>12} {'ratio':>8}")
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            print(f"{name:<40} {'-':>12} {result['seconds_median'] * 1e3:>10.3f}ms {'new':>8}")
+            continue
+        ratio = result["seconds_median"] / previous["seconds_median"] if previous["seconds_median"] else float("inf")
+        marker = ""
+        if ratio > 1 + threshold:
+            marker = "  REGRESSION"
+            regressions.append(name)
+        print(
+            f"{name:<40} {previous['seconds_median'] * 1e3:>10.3f}ms "
+            f"{result['seconds_median'] * 1e3:>10.3f}ms {ratio:>7.2f}x{marker}"
+        )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the YTDL microbenchmarks.")
+    parser.add_argument("-k", "--filter", default="", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--list", action="store_true", help="list benchmark names and exit")
+    parser.add_argument("--output", help="result JSON path (default: benchmarks/results/<UTC time>.json)")
+    parser.add_argument("--baseline", help="earlier result JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed median slowdown before flagging (default 0.10)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit with status 1 when a benchmark regressed")
+    parser.add_argument("--repeat", type=int, help="override the repeat count of every benchmark")
+    parser.add_argument("--meta-files", type=int, default=10000, help="queue size for the meta dir benchmarks")
+    parser.add_argument("--archive-entries", type=int, default=1000000, help="download archive size for the archive benchmark")
+    parser.add_argument("--fake-lines", type=int, default=50000, help="lines written by the fake yt-dlp")
+    parser.add_argument("--fake-rate", type=float, default=0.0, help="fake yt-dlp lines per second; 0 is unthrottled")
+    options = parser.parse_args(argv)
+
+    selected = [bench for bench in BENCHMARKS if options.filter in bench.name]
+    if options.list:
+        for bench in selected:
+            print(bench.name)
+        return 0
+
+    results = {}
+    for bench in selected:
+        print(f"{bench.name} ...", end=" ", flush=True)
+        result = _measure(bench, options)
+        results[bench.name] = result
+        print(f"{result['seconds_median'] * 1e3:.3f}ms median, {result['items_per_second']:.1f} items/s")
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "ytdl_version": getattr(YTDL, "__version__", None),
+        "parameters": {
+            "meta_files": options.meta_files,
+            "archive_entries": options.archive_entries,
+            "fake_lines": options.fake_lines,
+            "fake_rate": options.fake_rate,
+        },
+        "results": results,
+    }
+    output = options.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ") + ".json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if options.baseline:
+        with open(options.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("parameters") != report["parameters"]:
+            print(f"Note: baseline parameters differ: {baseline.get('parameters')}")
+        regressions = _compare(results, baseline.get("results", {}), options.threshold)
+        if regressions and options.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,12 +10,16 @@ import traceback
 import platform
 import shutil
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from uuid import uuid4
 from zipfile import ZipFile
 from typing import Optional
 
 MAX_DIAGNOSTIC_BYTES = 8 * 1024 * 1024
+DOWNLOAD_CHUNK_BYTES = 1024 * 1024
+FFMPEG_ZIP_URL = "https://github.com/yt-dlp/FFmpeg-Builds/releases/download/latest/ffmpeg-master-latest-win64-gpl.zip"
+DENO_ZIP_URL = "https://github.com/denoland/deno/releases/download/v{version}/deno-x86_64-pc-windows-msvc.zip"
 
 try:
     import requests
@@ -37,6 +41,117 @@ def _http_get_with_retry(url, max_retries=3, **kwargs):
                 time.sleep(2 ** attempt)
     raise last_exc
 
+def _content_range(response) -> tuple:
+    """Return (start, total) from a Content-Range header; unknown parts are None."""
+    match = re.fullmatch(r"bytes\s+(?:(\d+)-\d+|\*)/(\d+|\*)", response.headers.get("Content-Range", "").strip())
+    if not match:
+        return None, None
+    start, total = match.groups()
+    return (int(start) if start else None), (int(total) if total != "*" else None)
+
+
+def _download_to_file(url, path, max_retries=3, timeout=(10, 60), chunk_size=DOWNLOAD_CHUNK_BYTES):
+    """Stream ``url`` into ``path``, resuming with HTTP Range after a failure.
+
+    Bytes already written are kept between attempts, so a dropped
+    connection continues where it stopped.  A resume carries ``If-Range``
+    with the first response's ETag (or Last-Modified), so a file replaced on
+    the server meanwhile is sent whole, as is the file from a server that
+    ignores Range; either way the partial file is discarded.
+    ``max_retries`` counts consecutive attempts that made no progress.
+    Progress is printed every 10 percent (every 10 MiB if the size is unknown).
+    """
+    total = None
+    validator = None
+    failures = 0
+    last_reported = -1
+    with open(path, "ab") as destination:
+        while True:
+            done = destination.tell()
+            if total is not None and done >= total:
+                break
+            headers = {"Range": f"bytes={done}-"} if done else {}
+            if done and validator:
+                headers["If-Range"] = validator
+            try:
+                with requests.get(url, headers=headers, stream=True, timeout=timeout) as response:
+                    if response.status_code == 416 and done:
+                        _, total = _content_range(response)
+                        if total == done:
+                            break
+                        # The partial file no longer matches the resource.
+                        destination.seek(0)
+                        destination.truncate()
+                        total = None
+                        continue
+                    response.raise_for_status()
+                    if response.status_code == 206:
+                        start, total = _content_range(response)
+                        if start != done:
+                            raise requests.RequestException(f"Server resumed at byte {start}, expected {done}.")
+                    else:
+                        if done:
+                            print("The file changed or the server cannot resume; downloading from the start.")
+                            destination.seek(0)
+                            destination.truncate()
+                        # A weak ETag cannot be used with If-Range.
+                        etag = response.headers.get("ETag", "")
+                        validator = etag if etag and not etag.startswith("W/") else response.headers.get("Last-Modified")
+                        length = response.headers.get("Content-Length")
+                        total = int(length) if length and length.isdigit() else None
+                    for chunk in response.iter_content(chunk_size):
+                        destination.write(chunk)
+                        if destination.tell() > done:
+                            failures = 0
+                        milestone = (
+                            destination.tell() * 10 // total if total else destination.tell() // (10 * 1024 * 1024)
+                        )
+                        if milestone != last_reported:
+                            last_reported = milestone
+                            size = f" / {total / 1048576:.1f} MiB" if total else " MiB"
+                            print(f"Downloaded {destination.tell() / 1048576:.1f}{size}")
+                    if total is None:
+                        break
+                    if destination.tell() < total:
+                        raise requests.RequestException(
+                            f"Connection closed after {destination.tell()} of {total} bytes."
+                        )
+            except requests.RequestException as e:
+                destination.flush()
+                if destination.tell() <= done:
+                    failures += 1
+                if failures >= max_retries:
+                    raise
+                print(f"Download interrupted ({e}); resuming at byte {destination.tell()}...")
+                time.sleep(2 ** max(failures - 1, 0))
+    return total
+
+
+def _extract_zip_members(archive_path: str, members: dict, destination_dir: str) -> dict:
+    """Extract only the wanted members of a zip archive on disk.
+
+    ``members`` maps an archive path suffix such as ``"bin/ffmpeg.exe"`` to
+    the file name to write in ``destination_dir``.  Returns the written
+    paths by file name; a missing member raises ``RuntimeError``.
+    """
+    extracted = {}
+    with ZipFile(archive_path) as archive:
+        for info in archive.infolist():
+            name = info.filename.lower()
+            for suffix, filename in members.items():
+                suffix = suffix.lower()
+                if filename in extracted or not (name == suffix or name.endswith("/" + suffix)):
+                    continue
+                target_path = os.path.join(destination_dir, filename)
+                with archive.open(info) as source, open(target_path, "wb") as target:
+                    shutil.copyfileobj(source, target, DOWNLOAD_CHUNK_BYTES)
+                extracted[filename] = target_path
+    missing = sorted(set(members.values()) - set(extracted))
+    if missing:
+        raise RuntimeError(f"Downloaded archive is missing required files: {', '.join(missing)}")
+    return extracted
+
+
 def report_error_updater(message: str, webhook_url: str, operation: str = "Self-update") -> str:
     """
     Report an updater failure with an ID that is shared by its console output,
@@ -102,8 +217,18 @@ def _ffmpeg_build_date(executable_path: str) -> Optional[int]:
     return int(match.group(1)) if result.returncode == 0 and match else None
 
 
-def update_ffmpeg(YTDL_module, webhook_url: str, minimum_build_date: str = None):
-    """Repair portable FFmpeg tools below the verified minimum build date."""
+def _ffmpeg_build_dates(paths: dict) -> dict:
+    """Return ``_ffmpeg_build_date`` for each named binary, probed in parallel."""
+    with ThreadPoolExecutor(max_workers=len(paths)) as executor:
+        return dict(zip(paths, executor.map(_ffmpeg_build_date, paths.values())))
+
+
+def update_ffmpeg(YTDL_module, webhook_url: str, minimum_build_date: str = None, skip_check: bool = False):
+    """Repair portable FFmpeg tools below the verified minimum build date.
+
+    ``skip_check`` downloads the tools without probing them first, for a
+    caller that has just found them broken.
+    """
     try:
         # 1. Configuration
         configured_minimum = minimum_build_date
@@ -144,11 +269,11 @@ def update_ffmpeg(YTDL_module, webhook_url: str, minimum_build_date: str = None)
         if missing_binaries:
             print(f"{' and '.join(missing_binaries)} not found. Downloading...")
             should_update = True
+        elif skip_check:
+            print("Portable FFmpeg tools were reported as needing repair.")
+            should_update = True
         else:
-            build_dates = {
-                "FFmpeg": _ffmpeg_build_date(ffmpeg_exe),
-                "FFprobe": _ffmpeg_build_date(ffprobe_exe),
-            }
+            build_dates = _ffmpeg_build_dates({"FFmpeg": ffmpeg_exe, "FFprobe": ffprobe_exe})
             unreadable = [name for name, build_date in build_dates.items() if build_date is None]
             outdated = [
                 f"{name} ({build_date} < {minimum_build_date_value})"
@@ -174,48 +299,30 @@ def update_ffmpeg(YTDL_module, webhook_url: str, minimum_build_date: str = None)
             f"(minimum verified build date: {minimum_build_date_value})..."
         )
         
-        download_tag = "latest"
-        zip_url = f"https://github.com/yt-dlp/FFmpeg-Builds/releases/download/{download_tag}/ffmpeg-master-{download_tag}-win64-gpl.zip"
-        
-        print(f"Download URL: {zip_url}")
-        resp = _http_get_with_retry(zip_url, timeout=(10, 300))
-        
-        print("Extracting FFmpeg binaries...")
-        with ZipFile(io.BytesIO(resp.content)) as z:
-            extracted_binaries = set()
-            for member in z.namelist():
-                # Extract all .exe files in 'bin/'
-                if '/bin/' in member and member.endswith('.exe'):
-                    filename = os.path.basename(member)
-                    if not filename: continue
-                    
-                    # Rename to yt-dlp- prefix
-                    if filename.lower() == 'ffmpeg.exe':
-                        new_filename = 'yt-dlp-ffmpeg.exe'
-                    elif filename.lower() == 'ffprobe.exe':
-                        new_filename = 'yt-dlp-ffprobe.exe'
-                    else:
-                        continue # Skip other files if any
-                    
-                    target_path = os.path.join(target_dir, new_filename)
-                    # print(f"Extracting {filename} as {new_filename} to {target_dir}...")
-                    
-                    with z.open(member) as source, open(target_path, 'wb') as target:
-                        shutil.copyfileobj(source, target)
-                    extracted_binaries.add(new_filename)
-
-        expected_binaries = {'yt-dlp-ffmpeg.exe', 'yt-dlp-ffprobe.exe'}
-        if extracted_binaries != expected_binaries:
-            raise RuntimeError(
-                "Downloaded FFmpeg archive is missing required binaries: "
-                f"{', '.join(sorted(expected_binaries - extracted_binaries))}"
+        print(f"Download URL: {FFMPEG_ZIP_URL}")
+        # The archive is well over 100 MB: stage it on disk next to the
+        # binaries, then extract only the two tools (renamed with the
+        # yt-dlp- prefix) and move them into place.
+        stage_dir = tempfile.mkdtemp(prefix=".ytdl-ffmpeg-", dir=target_dir)
+        try:
+            archive_path = os.path.join(stage_dir, "ffmpeg.zip")
+            _download_to_file(FFMPEG_ZIP_URL, archive_path, timeout=(10, 300))
+
+            print("Extracting FFmpeg binaries...")
+            extracted = _extract_zip_members(
+                archive_path,
+                {"bin/ffmpeg.exe": "yt-dlp-ffmpeg.exe", "bin/ffprobe.exe": "yt-dlp-ffprobe.exe"},
+                stage_dir,
             )
+            os.remove(archive_path)
+            for filename, stage_path in extracted.items():
+                os.replace(stage_path, os.path.join(target_dir, filename))
+        finally:
+            shutil.rmtree(stage_dir, ignore_errors=True)
+
         if not all(os.path.isfile(path) for path in (ffmpeg_exe, ffprobe_exe)):
             raise RuntimeError("FFmpeg update did not install both FFmpeg and FFprobe.")
-        installed_build_dates = {
-            "FFmpeg": _ffmpeg_build_date(ffmpeg_exe),
-            "FFprobe": _ffmpeg_build_date(ffprobe_exe),
-        }
+        installed_build_dates = _ffmpeg_build_dates({"FFmpeg": ffmpeg_exe, "FFprobe": ffprobe_exe})
         invalid_binaries = [
             name for name, build_date in installed_build_dates.items()
             if build_date is None or build_date < minimum_build_date_value
@@ -268,8 +375,11 @@ def _installed_deno_version(deno_path: str) -> Optional[str]:
     return match.group(1) if result.returncode == 0 and match else None
 
 
-def ensure_portable_deno(YTDL_module, webhook_url: str) -> Optional[str]:
-    """Install the pinned Deno executable next to yt-dlp without touching PATH."""
+def ensure_portable_deno(YTDL_module, webhook_url: str, skip_check: bool = False) -> Optional[str]:
+    """Install the pinned Deno executable next to yt-dlp without touching PATH.
+
+    ``skip_check`` installs it without probing the current executable.
+    """
     deno_version = _config_value(YTDL_module, "DENO_VERSION")
     if not deno_version:
         report_error_updater("DENO_VERSION not found in YTDL.py.", webhook_url, "Deno update")
@@ -284,22 +394,16 @@ def ensure_portable_deno(YTDL_module, webhook_url: str) -> Optional[str]:
 
     target_dir = _portable_target_dir(YTDL_module)
     deno_path = os.path.join(target_dir, "deno.exe")
-    if _installed_deno_version(deno_path) == deno_version:
+    if not skip_check and _installed_deno_version(deno_path) == deno_version:
         print(f"Portable Deno is up to date ({deno_version}).")
         return deno_path
 
     stage_dir = tempfile.mkdtemp(prefix=".ytdl-deno-", dir=target_dir)
     try:
-        deno_zip_url = (
-            "https://github.com/denoland/deno/releases/download/"
-            f"v{deno_version}/deno-x86_64-pc-windows-msvc.zip"
-        )
         print(f"Downloading portable Deno {deno_version}...")
-        response = _http_get_with_retry(deno_zip_url, timeout=(10, 120))
-        stage_deno = os.path.join(stage_dir, "deno.exe")
-        with ZipFile(io.BytesIO(response.content)) as archive:
-            with archive.open("deno.exe") as source, open(stage_deno, "wb") as destination:
-                shutil.copyfileobj(source, destination)
+        archive_path = os.path.join(stage_dir, "deno.zip")
+        _download_to_file(DENO_ZIP_URL.format(version=deno_version), archive_path, timeout=(10, 120))
+        stage_deno = _extract_zip_members(archive_path, {"deno.exe": "deno.exe"}, stage_dir)["deno.exe"]
         if _installed_deno_version(stage_deno) != deno_version:
             raise RuntimeError("Downloaded deno.exe did not report the requested version.")
         os.replace(stage_deno, deno_path)
@@ -457,7 +561,7 @@ def main():
                 "FFmpeg update",
             )
             sys.exit(1)
-        sys.exit(0 if update_ffmpeg(YTDL, webhook_url) else 1)
+        sys.exit(0 if update_ffmpeg(YTDL, webhook_url, skip_check="--skip-check" in sys.argv[3:]) else 1)
 
     if len(sys.argv) > 1 and sys.argv[1] == "--ensure-deno":
         webhook_url = sys.argv[2] if len(sys.argv) > 2 else ""
@@ -470,7 +574,7 @@ def main():
                 "Deno update",
             )
             sys.exit(1)
-        sys.exit(0 if ensure_portable_deno(YTDL, webhook_url) else 1)
+        sys.exit(0 if ensure_portable_deno(YTDL, webhook_url, skip_check="--skip-check" in sys.argv[3:]) else 1)
 
     caller_script_path = sys.argv[1] if len(sys.argv) > 1 else None
     webhook_url = sys.argv[2] if len(sys.argv) > 2 else ""
@@ -0,0 +1,195 @@
+import asyncio
+import os
+import stat
+import sys
+import tempfile
+import textwrap
+import time
+import unittest
+from unittest import mock
+
+from YTDL import Config, Logger, MetricsStore, Video, YTDLManager
+
+FAKE_YT_DLP = textwrap.dedent("""\
+    #!{python}
+    import json, os, sys, time
+    from urllib.parse import parse_qs, urlparse
+
+    args = sys.argv[1:]
+    url = next(arg for arg in reversed(args) if arg.startswith("https://"))
+    video_id = parse_qs(urlparse(url).query)["v"][0]
+    if "--no-download" in args:
+        path = args[args.index("-o") + 1].replace("%(autonumber)s", "00001").replace("%(id)s", video_id) + ".info.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({{"id": video_id, "title": video_id, "webpage_url": url}}, f)
+        print(f"[info] Writing video metadata as JSON to: {{path}}", flush=True)
+        sys.exit(0)
+    if video_id.startswith("fail"):
+        print(f"ERROR: [youtube] {{video_id}}: Video unavailable", file=sys.stderr)
+        sys.exit(1)
+    runs = os.path.join(os.path.dirname(os.path.abspath(__file__)), "runs.log")
+    with open(runs, "a", encoding="utf-8") as f:
+        f.write(f"{{time.monotonic()}} 1\\n")
+    time.sleep(30 if video_id.startswith("slow") else 0.3)
+    with open(runs, "a", encoding="utf-8") as f:
+        f.write(f"{{time.monotonic()}} -1\\n")
+""")
+
+
+@unittest.skipIf(os.name == "nt", "the fake yt-dlp is a shebang script")
+class AsyncApiTests(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = temp_dir.name
+        executable = os.path.join(self.temp_dir, "yt-dlp")
+        with open(executable, "w", encoding="utf-8") as f:
+            f.write(FAKE_YT_DLP.format(python=sys.executable))
+        os.chmod(executable, os.stat(executable).st_mode | stat.S_IXUSR)
+        for name, value in (
+            ("EXECUTABLE", executable),
+            ("META_DIR", os.path.join(self.temp_dir, "meta")),
+            ("QUEUE_DB", os.path.join(self.temp_dir, "queue.sqlite3")),
+            ("ARCHIVE_DB", os.path.join(self.temp_dir, "archive.sqlite3")),
+            ("JOB_LOG_DIR", os.path.join(self.temp_dir, "logs")),
+            ("METRICS_FILE", os.path.join(self.temp_dir, "metrics.jsonl")),
+            ("FRAGMENT_TUNING_FILE", os.path.join(self.temp_dir, "fragment_tuning.json")),
+            ("DISCORD_WEBHOOK", ""),
+            ("YT_DLP_ENGINE", "subprocess"),
+        ):
+            patcher = mock.patch.object(Config, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self.close_store)
+
+    @staticmethod
+    def close_store():
+        if YTDLManager._queue_store is not None:
+            YTDLManager._queue_store.close()
+            YTDLManager._queue_store = None
+        if YTDLManager._archive is not None:
+            YTDLManager._archive.close()
+            YTDLManager._archive = None
+
+    def peak_concurrency(self):
+        with open(os.path.join(self.temp_dir, "runs.log"), encoding="utf-8") as f:
+            events = sorted((float(at), int(delta)) for at, delta in (line.split() for line in f))
+        running = peak = 0
+        for _, delta in events:
+            running += delta
+            peak = max(peak, running)
+        return peak
+
+    def test_metadata_and_bounded_batch_download(self):
+        async def scenario():
+            queued = []
+            results = await asyncio.gather(*(
+                YTDLManager.dl_meta_from_url_async(
+                    f"https://www.youtube.com/watch?v={video_id}", on_video=queued.append,
+                )
+                for video_id in ("a", "b", "c", "fail1")
+            ))
+            downloads = await YTDLManager.download_videos_async(queued, limit=2)
+            return results, queued, downloads
+
+        results, queued, downloads = asyncio.run(scenario())
+
+        self.assertEqual(results, [(True, None)] * 4)
+        self.assertEqual(sorted(video.video_id for video in queued), ["a", "b", "c", "fail1"])
+        outcomes = {video.video_id: result for video, result in zip(queued, downloads)}
+        self.assertEqual([outcomes[video_id] for video_id in "abc"], [(True, None)] * 3)
+        self.assertFalse(outcomes["fail1"][0])
+        self.assertIn("ERROR: [youtube] fail1: Video unavailable", outcomes["fail1"][1])
+        self.assertEqual(self.peak_concurrency(), 2)
+        self.assertEqual(YTDLManager.get_queue_store().pending_count(), 1)
+        records = list(MetricsStore.iter_records())
+        self.assertEqual(sorted(record["kind"] for record in records), ["download"] * 4 + ["metadata"] * 4)
+        failures = {record.get("video_id"): record["error_class"] for record in records if record["exit_code"]}
+        self.assertEqual(failures, {"fail1": "VideoUnavailableError"})
+
+    def test_cancelling_the_task_stops_the_job(self):
+        async def scenario():
+            queued = []
+            await YTDLManager.dl_meta_from_url_async("https://www.youtube.com/watch?v=slow", on_video=queued.append)
+            task = asyncio.create_task(YTDLManager.download_video_async(queued[0]))
+            await asyncio.sleep(0.5)
+            task.cancel()
+            started_at = time.monotonic()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            return time.monotonic() - started_at
+
+        self.assertLess(asyncio.run(scenario()), 5)
+        self.assertEqual(YTDLManager.get_queue_store().pending_count(), 1)
+
+    def test_blocking_work_does_not_stall_the_event_loop(self):
+        def slow_deno_status():
+            time.sleep(0.4)
+            return False, "probe is slow"
+
+        async def scenario():
+            lags = []
+
+            async def watch():
+                while True:
+                    started_at = time.monotonic()
+                    await asyncio.sleep(0.01)
+                    lags.append(time.monotonic() - started_at)
+
+            watcher = asyncio.create_task(watch())
+            queued = []
+            await YTDLManager.dl_meta_from_url_async("https://www.youtube.com/watch?v=a", on_video=queued.append)
+            result = await YTDLManager.download_video_async(queued[0])
+            watcher.cancel()
+            return result, max(lags)
+
+        with mock.patch.object(Config, "deno_status", slow_deno_status):
+            result, lag = asyncio.run(scenario())
+
+        self.assertEqual(result, (True, None))
+        self.assertLess(lag, 0.3)
+
+    def test_failures_are_reported_off_the_event_loop(self):
+        reports = []
+
+        def slow_report(message, ctx=None):
+            # Stands in for the synchronous Discord webhook upload.
+            time.sleep(0.4)
+            reports.append(ctx.traceback_str)
+            return "abc123"
+
+        engine = mock.Mock(live_rate_limit=True)
+        engine.run_async = mock.AsyncMock(side_effect=RuntimeError("engine exploded"))
+
+        async def scenario():
+            lags = []
+
+            async def watch():
+                while True:
+                    started_at = time.monotonic()
+                    await asyncio.sleep(0.01)
+                    lags.append(time.monotonic() - started_at)
+
+            watcher = asyncio.create_task(watch())
+            results = [
+                await YTDLManager.dl_meta_from_url_async("https://www.youtube.com/watch?v=a"),
+                await YTDLManager.download_video_async(
+                    Video("x.json.gz", {"id": "x", "webpage_url": "https://www.youtube.com/watch?v=x"}, "")
+                ),
+            ]
+            watcher.cancel()
+            return results, max(lags)
+
+        with mock.patch.object(YTDLManager, "get_engine", return_value=engine), \
+                mock.patch.object(Logger, "report_error", slow_report):
+            results, lag = asyncio.run(scenario())
+
+        for success, error in results:
+            self.assertFalse(success)
+            self.assertIn("abc123", error)
+        self.assertEqual(sum("RuntimeError: engine exploded" in report for report in reports), 2)
+        self.assertLess(lag, 0.3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from YTDL import BandwidthGovernor, Config, FragmentTuner, Video
+
+MIB = 1 << 20
+
+
+class BandwidthGovernorTests(unittest.TestCase):
+    def configure(self, limit=None, schedule=(), downloads=3):
+        for name, value in (
+            ("BANDWIDTH_LIMIT", limit),
+            ("BANDWIDTH_SCHEDULE", schedule),
+            ("CONCURRENT_DOWNLOADS", downloads),
+        ):
+            patcher = mock.patch.object(Config, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_parses_rates(self):
+        self.assertEqual(BandwidthGovernor.parse_rate("4M"), 4 * MIB)
+        self.assertEqual(BandwidthGovernor.parse_rate("1.5 MiB"), 3 * MIB // 2)
+        self.assertEqual(BandwidthGovernor.parse_rate("500k"), 500 * 1024)
+        self.assertEqual(BandwidthGovernor.parse_rate(1000), 1000)
+        self.assertIsNone(BandwidthGovernor.parse_rate(None))
+        for value in ("fast", "0", -5):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                BandwidthGovernor.parse_rate(value)
+
+    def test_schedule_windows_override_the_default_limit(self):
+        self.configure(limit="1M", schedule=(("09:00", "18:00", "4M"), ("23:00", "06:30", None)))
+
+        def budget_at(hour, minute=0):
+            return BandwidthGovernor.budget(datetime(2026, 10, 19, hour, minute))
+
+        self.assertEqual(budget_at(9), 4 * MIB)
+        self.assertEqual(budget_at(17, 59), 4 * MIB)
+        self.assertEqual(budget_at(18), MIB)
+        self.assertIsNone(budget_at(23, 30))
+        self.assertIsNone(budget_at(6, 29))
+        self.assertEqual(budget_at(6, 30), MIB)
+
+    def test_invalid_schedule_entries_are_ignored(self):
+        self.configure(limit="1M", schedule=(("9am", "5pm", "4M"), ("00:00", "24:00", "2M")))
+
+        with self.assertLogs(level="WARNING"):
+            self.assertEqual(BandwidthGovernor.budget(datetime(2026, 10, 19, 12)), 2 * MIB)
+
+    def test_without_a_budget_jobs_are_unlimited(self):
+        self.configure()
+
+        with BandwidthGovernor.lease(False) as fixed, BandwidthGovernor.lease(True) as live:
+            self.assertIsNone(fixed.limit())
+            self.assertIsNone(live.limit())
+
+    def test_adjustable_jobs_rebalance_as_jobs_start_and_finish(self):
+        self.configure(limit="6M")
+
+        with BandwidthGovernor.lease(True) as first:
+            self.assertEqual(first.limit(), 6 * MIB)
+            with BandwidthGovernor.lease(True) as second, BandwidthGovernor.lease(True):
+                self.assertEqual((first.limit(), second.limit()), (2 * MIB, 2 * MIB))
+            self.assertEqual(first.limit(), 6 * MIB)
+
+    def test_fixed_jobs_split_the_budget_by_the_running_jobs(self):
+        self.configure(limit="6M", downloads=3)
+
+        with BandwidthGovernor.lease(False) as fixed:
+            self.assertEqual(fixed.limit(), 6 * MIB)
+        with BandwidthGovernor.lease(False) as first, BandwidthGovernor.lease(False) as second:
+            self.assertEqual((first.limit(), second.limit()), (6 * MIB, 3 * MIB))
+            with BandwidthGovernor.lease(False) as third:
+                self.assertEqual(third.limit(), 2 * MIB)
+
+    def test_fixed_rates_do_not_follow_later_changes(self):
+        self.configure(limit="6M", downloads=3)
+
+        with BandwidthGovernor.lease(True) as live:
+            with BandwidthGovernor.lease(False) as fixed:
+                self.assertEqual(fixed.limit(), 3 * MIB)
+                self.assertEqual(live.limit(), 3 * MIB)
+                Config.BANDWIDTH_LIMIT = "1M"
+                self.assertEqual(fixed.limit(), 3 * MIB)
+                self.assertEqual(live.limit(), BandwidthGovernor.MIN_JOB_RATE)
+
+    def test_download_arguments_carry_the_job_rate(self):
+        video = Video("x.json.gz", {"id": "x", "webpage_url": "https://example.com/x"}, "")
+
+        self.assertNotIn("--limit-rate", video.get_download_args())
+        args = video.get_download_args(limit_rate=2 * MIB)
+        self.assertEqual(args[args.index("--limit-rate") + 1], str(2 * MIB))
+
+    def test_capped_jobs_do_not_train_the_fragment_tuner(self):
+        with mock.patch.object(FragmentTuner, "_save") as save:
+            FragmentTuner.observe({
+                "protocol": "dash", "host": "youtube.com", "concurrent_fragments": 2,
+                "bytes": 64 * MIB, "average_speed": 1e6, "exit_code": 0, "rate_limit": MIB,
+            })
+
+        save.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from YTDL import Config, DownloadArchive, Video, YTDLManager
+
+
+def youtube_video(video_id, **fields):
+    record = {"id": video_id, "title": video_id, "webpage_url": f"https://www.youtube.com/watch?v={video_id}", **fields}
+    return Video(os.path.join(Config.META_DIR, f"{video_id}.json.gz"), record, "")
+
+
+class DownloadArchiveTests(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = temp_dir.name
+        self.archive = DownloadArchive(os.path.join(self.temp_dir, "archive.sqlite3"))
+        self.addCleanup(self.archive.close)
+
+    def read_mirror(self):
+        with open(self.archive.yt_dlp_archive_path(), encoding="utf-8") as f:
+            return f.read().splitlines()
+
+    def test_keys_match_yt_dlp(self):
+        self.assertEqual(DownloadArchive.key("Youtube", "abc"), "youtube abc")
+        self.assertIsNone(DownloadArchive.key(None, "abc"))
+        self.assertIsNone(DownloadArchive.key("youtube", ""))
+
+    def test_add_contains_and_batch_lookup(self):
+        self.assertTrue(self.archive.add("youtube a"))
+        self.assertFalse(self.archive.add("youtube a"))
+        self.archive.add("youtube b")
+
+        self.assertIn("youtube a", self.archive)
+        self.assertNotIn("youtube c", self.archive)
+        self.assertNotIn(None, self.archive)
+        self.assertEqual(len(self.archive), 2)
+        keys = [f"youtube {index}" for index in range(1200)] + ["youtube a", "youtube b"]
+        self.assertEqual(self.archive.known(keys), {"youtube a", "youtube b"})
+
+    def test_keys_are_the_table_b_tree(self):
+        sql = self.archive._conn.execute("SELECT sql FROM sqlite_master WHERE name = 'archive'").fetchone()[0]
+
+        self.assertIn("WITHOUT ROWID", sql)
+
+    def test_text_copy_for_yt_dlp_follows_the_database(self):
+        self.archive.add("youtube a")
+        self.assertEqual(self.read_mirror(), ["youtube a"])
+
+        self.archive.add("youtube b")
+        self.assertEqual(self.read_mirror(), ["youtube a", "youtube b"])
+
+        with open(self.archive.mirror_path, "a", encoding="utf-8") as f:
+            f.write("youtube stray\n")
+        self.assertEqual(sorted(self.read_mirror()), ["youtube a", "youtube b"])
+
+    def test_failed_rebuild_keeps_the_text_copy(self):
+        self.archive.add("youtube a")
+        self.read_mirror()
+        with open(self.archive.mirror_path, "a", encoding="utf-8") as f:
+            f.write("youtube stray\n")
+
+        with mock.patch("YTDL.os.replace", side_effect=OSError("disk full")), self.assertRaises(OSError):
+            self.archive.yt_dlp_archive_path()
+
+        with open(self.archive.mirror_path, encoding="utf-8") as f:
+            self.assertEqual(f.read().splitlines(), ["youtube a", "youtube stray"])
+        self.assertEqual([name for name in os.listdir(self.temp_dir) if name.endswith(".tmp")], [])
+        self.assertEqual(self.read_mirror(), ["youtube a"])
+
+    def test_reopened_archive_keeps_its_entries(self):
+        self.archive.add("youtube a")
+        self.archive.close()
+
+        reopened = DownloadArchive(self.archive.db_path)
+        self.addCleanup(reopened.close)
+        self.assertIn("youtube a", reopened)
+
+
+class YouTubeVideoIdTests(unittest.TestCase):
+    def test_single_video_urls(self):
+        for url in (
+            "https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PL123",
+            "youtu.be/dQw4w9WgXcQ",
+            "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+            "https://www.youtube-nocookie.com/embed/dQw4w9WgXcQ",
+            "https://music.youtube.com/watch?v=dQw4w9WgXcQ",
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(Config.youtube_video_id(url), "dQw4w9WgXcQ")
+
+    def test_other_urls_have_no_video_id(self):
+        for url in (
+            "https://www.youtube.com/playlist?list=PL123",
+            "https://www.youtube.com/@channel/videos",
+            "https://www.youtube.com/clip/UgkxAbCdEfGhIjKlMnOpQrStUvWxYz0123456",
+            "https://www.youtube.com/watch?v=short",
+        ):
+            with self.subTest(url=url):
+                self.assertIsNone(Config.youtube_video_id(url))
+
+
+class ManagerArchiveTests(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = temp_dir.name
+        for name, value in (
+            ("META_DIR", os.path.join(self.temp_dir, "meta")),
+            ("QUEUE_DB", os.path.join(self.temp_dir, "queue.sqlite3")),
+            ("ARCHIVE_DB", os.path.join(self.temp_dir, "archive.sqlite3")),
+        ):
+            patcher = mock.patch.object(Config, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        os.makedirs(Config.META_DIR)
+        self.addCleanup(self.close_stores)
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+        self.addCleanup(os.chdir, cwd)
+
+    @staticmethod
+    def close_stores():
+        for name in ("_queue_store", "_archive"):
+            store = getattr(YTDLManager, name)
+            if store is not None:
+                store.close()
+                setattr(YTDLManager, name, None)
+
+    def test_archived_video_is_completed_without_starting_yt_dlp(self):
+        video = youtube_video("dQw4w9WgXcQ")
+        open(video.meta_filepath, "w").close()
+        YTDLManager.get_queue_store().add(video)
+        YTDLManager.get_archive().add("youtube dQw4w9WgXcQ")
+
+        with mock.patch.object(YTDLManager, "get_engine") as get_engine:
+            self.assertEqual(YTDLManager.download_video(video), (True, None))
+
+        get_engine.assert_not_called()
+        self.assertFalse(os.path.exists(video.meta_filepath))
+        self.assertEqual(YTDLManager.get_queue_store().pending_count(), 0)
+
+    def test_existing_output_file_is_adopted_into_the_archive(self):
+        video = youtube_video("dQw4w9WgXcQ", playlist="Mix 100%")
+        os.makedirs("Mix 100%")
+        open(os.path.join("Mix 100%", "Title.dQw4w9WgXcQ.mkv"), "w").close()
+
+        self.assertTrue(YTDLManager.is_downloaded(video))
+        self.assertIn("youtube dQw4w9WgXcQ", YTDLManager.get_archive())
+        self.assertFalse(YTDLManager.is_downloaded(youtube_video("aaaaaaaaaaa")))
+
+    def test_archived_single_video_url_is_not_extracted(self):
+        YTDLManager.get_archive().add("youtube dQw4w9WgXcQ")
+
+        with mock.patch.object(YTDLManager, "get_engine") as get_engine:
+            result = YTDLManager.dl_meta_from_url("https://youtu.be/dQw4w9WgXcQ")
+
+        self.assertEqual(result, (True, None))
+        get_engine.assert_not_called()
+
+    def test_metadata_fetch_passes_the_archive_to_yt_dlp(self):
+        YTDLManager.get_archive().add("youtube dQw4w9WgXcQ")
+
+        with mock.patch.object(Config, "get_youtube_js_runtime_args", return_value=([], "test")):
+            args = YTDLManager._meta_fetch_args("https://www.youtube.com/playlist?list=PL123", "batch")
+
+        with open(args[args.index("--download-archive") + 1], encoding="utf-8") as f:
+            self.assertEqual(f.read(), "youtube dQw4w9WgXcQ\n")
+
+    def test_archived_info_json_is_not_queued(self):
+        YTDLManager.get_archive().add("youtube dQw4w9WgXcQ")
+        YTDLManager.get_queue_store()  # opened before yt-dlp writes, as in _meta_fetch_args
+        path = os.path.join(Config.META_DIR, "batch_00001_dQw4w9WgXcQ.info.json")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('{"id": "dQw4w9WgXcQ", "extractor_key": "Youtube", "title": "t", '
+                    '"webpage_url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ"}')
+
+        YTDLManager._queue_info_json(path)
+
+        self.assertEqual(os.listdir(Config.META_DIR), [])
+        self.assertEqual(YTDLManager.get_queue_store().pending_count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from YTDL import Config, YTDLManager
+
+
+class DownloadWorkerPoolTests(unittest.TestCase):
+    def test_runs_at_most_the_configured_number_of_jobs(self):
+        running = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def fake_download(video, cancel_event=None, progress_callback=None):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+            return video != "bad", None if video != "bad" else "failed"
+
+        results = []
+        with mock.patch.object(Config, "CONCURRENT_DOWNLOADS", 2), \
+                mock.patch.object(YTDLManager, "download_video", side_effect=fake_download):
+            YTDLManager.download_videos(
+                ["a", "b", "bad", "c", "d"],
+                on_result=lambda video, success, error: results.append((video, success, error)),
+            )
+
+        self.assertEqual(peak, 2)
+        self.assertCountEqual(
+            results,
+            [("a", True, None), ("b", True, None), ("bad", False, "failed"),
+             ("c", True, None), ("d", True, None)],
+        )
+
+    def test_cancelled_batch_does_not_start_remaining_jobs(self):
+        cancel_event = threading.Event()
+        started = []
+
+        def fake_download(video, cancel_event=None, progress_callback=None):
+            started.append(video)
+            cancel_event.set()
+            return False, "Download cancelled."
+
+        results = []
+        with mock.patch.object(Config, "CONCURRENT_DOWNLOADS", 1), \
+                mock.patch.object(YTDLManager, "download_video", side_effect=fake_download):
+            YTDLManager.download_videos(
+                ["a", "b", "c"],
+                cancel_event=cancel_event,
+                on_result=lambda *result: results.append(result),
+            )
+
+        self.assertEqual(started, ["a"])
+        self.assertEqual(results, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
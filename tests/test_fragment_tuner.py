@@ -0,0 +1,122 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from YTDL import Config, FragmentTuner, Video
+
+MIB = 1 << 20
+
+
+def download(settings, speed, size=64 * MIB, exit_code=0):
+    return {
+        "kind": "download",
+        "protocol": settings.protocol,
+        "host": settings.host,
+        "concurrent_fragments": settings.concurrent_fragments,
+        "http_chunk_size": settings.http_chunk_size,
+        "bytes": size,
+        "average_speed": speed,
+        "exit_code": exit_code,
+    }
+
+
+class FragmentTunerTests(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = os.path.join(temp_dir.name, "fragment_tuning.json")
+        patcher = mock.patch.object(Config, "FRAGMENT_TUNING_FILE", self.path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(setattr, FragmentTuner, "_state", None)
+
+    def run_jobs(self, protocol, link, jobs=40):
+        """Feed ``jobs`` downloads whose speed is ``link(setting)``; return the settings used."""
+        used = []
+        for _ in range(jobs):
+            settings = FragmentTuner.settings_for(protocol, "https://www.youtube.com/watch?v=x")
+            used.append(settings)
+            value = settings.http_chunk_size if protocol == "https" else settings.concurrent_fragments
+            FragmentTuner.observe(download(settings, link(value)))
+        return used
+
+    def test_new_keys_start_from_the_configured_value(self):
+        settings = FragmentTuner.settings_for("http_dash_segments", "https://www.youtube.com/watch?v=x")
+
+        self.assertEqual((settings.protocol, settings.host), ("dash", "youtube.com"))
+        self.assertEqual(settings.args(), ["--concurrent-fragments", Config.CONCURRENT_FRAGMENTS])
+
+    def test_fast_link_climbs_to_more_fragments(self):
+        used = self.run_jobs("m3u8_native", lambda fragments: min(fragments, 8) * 1_000_000.0)
+
+        late = [settings.concurrent_fragments for settings in used[-10:]]
+        self.assertGreaterEqual(late.count(8), 7)
+
+    def test_throttled_link_settles_on_fewer_fragments(self):
+        used = self.run_jobs("dash", lambda fragments: 4_000_000.0 / fragments)
+
+        late = [settings.concurrent_fragments for settings in used[-10:]]
+        self.assertGreaterEqual(late.count(1), 7)
+
+    def test_single_file_downloads_tune_the_chunk_size(self):
+        best = 5 * MIB
+        used = self.run_jobs("https", lambda chunk: 9_000_000.0 if chunk == best else 2_000_000.0)
+
+        self.assertEqual(used[0].http_chunk_size, 0)
+        self.assertIn("--http-chunk-size", used[-1].args())
+        late = [settings.http_chunk_size for settings in used[-10:]]
+        self.assertGreaterEqual(late.count(best), 7)
+
+    def test_failed_and_small_downloads_are_ignored(self):
+        settings = FragmentTuner.settings_for("dash", "https://youtu.be/x")
+        FragmentTuner.observe(download(settings, 1e6, exit_code=1))
+        FragmentTuner.observe(download(settings, 1e6, size=MIB))
+
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_scores_persist_across_runs(self):
+        self.run_jobs("dash", lambda fragments: fragments * 1_000_000.0, jobs=6)
+        expected = FragmentTuner.settings_for("dash", "https://www.youtube.com/watch?v=x")
+
+        FragmentTuner._state = None
+        with open(self.path, encoding="utf-8") as f:
+            self.assertIn("dash youtube.com", json.load(f))
+        self.assertEqual(FragmentTuner.settings_for("dash", "https://m.youtube.com/watch?v=y"), expected)
+
+    def test_unreadable_state_file_is_ignored(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write('{"dash youtube.com": ')
+
+        with self.assertLogs(level="WARNING"):
+            settings = FragmentTuner.settings_for("dash", "https://www.youtube.com/watch?v=x")
+        self.assertEqual(settings.concurrent_fragments, int(Config.CONCURRENT_FRAGMENTS))
+
+    def test_download_arguments_use_the_selected_formats_protocol(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"https youtube.com": {"current": 5 << 20, "scores": {}, "jobs": 0}}, f)
+        info_path = os.path.join(os.path.dirname(self.path), "batch-0001_00001_x.info.json")
+        with open(info_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "id": "x",
+                "webpage_url": "https://www.youtube.com/watch?v=x",
+                "formats": [
+                    {"format_id": "137", "vcodec": "avc1", "acodec": "none", "protocol": "https"},
+                    {"format_id": "140", "vcodec": "none", "acodec": "mp4a.40.2", "ext": "m4a", "protocol": "https"},
+                ],
+            }, f)
+
+        # The queued record does not keep the format list; the protocol is
+        # stored when the format is selected.
+        video = Video.from_info_json(info_path)
+        self.assertNotIn("formats", video.record)
+        with mock.patch.object(Config, "get_youtube_js_runtime_args", return_value=([], "test")):
+            args = video.get_download_args()
+
+        self.assertEqual(video.selected_format, "137+140")
+        self.assertEqual(video.transfer.protocol, "https")
+        self.assertEqual(args[args.index("--http-chunk-size") + 1], str(5 << 20))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+from unittest import mock
+
+from YTDL import Config
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Generous enough for a slow machine; importing requests alone used to take
+# most of it.
+IMPORT_BUDGET_SECONDS = 0.25
+LAZY_MODULES = {"requests", "urllib3", "yt_dlp", "tkinter"}
+
+IMPORT_SCRIPT = textwrap.dedent("""\
+    import shutil, subprocess
+
+    def forbidden(*args, **kwargs):
+        raise AssertionError("importing YTDL must not look up or run programs")
+
+    shutil.which = subprocess.run = subprocess.check_call = subprocess.Popen = forbidden
+    import YTDL
+""")
+
+
+def import_ytdl():
+    """Import YTDL in a fresh interpreter; return its -X importtime tree."""
+    # Measure a normal launch, which reads and writes the bytecode cache.
+    env = {name: value for name, value in os.environ.items() if name != "PYTHONDONTWRITEBYTECODE"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_SCRIPT],
+        cwd=PROJECT_DIR, env=env, capture_output=True, text=True, timeout=60,
+    )
+    if result.returncode != 0:
+        raise AssertionError(result.stderr)
+    # Lines read "import time: self [us] | cumulative | name", children
+    # first and indented two spaces deeper than their parent.
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((len(name) - len(name.lstrip()), name.strip(), int(cumulative)))
+    index = next(index for index, row in enumerate(rows) if row[1] == "YTDL")
+    depth, _, cumulative = rows[index]
+    children = set()
+    for child_depth, name, _ in reversed(rows[:index]):
+        if child_depth <= depth:
+            break
+        children.add(name.split(".")[0])
+    return cumulative / 1_000_000, children
+
+
+class ImportTimeTests(unittest.TestCase):
+    def test_import_stays_within_budget_and_defers_heavy_modules(self):
+        import_ytdl()  # Let the first run write the bytecode cache.
+        runs = [import_ytdl() for _ in range(3)]
+
+        seconds = min(seconds for seconds, _ in runs)
+        self.assertLess(seconds, IMPORT_BUDGET_SECONDS, f"importing YTDL took {seconds:.3f} s")
+        self.assertFalse(runs[0][1] & LAZY_MODULES, "modules that should load on first use were imported")
+
+
+class FfmpegBinaryTests(unittest.TestCase):
+    def test_binary_is_looked_up_on_first_use(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        ffmpeg = os.path.join(temp_dir.name, "yt-dlp-ffmpeg.exe")
+        with open(ffmpeg, "wb"):
+            pass
+        lookup = mock.Mock(return_value={"ffmpeg": ffmpeg, "ffprobe": ffmpeg})
+
+        with mock.patch.object(Config, "get_ffmpeg_paths", lookup), \
+                mock.patch.object(Config, "FFMPEG_BINARY", None), \
+                mock.patch.object(Config, "_ffmpeg_binary_checked", False):
+            self.assertEqual(Config.ffmpeg_binary(), ffmpeg)
+            self.assertEqual(Config.ffmpeg_binary(), ffmpeg)
+
+        self.assertEqual(lookup.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,180 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import types
+import unittest
+from unittest import mock
+
+from YTDL import CancelEvent, Config, InProcessEngine, PrivateVideoError, SubprocessEngine, YTDLManager
+
+
+def stub_yt_dlp():
+    """Return a stand-in ``yt_dlp`` package with the API the engine uses.
+
+    The URL's last path part selects the behaviour of ``download``.
+    """
+    yt_dlp = types.ModuleType("yt_dlp")
+    utils = types.ModuleType("yt_dlp.utils")
+    version = types.ModuleType("yt_dlp.version")
+    version.__version__ = "2026.10.01"
+
+    class DownloadError(Exception):
+        pass
+
+    class DownloadCancelled(Exception):
+        pass
+
+    utils.DownloadError = DownloadError
+    utils.DownloadCancelled = DownloadCancelled
+    yt_dlp.utils = utils
+    yt_dlp.version = version
+    yt_dlp.calls = []
+
+    def parse_options(argv):
+        if "--bogus" in argv:
+            raise SystemExit(2)
+        urls = [arg for arg in argv if arg.startswith("https://")]
+        ydl_opts = {"format": argv[argv.index("-f") + 1]} if "-f" in argv else {}
+        if "--limit-rate" in argv:
+            ydl_opts["ratelimit"] = int(argv[argv.index("--limit-rate") + 1])
+        options = types.SimpleNamespace(load_info_filename=None)
+        return types.SimpleNamespace(ydl_opts=ydl_opts, urls=urls, options=options)
+
+    class YoutubeDL:
+        def __init__(self, params):
+            self.params = params
+            yt_dlp.calls.append(self)
+            self.rate_limits = []
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            return False
+
+        def progress(self, status="downloading"):
+            for hook in self.params["progress_hooks"]:
+                hook({"status": status})
+            self.rate_limits.append(self.params.get("ratelimit"))
+
+        def download(self, urls):
+            logger = self.params["logger"]
+            behaviour = urls[0].rsplit("/", 1)[1]
+            self.params["match_filter"]({"id": behaviour})
+            logger.debug("[debug] yt-dlp version 2026.10.01")
+            if behaviour == "ok":
+                logger.info(f"[youtube] {behaviour}: Downloading webpage")
+                return 0
+            if behaviour == "private":
+                logger.error("ERROR: [youtube] private: Private video. Sign in if you've been granted access")
+                raise DownloadError("private")
+            if behaviour == "broken":
+                raise RuntimeError("extractor crashed")
+            while True:  # "slow" and "throttled": download until cancelled
+                self.progress()
+                if behaviour == "throttled" and len(self.rate_limits) == 3:
+                    return 0
+                time.sleep(0.05)
+
+    yt_dlp.parse_options = parse_options
+    yt_dlp.YoutubeDL = YoutubeDL
+    return {"yt_dlp": yt_dlp, "yt_dlp.utils": utils, "yt_dlp.version": version}
+
+
+class InProcessEngineTests(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        for name, value in (
+            ("JOB_LOG_DIR", os.path.join(temp_dir.name, "logs")),
+            ("DISCORD_WEBHOOK", ""),
+        ):
+            patcher = mock.patch.object(Config, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.modules = stub_yt_dlp()
+        patcher = mock.patch.dict(sys.modules, self.modules)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.yt_dlp = self.modules["yt_dlp"]
+        self.engine = InProcessEngine()
+
+    def run_job(self, behaviour, *extra, **kwargs):
+        args = ["yt-dlp", "-f", "248+251", *extra, f"https://www.youtube.com/watch/{behaviour}"]
+        with mock.patch("sys.stdout"), mock.patch("sys.stderr"):
+            return self.engine.run(args, {"URL": behaviour}, **kwargs)
+
+    def test_executable_arguments_are_parsed_into_options(self):
+        lines = []
+
+        returncode, log = self.run_job("ok", line_callback=lines.append)
+
+        self.assertEqual(returncode, 0)
+        ydl = self.yt_dlp.calls[-1]
+        self.assertEqual(ydl.params["format"], "248+251")
+        self.assertIn("[youtube] ok: Downloading webpage\n", lines)
+        self.assertIn("[youtube] ok: Downloading webpage", log)
+        self.assertEqual(self.engine.version(), "2026.10.01")
+
+    def test_invalid_arguments_exit_with_code_2(self):
+        returncode, log = self.run_job("ok", "--bogus")
+
+        self.assertEqual(returncode, 2)
+        self.assertIn("Invalid yt-dlp arguments", log)
+        self.assertEqual(self.yt_dlp.calls, [])
+
+    def test_errors_map_to_exit_codes_and_are_classified_like_the_executable(self):
+        returncode, log = self.run_job("private")
+        self.assertEqual(returncode, 1)
+        self.assertIsInstance(YTDLManager._detect_specific_error(log), PrivateVideoError)
+
+        with self.assertLogs(level="ERROR"):
+            returncode, _ = self.run_job("broken")
+        self.assertEqual(returncode, -1)
+
+    def test_cancel_event_stops_the_job(self):
+        cancel_event = CancelEvent()
+        threading.Timer(0.2, cancel_event.set).start()
+        started_at = time.monotonic()
+
+        returncode, log = self.run_job("slow", cancel_event=cancel_event)
+
+        self.assertEqual(returncode, 1)
+        self.assertIn("Download cancelled.", log)
+        self.assertLess(time.monotonic() - started_at, 2)
+
+    def test_rate_limit_is_polled_while_downloading(self):
+        limits = iter([1_000_000, 500_000, None])
+
+        returncode, _ = self.run_job("throttled", "--limit-rate", "2000000", rate_limit=lambda: next(limits))
+
+        self.assertEqual(returncode, 0)
+        self.assertEqual(self.yt_dlp.calls[-1].rate_limits, [1_000_000, 500_000, None])
+
+
+class EngineSelectionTests(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(setattr, YTDLManager, "_engine", None)
+        self.addCleanup(setattr, YTDLManager, "_engine_setting", None)
+        YTDLManager._engine = None
+
+    def test_in_process_engine_is_used_when_yt_dlp_is_installed(self):
+        with mock.patch.dict(sys.modules, stub_yt_dlp()), \
+                mock.patch.object(Config, "YT_DLP_ENGINE", "in-process"):
+            self.assertIsInstance(YTDLManager.get_engine(), InProcessEngine)
+
+    def test_falls_back_to_the_executable_without_yt_dlp(self):
+        # A None entry makes "import yt_dlp" raise ImportError.
+        with mock.patch.dict(sys.modules, {"yt_dlp": None}), \
+                mock.patch.object(Config, "YT_DLP_ENGINE", "in-process"), \
+                self.assertLogs(level="WARNING"):
+            self.assertIsInstance(YTDLManager.get_engine(), SubprocessEngine)
+
+        with mock.patch.object(Config, "YT_DLP_ENGINE", "subprocess"):
+            self.assertIsInstance(YTDLManager.get_engine(), SubprocessEngine)
+
+
+if __name__ == "__main__":
+    unittest.main()
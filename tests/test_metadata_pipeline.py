@@ -0,0 +1,185 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from YTDL import Config, PreferredFormatSelector, Video, _InfoJsonWatcher
+
+
+class InfoJsonWatcherTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def write_info(self, name, title):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump({"webpage_url": f"https://youtu.be/{name}", "title": title}, handle)
+        return path
+
+    def test_emits_each_info_json_once_it_has_been_written(self):
+        emitted = []
+        watcher = _InfoJsonWatcher(emitted.append)
+        first = os.path.join(self.temp_dir.name, "00001_a.info.json")
+        second = os.path.join(self.temp_dir.name, "00002_b.info.json")
+
+        watcher(f"[info] Writing video metadata as JSON to: {first}\n")
+        self.assertEqual(emitted, [])
+        self.write_info("00001_a.info.json", "First")
+        watcher("[youtube] b: Downloading webpage\n")
+        self.assertEqual(emitted, [first])
+
+        watcher(f"[info] Writing video metadata as JSON to: {second}\n")
+        self.write_info("00002_b.info.json", "Second")
+        watcher("")
+        self.assertEqual(emitted, [first, second])
+
+    def test_ignores_announced_files_that_were_never_written(self):
+        emitted = []
+        watcher = _InfoJsonWatcher(emitted.append)
+        missing = os.path.join(self.temp_dir.name, "00001_missing.info.json")
+
+        watcher(f"[info] Writing video metadata as JSON to: {missing}\n")
+        watcher("ERROR: interrupted\n")
+        watcher("")
+
+        self.assertEqual(emitted, [])
+
+
+class CompactRecordTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def write_info(self, metadata):
+        path = os.path.join(self.temp_dir.name, "batch-0001_00001_abc.info.json")
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(metadata, handle)
+        return path
+
+    def test_info_json_is_replaced_by_a_compact_record(self):
+        formats = [
+            {"format_id": "315", "vcodec": "vp9", "acodec": "none", "height": 2160, "width": 3840,
+             "fps": 60, "protocol": "https", "url": "https://example.invalid/v", "fragments": [{}] * 50},
+            {"format_id": "251", "vcodec": "none", "acodec": "opus", "ext": "webm", "abr": 130,
+             "protocol": "https", "url": "https://example.invalid/a", "http_headers": {"User-Agent": "x"}},
+        ]
+        path = self.write_info({
+            "id": "abc",
+            "title": "Compact",
+            "webpage_url": "https://www.youtube.com/watch?v=abc",
+            "formats": formats,
+            "thumbnails": [{"url": "https://example.invalid/t"}] * 20,
+            "automatic_captions": {"en": [{"url": "https://example.invalid/c"}]},
+        })
+
+        video = Video.from_info_json(path)
+
+        self.assertFalse(os.path.exists(path))
+        self.assertTrue(video.meta_filepath.endswith("batch-0001_00001_abc.json.gz"))
+        record = video._read_meta()
+        self.assertEqual(
+            set(record), {"id", "title", "webpage_url", "formats", "format_family", "format_protocol"}
+        )
+        self.assertNotIn("url", record["formats"][0])
+        self.assertEqual(
+            PreferredFormatSelector.select(record["formats"]),
+            PreferredFormatSelector.select(formats),
+        )
+
+    def test_format_details_are_kept_with_the_selection(self):
+        path = self.write_info({
+            "id": "abc",
+            "title": "Family",
+            "webpage_url": "https://www.youtube.com/watch?v=abc",
+            "formats": [
+                {"format_id": "315", "vcodec": "vp9", "acodec": "none", "height": 2160, "protocol": "https"},
+                {"format_id": "251", "vcodec": "none", "acodec": "opus", "ext": "webm", "abr": 130,
+                 "protocol": "https"},
+            ],
+        })
+
+        video = Video.from_info_json(path)
+        # As loaded back from the queue database: the projected record only.
+        queued = Video(video.meta_filepath, dict(video.record), video.selected_format)
+        os.remove(video.meta_filepath)
+
+        self.assertEqual(video.selected_format, "315+251")
+        self.assertEqual(queued.format_family(), "vp9")
+        self.assertEqual(queued.transfer_settings().protocol, "https")
+
+    def test_entries_without_a_source_url_keep_the_full_info_json(self):
+        path = self.write_info({"id": "abc", "title": "Local", "formats": []})
+
+        video = Video.from_info_json(path)
+
+        self.assertEqual(video.meta_filepath, path)
+        self.assertIn("--load-info-json", video._get_fresh_source_args())
+
+
+class InfoJsonReuseTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def queue(self, expires_in):
+        expire = int(time.time() + expires_in)
+        path = os.path.join(self.temp_dir.name, "batch-0001_00001_abc.info.json")
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump({
+                "id": "abc",
+                "title": "Reuse",
+                "webpage_url": "https://www.youtube.com/watch?v=abc",
+                "formats": [
+                    {"format_id": "248", "vcodec": "vp9", "acodec": "none", "height": 1080,
+                     "protocol": "https", "url": f"https://r1.googlevideo.com/videoplayback?expire={expire}&itag=248"},
+                    {"format_id": "137", "vcodec": "avc1.640028", "acodec": "none", "height": 1080,
+                     "protocol": "https", "url": "https://example.invalid/no-expiry"},
+                    {"format_id": "251", "vcodec": "none", "acodec": "opus", "ext": "webm", "abr": 130,
+                     "protocol": "https", "url": f"https://r1.googlevideo.com/videoplayback?expire={expire}&itag=251"},
+                ],
+            }, handle)
+        return Video.from_info_json(path)
+
+    def test_fresh_info_json_is_loaded_with_only_the_selected_formats(self):
+        video = self.queue(expires_in=6 * 3600)
+
+        self.assertEqual(video.selected_format, "248+251")
+        self.assertEqual(video._get_fresh_source_args(), ["--load-info-json", video.reuse_path()])
+        with open(video.reuse_path(), encoding="utf-8") as handle:
+            kept = json.load(handle)
+        self.assertEqual([fmt["format_id"] for fmt in kept["formats"]], ["248", "251"])
+
+        video.remove_files()
+        self.assertEqual(os.listdir(self.temp_dir.name), [])
+
+    def test_info_json_near_expiry_is_not_kept(self):
+        video = self.queue(expires_in=Config.INFO_JSON_REUSE_MARGIN - 60)
+
+        self.assertFalse(os.path.exists(video.reuse_path()))
+        self.assertEqual(video._get_fresh_source_args()[-1], "https://www.youtube.com/watch?v=abc")
+
+    def test_stale_info_json_is_extracted_again_and_deleted(self):
+        video = self.queue(expires_in=6 * 3600)
+
+        with mock.patch.object(Config, "INFO_JSON_REUSE_MARGIN", 7 * 3600):
+            args = video._get_fresh_source_args()
+
+        self.assertEqual(args, ["--no-playlist", "https://www.youtube.com/watch?v=abc"])
+        self.assertFalse(os.path.exists(video.reuse_path()))
+
+    def test_formats_without_an_expiry_are_never_reused(self):
+        self.assertIsNone(Video._url_expiry([{"url": "https://example.invalid/v"}]))
+        self.assertEqual(
+            Video._url_expiry([
+                {"url": "https://a/videoplayback?expire=200"},
+                {"manifest_url": "https://manifest.googlevideo.com/api/manifest/dash/expire/100/ei/x"},
+            ]),
+            100,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+import YTDL
+from YTDL import Config, JobMetrics, MetricsStore, ProgressEvent
+
+
+def download_record(day, playlist, family, size, seconds, exit_code=0):
+    return {
+        "kind": JobMetrics.KIND_DOWNLOAD,
+        "playlist": playlist,
+        "format_family": family,
+        "started_at": f"{day}T12:00:00+00:00",
+        "duration": seconds + 1.0,
+        "phases": {"extract": 1.0, "download": seconds},
+        "bytes": size,
+        "peak_speed": size / seconds * 2,
+        "exit_code": exit_code,
+        "yt_dlp_version": "2026.09.01",
+    }
+
+
+class JobMetricsTests(unittest.TestCase):
+    def test_record_sums_fragments_and_reports_phases(self):
+        metrics = JobMetrics(JobMetrics.KIND_DOWNLOAD, video_id="abc")
+        on_line = metrics.chain_lines(None)
+        on_line("[debug] yt-dlp version stable@2026.09.01 from yt-dlp/yt-dlp\n")
+        for event in (
+            ProgressEvent("download", "downloading", downloaded_bytes=100, speed=50.0),
+            ProgressEvent("download", "finished", downloaded_bytes=400, total_bytes=400),
+            ProgressEvent("download", "downloading", downloaded_bytes=60, speed=80.0),
+            ProgressEvent("download", "finished", downloaded_bytes=200, total_bytes=200),
+            ProgressEvent("postprocess", "started", postprocessor="Merger"),
+            ProgressEvent("postprocess", "finished", postprocessor="Merger"),
+        ):
+            metrics.observe_progress(event)
+
+        record = metrics.record(0)
+
+        self.assertEqual(record["kind"], "download")
+        self.assertEqual(record["video_id"], "abc")
+        self.assertEqual(record["bytes"], 600)
+        self.assertEqual(record["peak_speed"], 80.0)
+        self.assertEqual(set(record["phases"]), {"extract", "download", "postprocess"})
+        self.assertEqual(record["yt_dlp_version"], "stable@2026.09.01")
+        self.assertIsNone(record["error_class"])
+        json.dumps(record)
+
+    def test_metadata_job_without_transfers_has_only_an_extract_phase(self):
+        record = JobMetrics(JobMetrics.KIND_METADATA, url="https://youtu.be/abc").record(1, "MetadataError")
+
+        self.assertEqual(list(record["phases"]), ["extract"])
+        self.assertEqual(record["bytes"], 0)
+        self.assertIsNone(record["average_speed"])
+        self.assertEqual(record["error_class"], "MetadataError")
+
+
+class MetricsStoreTests(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = os.path.join(temp_dir.name, "metrics.jsonl")
+        patcher = mock.patch.object(Config, "METRICS_FILE", self.path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_append_and_iterate_skip_damaged_lines(self):
+        MetricsStore.append(download_record("2026-10-01", "", "avc1", 1000, 2.0))
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('{"kind": "down')
+        MetricsStore.append({"kind": JobMetrics.KIND_METADATA, "duration": 3.0, "exit_code": 0})
+
+        self.assertEqual([record["kind"] for record in MetricsStore.iter_records()], ["download", "metadata"])
+
+    def test_missing_file_yields_nothing(self):
+        self.assertEqual(list(MetricsStore.iter_records()), [])
+        self.assertEqual(MetricsStore.report(["day"]), "No job metrics recorded yet.")
+
+    def test_summarize_groups_download_throughput(self):
+        records = [
+            download_record("2026-10-01", "Mix", "av01", 4000, 2.0),
+            download_record("2026-10-01", "Mix", "av01", 2000, 2.0, exit_code=1),
+            download_record("2026-10-02", "", "avc1", 1000, 1.0),
+            {"kind": JobMetrics.KIND_METADATA, "duration": 5.0, "exit_code": 0},
+        ]
+
+        by_format = {row["group"]: row for row in MetricsStore.summarize(records, "format")}
+
+        self.assertEqual(sorted(by_format), ["av01", "avc1"])
+        self.assertEqual((by_format["av01"]["jobs"], by_format["av01"]["failed"]), (2, 1))
+        self.assertEqual(by_format["av01"]["throughput"], 1500.0)
+        self.assertEqual(by_format["av01"]["peak_speed"], 4000.0)
+        self.assertEqual(
+            [row["group"] for row in MetricsStore.summarize(records, "playlist")],
+            ["(single videos)", "Mix"],
+        )
+
+    def test_report_filters_by_date_and_prints_each_grouping(self):
+        for record in (
+            download_record("2026-09-30", "Old", "vp09", 1000, 1.0),
+            download_record("2026-10-01", "Mix", "av01", 4096, 2.0),
+        ):
+            MetricsStore.append(record)
+        MetricsStore.append({
+            "kind": JobMetrics.KIND_METADATA, "started_at": "2026-10-01T08:00:00+00:00",
+            "duration": 3.0, "exit_code": 0,
+        })
+
+        with redirect_stdout(io.StringIO()) as output:
+            YTDL.main(["--report", "--by", "playlist", "--by", "yt-dlp", "--since", "2026-10-01"])
+        report = output.getvalue()
+
+        self.assertIn("Metadata jobs: 1 (0 failed), average 3.0s", report)
+        self.assertIn("Downloads by playlist", report)
+        self.assertIn("Downloads by yt-dlp", report)
+        self.assertIn("Mix", report)
+        self.assertIn("2.00KiB/s", report)
+        self.assertNotIn("Old", report)
+
+    def test_invalid_since_date_is_rejected(self):
+        with self.assertRaises(SystemExit), mock.patch("sys.stderr", io.StringIO()):
+            YTDL.parse_args(["--report", "--since", "yesterday"])
+
+
+if __name__ == "__main__":
+    unittest.main()
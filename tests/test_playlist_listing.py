@@ -0,0 +1,211 @@
+import json
+import os
+import stat
+import sys
+import tempfile
+import textwrap
+import unittest
+from unittest import mock
+
+from YTDL import CancelEvent, Config, QueueStore, YTDLManager
+
+PLAYLIST_URL = "https://www.youtube.com/playlist?list=PL123"
+
+FAKE_YT_DLP = textwrap.dedent("""\
+    #!{python}
+    import json, os, sys, time
+    from urllib.parse import parse_qs, urlparse
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    args = sys.argv[1:]
+    url = next(arg for arg in reversed(args) if arg.startswith("https://"))
+    if "--flat-playlist" in args:
+        with open(os.path.join(here, "listing.json"), encoding="utf-8") as f:
+            listing = json.load(f)
+        prefix = args[args.index("--print") + 1].split("%")[0]
+        for index, video_id in enumerate(listing, start=1):
+            entry = {{
+                "id": video_id, "url": f"https://www.youtube.com/watch?v={{video_id}}", "ie_key": "Youtube",
+                "title": video_id.upper(), "playlist": "Mix", "playlist_id": "PL123", "playlist_index": index,
+            }}
+            print(prefix + json.dumps(entry), flush=True)
+        sys.exit(0)
+    video_id = parse_qs(urlparse(url).query)["v"][0]
+    if video_id.startswith("fail"):
+        print(f"ERROR: [youtube] {{video_id}}: Video unavailable", file=sys.stderr)
+        sys.exit(1)
+    runs = os.path.join(here, "runs.log")
+    with open(runs, "a", encoding="utf-8") as f:
+        f.write(f"{{time.monotonic()}} 1\\n")
+    time.sleep(0.6 if video_id.startswith("slow") else 0.2)
+    with open(runs, "a", encoding="utf-8") as f:
+        f.write(f"{{time.monotonic()}} -1\\n")
+    path = args[args.index("-o") + 1].replace("%(autonumber)s", "00001").replace("%(id)s", video_id) + ".info.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({{"id": video_id, "extractor_key": "Youtube", "title": video_id, "webpage_url": url}}, f)
+    print(f"[info] Writing video metadata as JSON to: {{path}}", flush=True)
+""")
+
+
+@unittest.skipIf(os.name == "nt", "the fake yt-dlp is a shebang script")
+class PlaylistListingTests(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = temp_dir.name
+        executable = os.path.join(self.temp_dir, "yt-dlp")
+        with open(executable, "w", encoding="utf-8") as f:
+            f.write(FAKE_YT_DLP.format(python=sys.executable))
+        os.chmod(executable, os.stat(executable).st_mode | stat.S_IXUSR)
+        for name, value in (
+            ("EXECUTABLE", executable),
+            ("META_DIR", os.path.join(self.temp_dir, "meta")),
+            ("QUEUE_DB", os.path.join(self.temp_dir, "queue.sqlite3")),
+            ("ARCHIVE_DB", os.path.join(self.temp_dir, "archive.sqlite3")),
+            ("JOB_LOG_DIR", os.path.join(self.temp_dir, "logs")),
+            ("METRICS_FILE", os.path.join(self.temp_dir, "metrics.jsonl")),
+            ("FRAGMENT_TUNING_FILE", os.path.join(self.temp_dir, "fragment_tuning.json")),
+            ("CONCURRENT_ENTRY_RESOLUTIONS", 2),
+            ("DISCORD_WEBHOOK", ""),
+            ("YT_DLP_ENGINE", "subprocess"),
+        ):
+            patcher = mock.patch.object(Config, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self.close_stores)
+
+    @staticmethod
+    def close_stores():
+        for name in ("_queue_store", "_archive"):
+            store = getattr(YTDLManager, name)
+            if store is not None:
+                store.close()
+                setattr(YTDLManager, name, None)
+
+    def publish(self, video_ids):
+        with open(os.path.join(self.temp_dir, "listing.json"), "w", encoding="utf-8") as f:
+            json.dump(video_ids, f)
+
+    def peak_concurrency(self):
+        with open(os.path.join(self.temp_dir, "runs.log"), encoding="utf-8") as f:
+            events = sorted((float(at), int(delta)) for at, delta in (line.split() for line in f))
+        running = peak = 0
+        for _, delta in events:
+            running += delta
+            peak = max(peak, running)
+        return peak
+
+    def test_entries_are_listed_first_and_extracted_with_bounded_concurrency(self):
+        self.publish(["a", "b", "c", "d", "e"])
+        queued = []
+        counts = []
+
+        def on_video(video):
+            counts.append(YTDLManager.get_queue_store().pending_count())
+            queued.append(video)
+
+        result = YTDLManager.dl_meta_from_url(PLAYLIST_URL, on_video=on_video)
+
+        self.assertEqual(result, (True, None))
+        self.assertEqual(sorted(video.video_id for video in queued), ["a", "b", "c", "d", "e"])
+        # Every entry was in the queue before the first one was extracted.
+        self.assertGreaterEqual(counts[0], 5)
+        self.assertEqual(self.peak_concurrency(), 2)
+        store = YTDLManager.get_queue_store()
+        self.assertEqual(store.listed_records(), [])
+        self.assertEqual([video.video_id for video in YTDLManager.load_videos()], ["a", "b", "c", "d", "e"])
+        self.assertEqual({video.playlist for video in queued}, {"Mix"})
+
+    def test_concurrent_fetches_get_their_own_prefix_and_keep_the_submitted_order(self):
+        urls = ["https://www.youtube.com/watch?v=slow1", "https://www.youtube.com/watch?v=quick"]
+        arrived = []
+
+        def drain(videos, **kwargs):
+            arrived.extend(videos)
+
+        with mock.patch.object(Config, "CONCURRENT_METADATA_FETCHES", 3), \
+                mock.patch.object(YTDLManager, "download_videos", side_effect=drain):
+            YTDLManager.fetch_and_download(urls)
+
+        # Both fetches ran at once, and the second finished first.
+        self.assertEqual(self.peak_concurrency(), 2)
+        self.assertEqual([video.video_id for video in arrived], ["quick", "slow1"])
+        # Each yt-dlp run numbered its only file 00001; the per-URL prefix
+        # keeps the names apart and sorts them by submission order.
+        names = [os.path.basename(video.meta_filepath) for video in YTDLManager.load_videos()]
+        self.assertEqual(len(set(names)), 2)
+        self.assertEqual([name.split("_")[1:] for name in names], [["00001", "slow1.json.gz"], ["00001", "quick.json.gz"]])
+        batches, indexes = zip(*(name.split("_")[0].rsplit("-", 1) for name in names))
+        self.assertEqual(len(set(batches)), 1)
+        self.assertEqual(indexes, ("0001", "0002"))
+
+    def test_failed_entry_does_not_stop_the_playlist(self):
+        self.publish(["a", "fail1", "b"])
+        queued = []
+
+        success, error = YTDLManager.dl_meta_from_url(PLAYLIST_URL, on_video=queued.append)
+
+        self.assertFalse(success)
+        self.assertIn("fail1: Video unavailable", error)
+        self.assertEqual(sorted(video.video_id for video in queued), ["a", "b"])
+        self.assertEqual(YTDLManager.get_queue_store().listed_records(), [])
+
+    def test_archived_entries_are_not_extracted(self):
+        YTDLManager.get_archive().add("youtube b")
+        self.publish(["a", "b"])
+        queued = []
+
+        self.assertEqual(YTDLManager.dl_meta_from_url(PLAYLIST_URL, on_video=queued.append), (True, None))
+        self.assertEqual([video.video_id for video in queued], ["a"])
+
+    def test_cancelled_listing_is_resumed_by_the_next_session(self):
+        self.publish(["a", "b", "c", "d"])
+        cancel_event = CancelEvent()
+
+        def on_video(video):
+            cancel_event.set()
+
+        with mock.patch.object(Config, "CONCURRENT_ENTRY_RESOLUTIONS", 1):
+            result = YTDLManager.dl_meta_from_url(PLAYLIST_URL, cancel_event, on_video=on_video)
+
+        self.assertEqual(result, (False, "Download cancelled."))
+        store = YTDLManager.get_queue_store()
+        left = {record["url"].rsplit("=", 1)[1] for record in store.listed_records()}
+        self.assertTrue({"b", "c", "d"} <= left)
+        self.assertTrue(YTDLManager.has_pending_videos())
+
+        queued = []
+        self.assertEqual(YTDLManager.resolve_listed(on_video=queued.append), (True, None))
+
+        self.assertEqual(store.listed_records(), [])
+        self.assertTrue({"b", "c", "d"} <= {video.video_id for video in queued})
+        self.assertEqual(
+            [video.video_id for video in YTDLManager.load_videos()], ["a", "b", "c", "d"]
+        )
+        self.assertEqual(
+            {record["playlist"] for record in (entry["record"] for entry in store.pending_records())}, {"Mix"}
+        )
+
+
+class ListedRecordTests(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.store = QueueStore(os.path.join(temp_dir.name, "queue.sqlite3"), temp_dir.name)
+        self.addCleanup(self.store.close)
+
+    def test_listed_entries_count_as_pending_but_are_not_downloadable(self):
+        self.store.add_listed("b-00001", "a", "A", "https://www.youtube.com/watch?v=a", {"playlist_index": 1})
+
+        self.assertEqual(self.store.pending_count(), 1)
+        self.assertEqual(self.store.pending_records(), [])
+        self.assertEqual(self.store.listed_records(), [{
+            "name": "b-00001", "url": "https://www.youtube.com/watch?v=a", "entry_fields": {"playlist_index": 1},
+        }])
+
+        self.store.forget("b-00001")
+        self.assertEqual(self.store.pending_count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
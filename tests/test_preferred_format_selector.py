@@ -1,7 +1,10 @@
 import json
 import os
+import random
 import tempfile
 import unittest
+from collections import OrderedDict
+from unittest import mock
 
 from YTDL import PreferredFormatSelector, Video
 
@@ -32,6 +35,29 @@ def audio(format_id, codec, ext, abr=128, protocol="https"):
     }
 
 
+def reference_select(formats):
+    """The original pairwise ranking, kept to check the indexed selector."""
+    selector = PreferredFormatSelector
+    audio_formats = [fmt for fmt in formats if selector._is_audio_only(fmt)]
+    candidates = []
+    for fmt in formats:
+        if not selector._is_video_only(fmt):
+            continue
+        family = selector._video_family(fmt)
+        if family is None:
+            continue
+        matching_audio = [a for a in audio_formats if selector._matches_required_audio(a, family)]
+        if not matching_audio:
+            continue
+        best_audio = max(matching_audio, key=selector._audio_sort_key)
+        key = selector._pair_sort_key(fmt, family, selector._audio_sort_key(best_audio))
+        candidates.append((key, fmt, best_audio))
+    if not candidates:
+        return None
+    _, best_video, best_audio = max(candidates, key=lambda candidate: candidate[0])
+    return f"{best_video['format_id']}+{best_audio['format_id']}"
+
+
 class PreferredFormatSelectorTests(unittest.TestCase):
     def setUp(self):
         self.opus = audio("251", "opus", "webm")
@@ -131,6 +157,96 @@ class PreferredFormatSelectorTests(unittest.TestCase):
 
         self.assertIsNone(PreferredFormatSelector.select(formats))
 
+    def test_select_many_matches_select_for_each_list(self):
+        batch = [
+            [video("315", "vp9", 2160), video("299", "avc1.64002a", 2160), self.opus, self.m4a],
+            [video("299", "avc1.64002a", 2160), self.m4a],
+            [video("299", "avc1.64002a", 2160), self.opus],
+            None,
+        ]
+
+        self.assertEqual(
+            PreferredFormatSelector.select_many(batch),
+            ["315+251", "299+140", None, None],
+        )
+
+    def test_select_many_ranks_each_format_layout_once(self):
+        layout = [video("315", "vp9", 2160), video("299", "avc1.64002a", 2160), self.opus, self.m4a]
+        batch = [[dict(fmt) for fmt in layout] for _ in range(300)] + [layout[1:]]
+        ranked = []
+        original = PreferredFormatSelector._select_uncached.__func__
+
+        def counting(cls, formats):
+            ranked.append(formats)
+            return original(cls, formats)
+
+        # An empty memo that keeps nothing: sharing comes from the batch alone.
+        with mock.patch.object(PreferredFormatSelector, "_memo", OrderedDict()), \
+                mock.patch.object(PreferredFormatSelector, "_MEMO_SIZE", 0), \
+                mock.patch.object(PreferredFormatSelector, "_select_uncached", classmethod(counting)):
+            selected = PreferredFormatSelector.select_many(batch)
+
+        self.assertEqual(selected, ["315+251"] * 300 + ["299+140"])
+        self.assertEqual(len(ranked), 2)
+
+    def test_family_names_the_selected_video_codec(self):
+        formats = [video("315", "vp9", 2160), video("400", "hev1", 2160), self.opus]
+
+        self.assertEqual(PreferredFormatSelector.family("315+251", formats), "vp9")
+        self.assertEqual(PreferredFormatSelector.family("400+251", formats), "other")
+        self.assertEqual(PreferredFormatSelector.family("999+251", formats), "unknown")
+        self.assertEqual(PreferredFormatSelector.family(None, formats), "fallback")
+
+    def test_memoised_results_follow_the_format_fields(self):
+        formats = [video("315", "vp9", 2160), video("299", "avc1.64002a", 2160), self.opus, self.m4a]
+        self.assertEqual(PreferredFormatSelector.select(formats), "315+251")
+
+        formats[0] = dict(formats[0], height=1080)
+        self.assertEqual(PreferredFormatSelector.select(formats), "299+140")
+
+    def test_lists_with_the_same_ids_but_different_fields_get_their_own_pick(self):
+        first = [video("v1", "vp9", 1080), video("v2", "vp9", 720), self.opus]
+        second = [video("v1", "vp9", 720), video("v2", "vp9", 1080), self.opus]
+        third = [video("v1", "vp9", 1080, fps=30), video("v2", "vp9", 1080, fps=60), self.opus]
+
+        self.assertEqual(PreferredFormatSelector.select(first), "v1+251")
+        self.assertEqual(PreferredFormatSelector.select(second), "v2+251")
+        self.assertEqual(PreferredFormatSelector.select(third), "v2+251")
+        self.assertEqual(
+            PreferredFormatSelector.select_many([first, second, third, first]),
+            ["v1+251", "v2+251", "v2+251", "v1+251"],
+        )
+
+    def test_indexed_selection_matches_pairwise_ranking(self):
+        rng = random.Random(9)
+        video_codecs = ("vp9", "vp09.00.51.08", "avc1.64002a", "av01.0.13M.08", "h264", "hev1")
+        audio_codecs = ("opus", "mp4a.40.2", "mp4a.40.5", "aac", "ac-3")
+        for case in range(300):
+            formats = []
+            for index in range(rng.randint(0, 25)):
+                formats.append(video(
+                    f"v{index}",
+                    rng.choice(video_codecs),
+                    rng.choice((360, 720, 1080, 2160)),
+                    fps=rng.choice((24, 30, 60)),
+                    dynamic_range=rng.choice(("SDR", "HDR10", "HLG", None)),
+                    protocol=rng.choice(("https", "m3u8_native", "http_dash_segments")),
+                ))
+            for index in range(rng.randint(0, 8)):
+                fmt = audio(
+                    f"a{index}",
+                    rng.choice(audio_codecs),
+                    rng.choice(("webm", "m4a")),
+                    abr=rng.choice((48, 128, 160)),
+                    protocol=rng.choice(("https", "m3u8_native")),
+                )
+                if rng.random() < 0.2:
+                    fmt["format_note"] = "DRC"
+                formats.append(fmt)
+            rng.shuffle(formats)
+            with self.subTest(case=case):
+                self.assertEqual(PreferredFormatSelector.select(formats), reference_select(formats))
+
     def test_video_download_arguments_use_the_selected_format_ids(self):
         metadata = {
             "webpage_url": "https://www.youtube.com/watch?v=test-video",
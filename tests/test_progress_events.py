@@ -0,0 +1,82 @@
+import io
+import json
+import sys
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+
+from YTDL import ProgressEvent, SubprocessRunner
+
+
+def progress_line(phase, **status):
+    return f"{ProgressEvent.PREFIX}{phase} {json.dumps(status)}"
+
+
+class ProgressEventTests(unittest.TestCase):
+    def test_parses_a_download_progress_line(self):
+        event = ProgressEvent.parse(progress_line(
+            "download",
+            status="downloading",
+            downloaded_bytes=512,
+            total_bytes=None,
+            total_bytes_estimate=2048,
+            speed=256.0,
+            eta=6,
+            elapsed=2.5,
+            fragment_index=3,
+            fragment_count=8,
+        ))
+
+        self.assertEqual(event.phase, "download")
+        self.assertEqual(event.status, "downloading")
+        self.assertEqual(event.downloaded_bytes, 512)
+        self.assertEqual(event.total_bytes, 2048)
+        self.assertTrue(event.total_is_estimate)
+        self.assertEqual(event.fraction, 0.25)
+        self.assertEqual((event.fragment_index, event.fragment_count), (3, 8))
+        self.assertEqual(
+            event.describe(),
+            "[download]  25.0% of ~2.00KiB at 256B/s ETA 00:06 (frag 3/8)",
+        )
+
+    def test_parses_a_postprocessor_line(self):
+        event = ProgressEvent.parse(progress_line("postprocess", status="started", postprocessor="Merger"))
+
+        self.assertEqual((event.phase, event.status, event.postprocessor), ("postprocess", "started", "Merger"))
+        self.assertIsNone(event.fraction)
+        self.assertEqual(event.describe(), "[postprocess] Merger: started")
+
+    def test_ignores_other_and_malformed_lines(self):
+        self.assertIsNone(ProgressEvent.parse("[download]  10.0% of 1.00MiB"))
+        self.assertIsNone(ProgressEvent.parse(f"{ProgressEvent.PREFIX}download {{not json"))
+        self.assertIsNone(ProgressEvent.parse(f"{ProgressEvent.PREFIX}download [1, 2]"))
+
+    def test_download_arguments_request_newline_json_progress(self):
+        args = ProgressEvent.template_args()
+
+        self.assertIn("--newline", args)
+        templates = [args[index + 1] for index, arg in enumerate(args) if arg == "--progress-template"]
+        self.assertEqual([template.split(":", 1)[0] for template in templates], ["download", "postprocess"])
+        self.assertTrue(all(ProgressEvent.PREFIX in template for template in templates))
+
+    def test_runner_reports_events_and_logs_readable_lines(self):
+        events = []
+        lines = [
+            "[info] start",
+            progress_line("download", status="downloading", downloaded_bytes=1024, total_bytes=4096),
+            progress_line("download", status="finished", downloaded_bytes=4096, total_bytes=4096),
+        ]
+        with redirect_stdout(io.StringIO()) as console, redirect_stderr(io.StringIO()):
+            returncode, log = SubprocessRunner.run(
+                [sys.executable, "-c", f"print({chr(10).join(lines)!r})"],
+                progress_callback=events.append,
+            )
+
+        self.assertEqual(returncode, 0)
+        self.assertEqual([event.status for event in events], ["downloading", "finished"])
+        self.assertNotIn(ProgressEvent.PREFIX, log)
+        self.assertIn("[download]  25.0% of 4.00KiB", log)
+        self.assertIn("[download] finished: 4.00KiB", console.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
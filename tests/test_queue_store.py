@@ -0,0 +1,141 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from YTDL import PreferredFormatSelector, QueueStore, Video
+
+
+class QueueStoreTests(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.meta_dir = os.path.join(temp_dir.name, "meta")
+        os.makedirs(self.meta_dir)
+        self.db_path = os.path.join(temp_dir.name, "queue.sqlite3")
+
+    def write_video(self, name, video_id, **fields):
+        path = os.path.join(self.meta_dir, name)
+        metadata = {
+            "id": video_id,
+            "title": f"Video {video_id}",
+            "webpage_url": f"https://www.youtube.com/watch?v={video_id}",
+            **fields,
+        }
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(metadata, handle)
+        return Video(path)
+
+    def open_store(self):
+        store = QueueStore(self.db_path, self.meta_dir)
+        self.addCleanup(store.close)
+        return store
+
+    def test_pending_paths_follow_queue_file_order(self):
+        store = self.open_store()
+        second = self.write_video("b_00001_b.info.json", "b")
+        first = self.write_video("a_00001_a.info.json", "a")
+        store.add(second)
+        store.add(first)
+
+        self.assertEqual(store.pending_paths(), [first.meta_filepath, second.meta_filepath])
+        self.assertEqual(store.pending_count(), 2)
+
+    def test_complete_removes_the_file_and_the_pending_entry(self):
+        store = self.open_store()
+        video = self.write_video("a_00001_a.info.json", "a")
+        store.add(video)
+
+        store.complete(video)
+
+        self.assertFalse(os.path.exists(video.meta_filepath))
+        self.assertEqual(store.pending_paths(), [])
+
+    def test_complete_is_rolled_back_when_the_file_cannot_be_removed(self):
+        store = self.open_store()
+        video = self.write_video("a_00001_a.info.json", "a")
+        store.add(video)
+
+        with mock.patch("YTDL.os.remove", side_effect=PermissionError("locked")):
+            with self.assertRaises(PermissionError):
+                store.complete(video)
+
+        self.assertEqual(store.pending_paths(), [video.meta_filepath])
+
+    def test_failed_attempts_stay_pending(self):
+        store = self.open_store()
+        video = self.write_video("a_00001_a.info.json", "a", playlist_index=3)
+        store.add(video)
+
+        store.record_attempt(video)
+        store.record_failure(video, "network error")
+        store.record_attempt(video)
+
+        self.assertEqual(store.pending_paths(), [video.meta_filepath])
+        with store._lock:
+            row = store._conn.execute(
+                "SELECT attempts, last_error, playlist_index FROM queue_items"
+            ).fetchone()
+        self.assertEqual(row, (2, "network error", 3))
+
+    def test_pending_records_rebuild_videos_without_reading_info_json(self):
+        store = self.open_store()
+        video = self.write_video(
+            "a_00001_a.info.json", "a", playlist="Mix", playlist_index=2, formats=[{"format_id": "1"}]
+        )
+        store.add(video)
+        os.remove(video.meta_filepath)
+
+        entry, = store.pending_records()
+        record = entry["record"]
+        restored = Video(**entry)
+
+        self.assertTrue(restored.is_valid)
+        self.assertEqual((restored.title, restored.playlist, restored.playlist_index), ("Video a", "Mix", 2))
+        self.assertNotIn("formats", record)
+        self.assertFalse(hasattr(restored, "__dict__"))
+
+    def test_stored_format_selection_is_reused_without_reading_formats(self):
+        store = self.open_store()
+        video = self.write_video("a_00001_a.info.json", "a")
+        video.selected_format = "315+251"
+        store.add(video)
+        os.remove(video.meta_filepath)
+
+        entry, = store.pending_records()
+        args = Video(**entry).get_download_args()
+
+        self.assertEqual(args[args.index("-f") + 1], "315+251")
+
+    def test_stored_format_selection_is_invalidated_by_new_format_ids(self):
+        store = self.open_store()
+        formats = [
+            {"format_id": "315", "vcodec": "vp9", "acodec": "none", "height": 2160},
+            {"format_id": "251", "vcodec": "none", "acodec": "opus"},
+        ]
+        queued = self.write_video("a_00001_a.info.json", "a")
+        queued.selected_format = "stored-pair"
+        queued.formats_signature = PreferredFormatSelector.signature(formats)
+        store.add(queued)
+
+        same = self.write_video("b_00001_a.info.json", "a", formats=formats)
+        reused = Video.from_info_json(same.meta_filepath, store.stored_format_selection)
+        changed = self.write_video(
+            "c_00001_a.info.json", "a", formats=formats + [{"format_id": "140", "vcodec": "none", "acodec": "mp4a"}]
+        )
+        refreshed = Video.from_info_json(changed.meta_filepath, store.stored_format_selection)
+
+        self.assertEqual(reused.selected_format, "stored-pair")
+        self.assertEqual(refreshed.selected_format, "315+251")
+
+    def test_new_store_adopts_an_existing_meta_directory(self):
+        video = self.write_video("00001_a.info.json", "a")
+
+        store = self.open_store()
+
+        self.assertEqual(store.pending_paths(), [video.meta_filepath])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,191 @@
+import contextlib
+import hashlib
+import io
+import os
+import tempfile
+import threading
+import unittest
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import self_update
+
+
+class ArchiveServer(ThreadingHTTPServer):
+    """A local stand-in for a release download host.
+
+    ``drops`` lists how many body bytes each successive response sends
+    before the connection is cut; ``honor_range`` switches Range support.
+    ``versions`` lists ``(etag, payload)`` pairs served by successive
+    requests, the last one staying in place.
+    """
+    daemon_threads = True
+
+    def __init__(self, payload: bytes):
+        super().__init__(("127.0.0.1", 0), ArchiveHandler)
+        self.payload = payload
+        self.drops = []
+        self.honor_range = True
+        self.status = 200
+        self.ranges = []
+        self.etag = None
+        self.versions = []
+        self.if_ranges = []
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/archive.zip"
+
+
+class ArchiveHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        requested = self.headers.get("Range")
+        server.ranges.append(requested)
+        server.if_ranges.append(self.headers.get("If-Range"))
+        if server.versions:
+            server.etag, server.payload = server.versions.pop(0)
+        if server.status != 200:
+            self.send_error(server.status)
+            return
+        start = 0
+        if requested and server.honor_range and server.if_ranges[-1] in (None, server.etag):
+            start = int(requested[len("bytes="):].rstrip("-"))
+        body = server.payload[start:]
+        if start:
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(server.payload) - 1}/{len(server.payload)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        if server.etag:
+            self.send_header("ETag", server.etag)
+        self.end_headers()
+        if server.drops:
+            body = body[:server.drops.pop(0)]
+            self.close_connection = True
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def digest(data):
+    # Comparing digests keeps a failure from diffing hundreds of kilobytes.
+    return hashlib.sha256(data).hexdigest()
+
+
+def zip_bytes(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+class StreamingDownloadTests(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = temp_dir.name
+        self.payload = os.urandom(300_000)
+        self.server = ArchiveServer(self.payload)
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        patcher = mock.patch.object(self_update.time, "sleep")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def resumed_offsets(self):
+        self.assertIsNone(self.server.ranges[0])
+        return [int(value[len("bytes="):].rstrip("-")) for value in self.server.ranges[1:]]
+
+    def download(self, **kwargs):
+        path = os.path.join(self.temp_dir, "archive.zip")
+        with contextlib.redirect_stdout(io.StringIO()):
+            total = self_update._download_to_file(self.server.url, path, chunk_size=16384, **kwargs)
+        with open(path, "rb") as f:
+            return total, f.read()
+
+    def test_dropped_connection_resumes_from_the_received_bytes(self):
+        self.server.drops = [100_000, 50_000]
+
+        total, data = self.download()
+
+        self.assertEqual((total, data), (len(self.payload), self.payload))
+        # A chunk cut short by the drop is not kept, so resuming may repeat it.
+        first, second = self.resumed_offsets()
+        self.assertTrue(100_000 - 16384 < first <= 100_000)
+        self.assertTrue(first < second <= first + 50_000)
+
+    def test_resume_is_conditional_on_the_first_responses_etag(self):
+        self.server.etag = '"v1"'
+        self.server.drops = [100_000]
+
+        total, data = self.download()
+
+        self.assertEqual(digest(data), digest(self.payload))
+        self.assertEqual(self.server.if_ranges, [None, '"v1"'])
+        self.assertEqual(len(self.resumed_offsets()), 1)
+
+    def test_a_file_replaced_during_the_download_is_fetched_again(self):
+        replacement = os.urandom(200_000)
+        self.server.versions = [('"v1"', self.payload), ('"v2"', replacement)]
+        self.server.drops = [100_000]
+
+        total, data = self.download()
+
+        self.assertEqual((total, digest(data)), (len(replacement), digest(replacement)))
+        self.assertEqual(self.server.if_ranges, [None, '"v1"'])
+
+    def test_server_without_range_support_restarts_the_download(self):
+        self.server.honor_range = False
+        self.server.drops = [100_000]
+
+        total, data = self.download()
+
+        self.assertEqual(data, self.payload)
+        self.assertEqual(len(self.resumed_offsets()), 1)
+
+    def test_gives_up_after_attempts_without_progress(self):
+        self.server.status = 503
+
+        with self.assertRaises(self_update.requests.HTTPError):
+            self.download(max_retries=3)
+        self.assertEqual(len(self.server.ranges), 3)
+
+    def test_only_the_ffmpeg_tools_are_extracted_and_installed(self):
+        self.server.payload = zip_bytes({
+            "ffmpeg-master-latest-win64-gpl/bin/ffmpeg.exe": b"ffmpeg",
+            "ffmpeg-master-latest-win64-gpl/bin/ffprobe.exe": b"ffprobe",
+            "ffmpeg-master-latest-win64-gpl/bin/ffplay.exe": b"ffplay",
+            "ffmpeg-master-latest-win64-gpl/doc/ffmpeg.html": b"docs",
+        })
+        self.server.drops = [len(self.server.payload) // 2]
+        dates = {"FFmpeg": 20990101, "FFprobe": 20990101}
+
+        with mock.patch.object(self_update, "FFMPEG_ZIP_URL", self.server.url), \
+                mock.patch.object(self_update, "_portable_target_dir", return_value=self.temp_dir), \
+                mock.patch.object(self_update, "_ffmpeg_build_dates", return_value=dates), \
+                contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(self_update.update_ffmpeg(None, "", "20260101", skip_check=True))
+
+        self.assertEqual(sorted(os.listdir(self.temp_dir)), ["yt-dlp-ffmpeg.exe", "yt-dlp-ffprobe.exe"])
+        with open(os.path.join(self.temp_dir, "yt-dlp-ffprobe.exe"), "rb") as f:
+            self.assertEqual(f.read(), b"ffprobe")
+        self.assertEqual(len(self.server.ranges), 2)
+
+    def test_missing_member_is_reported(self):
+        archive_path = os.path.join(self.temp_dir, "deno.zip")
+        with open(archive_path, "wb") as f:
+            f.write(zip_bytes({"README.md": b"no binary"}))
+
+        with self.assertRaisesRegex(RuntimeError, "deno.exe"):
+            self_update._extract_zip_members(archive_path, {"deno.exe": "deno.exe"}, self.temp_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
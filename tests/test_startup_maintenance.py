@@ -0,0 +1,259 @@
+import os
+import stat
+import sys
+import tempfile
+import textwrap
+import threading
+import time
+import unittest
+from unittest import mock
+
+from YTDL import Config, MaintenanceState, YTDLManager
+
+
+class StartupMaintenanceTests(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        patcher = mock.patch.object(
+            Config, "MAINTENANCE_STATE_FILE", os.path.join(temp_dir.name, "maintenance_state.json")
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.events = []
+        self.lock = threading.Lock()
+
+    def record(self, name, seconds, result=None):
+        def run(*args):
+            with self.lock:
+                self.events.append((name, "start", time.monotonic(), args))
+            time.sleep(seconds)
+            with self.lock:
+                self.events.append((name, "end", time.monotonic(), args))
+            return result
+        return run
+
+    def at(self, name, edge):
+        return next(at for event, kind, at, _ in self.events if (event, kind) == (name, edge))
+
+    def patch_steps(self, update_self):
+        for target, name, value in (
+            (YTDLManager, "update_self", update_self),
+            (YTDLManager, "update_yt_dlp", self.record("yt-dlp", 0.3, (True, "2026.10.01"))),
+            (Config, "deno_status", self.record("deno probe", 0.2, (True, "ready"))),
+            (Config, "ffmpeg_status", self.record("ffmpeg probe", 0.2, (False, "missing"))),
+            (YTDLManager, "ensure_deno", self.record("deno", 0.1, True)),
+            (YTDLManager, "ensure_ffmpeg", self.record("ffmpeg", 0.1, False)),
+        ):
+            patcher = mock.patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_probes_overlap_the_update_check_and_updates_and_repairs_wait_for_it(self):
+        self.patch_steps(self.record("self", 0.2, (True, "v1.0.0")))
+        messages = []
+        main_thread = threading.current_thread()
+
+        def on_progress(message):
+            self.assertIs(threading.current_thread(), main_thread)
+            messages.append(message)
+
+        started = time.monotonic()
+        result = YTDLManager.run_startup_maintenance(on_progress)
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(result, {"deno": True, "ffmpeg": False})
+        # Run one after another, the steps take 1.1 s.
+        self.assertLess(elapsed, 0.75)
+        self.assertLess(self.at("deno probe", "start"), self.at("self", "end"))
+        self.assertLess(self.at("ffmpeg probe", "start"), self.at("self", "end"))
+        # Both the updater and yt-dlp --update-to would replace files.
+        self.assertGreaterEqual(self.at("yt-dlp", "start"), self.at("self", "end"))
+        self.assertGreaterEqual(self.at("deno", "start"), self.at("self", "end"))
+        self.assertGreaterEqual(self.at("ffmpeg", "start"), self.at("self", "end"))
+        statuses = {name: args for name, kind, _, args in self.events if kind == "start"}
+        self.assertEqual(statuses["ffmpeg"], ((False, "missing"),))
+        self.assertEqual(len(messages), 4)
+
+    def test_a_self_update_restart_skips_the_repairs(self):
+        def restart():
+            sys.exit(0)
+
+        self.patch_steps(restart)
+        # The probes outlast the update check; the exit must not wait for them.
+        for name, status in (("deno_status", "deno probe"), ("ffmpeg_status", "ffmpeg probe")):
+            patcher = mock.patch.object(Config, name, self.record(status, 1.0, (True, "ready")))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        started_at = time.monotonic()
+        with self.assertRaises(SystemExit):
+            YTDLManager.run_startup_maintenance()
+        self.assertLess(time.monotonic() - started_at, 0.5)
+
+        started = {name for name, kind, _, _ in self.events if kind == "start"}
+        self.assertNotIn("yt-dlp", started)
+        self.assertNotIn("deno", started)
+        self.assertNotIn("ffmpeg", started)
+
+
+class MaintenanceStateTests(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = temp_dir.name
+        self.binary = os.path.join(self.temp_dir, "deno.exe")
+        with open(self.binary, "wb") as f:
+            f.write(b"v1")
+        for name, value in (
+            ("MAINTENANCE_STATE_FILE", os.path.join(self.temp_dir, "maintenance_state.json")),
+            ("MAINTENANCE_CHECK_INTERVAL", 60),
+            ("EXECUTABLE", self.binary),
+        ):
+            patcher = mock.patch.object(Config, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        for name, value in (
+            ("get_deno_path", lambda: self.binary),
+            ("get_ffmpeg_paths", lambda: {"ffmpeg": self.binary}),
+        ):
+            patcher = mock.patch.object(Config, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.calls = []
+
+    def test_a_check_is_fresh_until_its_key_binary_or_interval_changes(self):
+        self.assertFalse(MaintenanceState.is_fresh("deno", "2.0", [self.binary]))
+        MaintenanceState.record("deno", "2.0", [self.binary])
+
+        self.assertTrue(MaintenanceState.is_fresh("deno", "2.0", [self.binary]))
+        self.assertFalse(MaintenanceState.is_fresh("deno", "2.1", [self.binary]))
+        with mock.patch.object(Config, "MAINTENANCE_CHECK_INTERVAL", 0):
+            self.assertFalse(MaintenanceState.is_fresh("deno", "2.0", [self.binary]))
+        with open(self.binary, "wb") as f:
+            f.write(b"v2 replaced")
+        self.assertFalse(MaintenanceState.is_fresh("deno", "2.0", [self.binary]))
+
+    def test_unreadable_state_is_ignored(self):
+        with open(Config.MAINTENANCE_STATE_FILE, "w", encoding="utf-8") as f:
+            f.write("{broken")
+
+        with self.assertLogs(level="WARNING"):
+            self.assertFalse(MaintenanceState.is_fresh("deno", "2.0"))
+        MaintenanceState.record("deno", "2.0")
+        self.assertTrue(MaintenanceState.is_fresh("deno", "2.0"))
+
+    def step(self, name, result):
+        def run(*args):
+            self.calls.append((name,) + args)
+            return result
+        return run
+
+    def run_maintenance(self, yt_dlp_result=(True, "2026.10.01"), force_check=False):
+        self.calls = []
+        with mock.patch.object(YTDLManager, "update_self", self.step("self", (True, "v1.0.0"))), \
+                mock.patch.object(YTDLManager, "update_yt_dlp", self.step("yt-dlp", yt_dlp_result)), \
+                mock.patch.object(Config, "deno_status", self.step("deno probe", (True, "ready"))), \
+                mock.patch.object(Config, "ffmpeg_status", self.step("ffmpeg probe", (True, "ready"))), \
+                mock.patch.object(YTDLManager, "ensure_deno", self.step("deno", True)), \
+                mock.patch.object(YTDLManager, "ensure_ffmpeg", self.step("ffmpeg", True)):
+            result = YTDLManager.run_startup_maintenance(force_check=force_check)
+        self.assertEqual(result, {"deno": True, "ffmpeg": True})
+        return {call[0] for call in self.calls}
+
+    def test_recent_checks_are_skipped_unless_forced(self):
+        all_steps = {"self", "yt-dlp", "deno probe", "ffmpeg probe", "deno", "ffmpeg"}
+        self.assertEqual(self.run_maintenance(), all_steps)
+
+        self.assertEqual(self.run_maintenance(), {"deno", "ffmpeg"})
+        # The components are still set up, without being probed.
+        self.assertIn(("deno", (True, "ready (checked recently)")), self.calls)
+
+        self.assertEqual(self.run_maintenance(force_check=True), all_steps)
+
+    def test_the_versions_found_are_recorded(self):
+        self.run_maintenance()
+
+        state = MaintenanceState._load()
+        self.assertEqual(state["program"]["detail"], "v1.0.0")
+        self.assertEqual(state["yt-dlp"]["detail"], "2026.10.01")
+        self.assertEqual(state["deno"]["detail"], "ready")
+
+    def test_failed_and_changed_checks_run_again(self):
+        self.run_maintenance(yt_dlp_result=(False, "network down"))
+        self.assertEqual(self.run_maintenance(), {"yt-dlp", "deno", "ffmpeg"})
+
+        with mock.patch.object(Config, "FFMPEG_MIN_BUILD_DATE", "29991231"):
+            self.assertEqual(self.run_maintenance(), {"ffmpeg probe", "deno", "ffmpeg"})
+
+
+class UpdateResultTests(unittest.TestCase):
+    def test_update_self_returns_the_latest_release_tag(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        response = mock.Mock()
+        response.json.return_value = {"tag_name": "v9.9.9"}
+
+        with mock.patch("YTDL.__version__", "v9.9.9"), \
+                mock.patch("YTDL._http_get_with_retry", return_value=response), \
+                mock.patch.object(Config, "_APP_DIR", temp_dir.name):
+            self.assertEqual(YTDLManager.update_self(), (True, "v9.9.9"))
+
+    @unittest.skipIf(os.name == "nt", "the fake yt-dlp is a shebang script")
+    def test_update_yt_dlp_returns_the_version_after_updating(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        executable = os.path.join(temp_dir.name, "yt-dlp")
+        with open(executable, "w", encoding="utf-8") as f:
+            f.write(textwrap.dedent(f"""\
+                #!{sys.executable}
+                import os, sys
+                marker = os.path.join(os.path.dirname(__file__), "updated")
+                if sys.argv[1] == "--update-to":
+                    open(marker, "w").close()
+                else:
+                    print("2026.10.01" if os.path.exists(marker) else "2025.01.01")
+            """))
+        os.chmod(executable, os.stat(executable).st_mode | stat.S_IXUSR)
+
+        with mock.patch.object(Config, "EXECUTABLE", executable):
+            self.assertEqual(YTDLManager.update_yt_dlp(), (True, "2026.10.01"))
+            with mock.patch.object(Config, "EXECUTABLE", os.path.join(temp_dir.name, "missing")), \
+                    self.assertLogs(level="ERROR"):
+                self.assertFalse(YTDLManager.update_yt_dlp()[0])
+
+
+@unittest.skipIf(os.name == "nt", "the fake FFmpeg tools are shebang scripts")
+class FfmpegStatusTests(unittest.TestCase):
+    def test_binaries_are_probed_in_parallel(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        paths = {}
+        for name in ("ffmpeg", "ffprobe"):
+            path = os.path.join(temp_dir.name, name)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(textwrap.dedent(f"""\
+                    #!{sys.executable}
+                    import time
+                    time.sleep(0.4)
+                    print("{name} version N --extra-version=20260101")
+                """))
+            os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+            paths[name] = path
+
+        with mock.patch.object(Config, "get_ffmpeg_paths", return_value=paths), \
+                mock.patch.object(Config, "FFMPEG_MIN_BUILD_DATE", "20250101"):
+            started = time.monotonic()
+            ready, reason = Config.ffmpeg_status()
+            elapsed = time.monotonic() - started
+
+        self.assertEqual((ready, reason), (True, "ready (build date >= 20250101)"))
+        self.assertLess(elapsed, 0.75)
+
+        with mock.patch.object(Config, "get_ffmpeg_paths", return_value=paths), \
+                mock.patch.object(Config, "FFMPEG_MIN_BUILD_DATE", "20270101"):
+            self.assertEqual(Config.ffmpeg_status()[0], False)
+
+
+if __name__ == "__main__":
+    unittest.main()
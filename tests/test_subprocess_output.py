@@ -0,0 +1,91 @@
+import io
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import mock
+
+from YTDL import Config, Logger, OutputCapture, SubprocessRunner, YTDLManager
+
+
+def run_script(source):
+    with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+        return SubprocessRunner.run([sys.executable, "-c", source])
+
+
+class BoundedOutputCaptureTests(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.log_dir = os.path.join(temp_dir.name, "logs")
+        for name, value in (("JOB_LOG_DIR", self.log_dir), ("OUTPUT_TAIL_LINES", 10), ("JOB_LOG_KEEP", 3)):
+            patcher = mock.patch.object(Config, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_failed_job_keeps_only_the_tail_in_memory_and_the_rest_on_disk(self):
+        returncode, log = run_script(
+            "import sys\n"
+            "print('ERROR: [youtube] abc: Private video. Sign in if you have access', flush=True)\n"
+            "for i in range(200): print(f'line {i}', flush=True)\n"
+            "sys.exit(1)\n"
+        )
+
+        self.assertEqual(returncode, 1)
+        self.assertIn("line 199", log)
+        self.assertNotIn("line 100", log)
+        self.assertLessEqual(len(log.splitlines()), 11)
+        with open(log.log_path, "r", encoding="utf-8") as f:
+            transcript = f.read()
+        self.assertIn("line 100", transcript)
+        self.assertIn("Private video", transcript)
+
+        self.assertEqual(
+            SubprocessRunner.extract_yt_dlp_error(log),
+            "ERROR: [youtube] abc: Private video. Sign in if you have access",
+        )
+        self.assertEqual(type(YTDLManager._detect_specific_error(log)).__name__, "PrivateVideoError")
+
+    def test_successful_job_removes_its_transcript(self):
+        returncode, log = run_script("print('done')")
+
+        self.assertEqual(returncode, 0)
+        self.assertEqual(log.strip(), "done")
+        self.assertEqual(log.log_path, "")
+        self.assertEqual(os.listdir(self.log_dir), [])
+
+    def test_only_the_newest_failed_transcripts_are_retained(self):
+        for _ in range(5):
+            run_script("import sys; sys.exit(2)")
+
+        self.assertLessEqual(len(os.listdir(self.log_dir)), Config.JOB_LOG_KEEP)
+
+    def test_pruning_spares_transcripts_still_being_written(self):
+        running = [OutputCapture("running") for _ in range(Config.JOB_LOG_KEEP + 1)]
+        self.addCleanup(lambda: [capture.close() for capture in running])
+        for _ in range(3):
+            run_script("import sys; sys.exit(2)")
+
+        for capture in running:
+            self.assertTrue(os.path.exists(capture.log_path))
+            capture.append("still writing\n")
+        finished = running[0].finish(keep=True)
+        self.assertNotIn(finished.log_path, OutputCapture._live_paths)
+
+    def test_diagnostic_attachment_reads_only_the_end_of_the_transcript(self):
+        path = os.path.join(self.log_dir, "job.log")
+        os.makedirs(self.log_dir)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("old\n" * 1000 + "newest line\n")
+
+        with mock.patch.object(Logger, "MAX_DIAGNOSTIC_BYTES", 200):
+            attachment = Logger._diagnostic_file_attachment(path).getvalue()
+
+        self.assertEqual(len(attachment), 200)
+        self.assertTrue(attachment.startswith(b"[Diagnostic output exceeded"))
+        self.assertTrue(attachment.endswith(b"newest line\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import mock
+
+from YTDL import CancelEvent, Config, SubprocessRunner
+
+
+def run_script(source, **kwargs):
+    with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+        return SubprocessRunner.run([sys.executable, "-c", source], **kwargs)
+
+
+class SubprocessSupervisorTests(unittest.TestCase):
+    def setUp(self):
+        # Long outputs are spooled to a job log file; keep those out of the repo.
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        patcher = mock.patch.object(Config, "JOB_LOG_DIR", os.path.join(temp_dir.name, "logs"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_lines_are_split_on_carriage_returns_and_across_chunks(self):
+        lines = []
+        returncode, log = run_script(
+            "import sys\n"
+            "out = sys.stdout.buffer\n"
+            "out.write(b'[download]  1%\\r[download] 50%\\r\\n'); out.flush()\n"
+            "out.write('caf\\u00e9 '.encode() + b'x' * 70000 + b'\\xe2'); out.flush()\n"
+            "out.write(b'\\x82\\xac end\\r'); out.flush()\n"
+            "out.write(b'\\nlast')\n",
+            line_callback=lines.append,
+        )
+
+        self.assertEqual(returncode, 0)
+        self.assertEqual(lines[:2], ["[download]  1%\n", "[download] 50%\n"])
+        self.assertTrue(lines[2].startswith("caf\u00e9 xxx"))
+        self.assertTrue(lines[2].endswith("x\u20ac end\n"))
+        self.assertEqual(lines[3:], ["last", ""])
+        self.assertTrue(log.endswith("last"))
+
+    def test_cancel_event_terminates_the_job_immediately(self):
+        cancel_event = CancelEvent()
+        threading.Timer(0.3, cancel_event.set).start()
+        started_at = time.monotonic()
+
+        returncode, _ = run_script("import time; print('started', flush=True); time.sleep(30)", cancel_event=cancel_event)
+
+        self.assertNotEqual(returncode, 0)
+        self.assertLess(time.monotonic() - started_at, 5)
+
+    def test_plain_threading_event_still_cancels(self):
+        cancel_event = threading.Event()
+        threading.Timer(0.3, cancel_event.set).start()
+        started_at = time.monotonic()
+
+        returncode, _ = run_script("import time; time.sleep(30)", cancel_event=cancel_event)
+
+        self.assertNotEqual(returncode, 0)
+        self.assertLess(time.monotonic() - started_at, 5)
+
+    def test_callbacks_run_on_the_calling_thread(self):
+        threads = set()
+
+        run_script(
+            "print('one'); print('two')",
+            line_callback=lambda line: threads.add(threading.current_thread()),
+        )
+
+        self.assertEqual(threads, {threading.current_thread()})
+
+    def test_a_slow_line_handler_does_not_stall_other_jobs(self):
+        def slow(line):
+            time.sleep(0.5)
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            slow_job = pool.submit(run_script, "print('a'); print('b'); print('c')", line_callback=slow)
+            time.sleep(0.2)
+            started_at = time.monotonic()
+            quick = run_script("for index in range(200): print(index)", line_callback=lambda line: None)
+            quick_seconds = time.monotonic() - started_at
+            self.assertEqual(slow_job.result()[0], 0)
+
+        self.assertEqual(quick[0], 0)
+        self.assertLess(quick_seconds, 1.0)
+
+    @staticmethod
+    def count_threads():
+        # asyncio's POSIX child watcher may wait on each child with its own
+        # "asyncio-waitpid-N" thread; the Windows Proactor loop does not.
+        return sum(1 for thread in threading.enumerate() if "waitpid" not in thread.name)
+
+    def test_concurrent_jobs_do_not_add_reader_threads(self):
+        run_script("pass")  # start the supervisor
+        baseline = self.count_threads()
+        peak = baseline
+        release = threading.Event()
+
+        def watch():
+            nonlocal peak
+            while not release.is_set():
+                peak = max(peak, self.count_threads())
+                time.sleep(0.01)
+
+        watcher = threading.Thread(target=watch)
+        watcher.start()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(
+                lambda index: run_script(f"import time; print({index}); time.sleep(0.5)"),
+                range(8),
+            ))
+        release.set()
+        watcher.join()
+
+        self.assertEqual([returncode for returncode, _ in results], [0] * 8)
+        self.assertEqual([log.strip() for _, log in results], [str(index) for index in range(8)])
+        # The pool workers and the watcher only; no per-job reader threads.
+        self.assertLessEqual(peak, baseline + 8 + 1 + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
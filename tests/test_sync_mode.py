@@ -0,0 +1,180 @@
+import json
+import os
+import stat
+import sys
+import tempfile
+import textwrap
+import unittest
+from unittest import mock
+
+from YTDL import Config, FlatPlaylist, MetricsStore, SyncCursorStore, YTDLManager
+
+CHANNEL_URL = "https://www.youtube.com/@channel/videos"
+PLAYLIST_URL = "https://www.youtube.com/playlist?list=PL123"
+
+FAKE_YT_DLP = textwrap.dedent("""\
+    #!{python}
+    import json, os, sys, time
+    from urllib.parse import parse_qs, urlparse
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    args = sys.argv[1:]
+    url = next(arg for arg in reversed(args) if arg.startswith("https://"))
+    if "--flat-playlist" in args:
+        with open(os.path.join(here, "listing.json"), encoding="utf-8") as f:
+            listing = json.load(f)
+        prefix = args[args.index("--print") + 1].split("%")[0]
+        for index, video_id in enumerate(listing, start=1):
+            with open(os.path.join(here, "listed.log"), "a", encoding="utf-8") as f:
+                f.write(video_id + "\\n")
+            entry = {{
+                "id": video_id, "url": f"https://www.youtube.com/watch?v={{video_id}}", "ie_key": "Youtube",
+                "upload_date": f"2026{{len(listing) - index:04d}}", "playlist": "Channel",
+                "playlist_id": "UC123", "playlist_index": index,
+            }}
+            print(prefix + json.dumps(entry), flush=True)
+            time.sleep(0.05)
+        sys.exit(0)
+    video_id = parse_qs(urlparse(url).query)["v"][0]
+    path = args[args.index("-o") + 1].replace("%(autonumber)s", "00001").replace("%(id)s", video_id) + ".info.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({{"id": video_id, "extractor_key": "Youtube", "title": video_id, "webpage_url": url}}, f)
+    print(f"[info] Writing video metadata as JSON to: {{path}}", flush=True)
+""")
+
+
+class FlatPlaylistTests(unittest.TestCase):
+    def test_parse_reads_only_prefixed_entries(self):
+        line = FlatPlaylist.PREFIX + '{"id": "abc", "ie_key": "Youtube", "playlist": null}\n'
+
+        self.assertEqual(FlatPlaylist.parse(line.rstrip("\n"))["id"], "abc")
+        self.assertIsNone(FlatPlaylist.parse("[youtube:tab] Downloading page 1"))
+        self.assertIsNone(FlatPlaylist.parse(FlatPlaylist.PREFIX + "{broken"))
+        self.assertIsNone(FlatPlaylist.parse(FlatPlaylist.PREFIX + '{"id": null}'))
+
+    def test_entry_url_and_queued_fields(self):
+        entry = {"id": "abc", "url": "abc", "ie_key": "Youtube", "playlist": "Mix", "playlist_index": None,
+                 "playlist_webpage_url": PLAYLIST_URL}
+
+        self.assertEqual(FlatPlaylist.entry_url(entry), "https://www.youtube.com/watch?v=abc")
+        self.assertIsNone(FlatPlaylist.entry_url({"id": "abc", "ie_key": "Generic"}))
+        self.assertEqual(FlatPlaylist.queued_fields(entry), {"playlist": "Mix"})
+
+
+class SyncCursorStoreTests(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.store = SyncCursorStore(os.path.join(temp_dir.name, "sync.sqlite3"))
+        self.addCleanup(self.store.close)
+
+    def test_known_entries_are_kept_per_source(self):
+        self.store.mark_known("a", ["x", "y"])
+        self.store.mark_known("b", ["z"])
+
+        self.assertEqual(self.store.known("a", ["x", "z", "w"]), {"x"})
+        self.assertEqual(self.store.known("a", [f"id{index}" for index in range(1200)] + ["y"]), {"y"})
+
+    def test_cursor_keeps_the_newest_entry_across_empty_syncs(self):
+        self.assertIsNone(self.store.cursor("a"))
+        self.store.update_cursor("a", "x", "20261001")
+        self.store.update_cursor("a", None, None)
+
+        cursor = self.store.cursor("a")
+        self.assertEqual((cursor["newest_id"], cursor["newest_upload"]), ("x", "20261001"))
+        self.assertIsNotNone(cursor["synced_at"])
+
+
+@unittest.skipIf(os.name == "nt", "the fake yt-dlp is a shebang script")
+class SyncSourceTests(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = temp_dir.name
+        executable = os.path.join(self.temp_dir, "yt-dlp")
+        with open(executable, "w", encoding="utf-8") as f:
+            f.write(FAKE_YT_DLP.format(python=sys.executable))
+        os.chmod(executable, os.stat(executable).st_mode | stat.S_IXUSR)
+        for name, value in (
+            ("EXECUTABLE", executable),
+            ("META_DIR", os.path.join(self.temp_dir, "meta")),
+            ("QUEUE_DB", os.path.join(self.temp_dir, "queue.sqlite3")),
+            ("ARCHIVE_DB", os.path.join(self.temp_dir, "archive.sqlite3")),
+            ("SYNC_DB", os.path.join(self.temp_dir, "sync.sqlite3")),
+            ("JOB_LOG_DIR", os.path.join(self.temp_dir, "logs")),
+            ("METRICS_FILE", os.path.join(self.temp_dir, "metrics.jsonl")),
+            ("FRAGMENT_TUNING_FILE", os.path.join(self.temp_dir, "fragment_tuning.json")),
+            ("SYNC_KNOWN_STREAK", 3),
+            ("DISCORD_WEBHOOK", ""),
+            ("YT_DLP_ENGINE", "subprocess"),
+        ):
+            patcher = mock.patch.object(Config, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        os.makedirs(Config.META_DIR)
+        self.addCleanup(self.close_stores)
+
+    @staticmethod
+    def close_stores():
+        for name in ("_queue_store", "_archive", "_sync_store"):
+            store = getattr(YTDLManager, name)
+            if store is not None:
+                store.close()
+                setattr(YTDLManager, name, None)
+
+    def publish(self, video_ids):
+        with open(os.path.join(self.temp_dir, "listing.json"), "w", encoding="utf-8") as f:
+            json.dump(video_ids, f)
+        listed = os.path.join(self.temp_dir, "listed.log")
+        if os.path.exists(listed):
+            os.remove(listed)
+
+    def listed_count(self):
+        with open(os.path.join(self.temp_dir, "listed.log"), encoding="utf-8") as f:
+            return len(f.read().splitlines())
+
+    def sync(self, url):
+        queued = []
+        result = YTDLManager.sync_source(url, on_video=queued.append)
+        return result, sorted(video.video_id for video in queued)
+
+    def test_channel_resync_queues_new_uploads_and_stops_at_known_ones(self):
+        self.publish([f"old{index:02d}" for index in range(12)])
+        result, queued = self.sync(CHANNEL_URL)
+        self.assertEqual(result, (True, None))
+        self.assertEqual(len(queued), 12)
+        self.assertEqual(YTDLManager.get_sync_store().cursor(CHANNEL_URL)["newest_id"], "old00")
+
+        self.publish(["new1", "new0"] + [f"old{index:02d}" for index in range(12)])
+        result, queued = self.sync(CHANNEL_URL)
+
+        self.assertEqual(result, (True, None))
+        self.assertEqual(queued, ["new0", "new1"])
+        self.assertLess(self.listed_count(), 14)
+        self.assertEqual(YTDLManager.get_sync_store().cursor(CHANNEL_URL)["newest_id"], "new1")
+        record = YTDLManager.get_queue_store().pending_records()[-1]["record"]
+        self.assertEqual(record["playlist"], "Channel")
+        records = [record for record in MetricsStore.iter_records() if record.get("sync")]
+        self.assertEqual([record["exit_code"] for record in records], [0, 0])
+
+    def test_playlist_is_listed_in_full_but_only_new_entries_are_resolved(self):
+        self.publish(["a", "b", "c", "d", "e"])
+        self.assertEqual(self.sync(PLAYLIST_URL)[1], ["a", "b", "c", "d", "e"])
+
+        self.publish(["a", "b", "c", "d", "e", "f"])
+        result, queued = self.sync(PLAYLIST_URL)
+
+        self.assertEqual(result, (True, None))
+        self.assertEqual(queued, ["f"])
+        self.assertEqual(self.listed_count(), 6)
+
+    def test_archived_entries_are_not_resolved_on_the_first_sync(self):
+        YTDLManager.get_archive().add("youtube b")
+        self.publish(["a", "b"])
+
+        self.assertEqual(self.sync(PLAYLIST_URL)[1], ["a"])
+        self.assertEqual(YTDLManager.get_sync_store().known(PLAYLIST_URL, ["a", "b"]), {"a", "b"})
+
+
+if __name__ == "__main__":
+    unittest.main()